@@ -0,0 +1,84 @@
+"""Benchmark: AsyncToolTrackerDB vs the sync API under many coroutines
+
+Runs ``--coroutines`` concurrent coroutines, each adding ``--ops``
+installations and reading its machine's records back, first through
+the sync ToolTrackerDB wrapped in run_in_executor (one commit per
+write) and then through AsyncToolTrackerDB (batched writes).
+
+Usage:
+    python -m benchmarks.bench_async [--coroutines 1000] [--ops 5]
+        [--journal-mode wal]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from src.async_db import AsyncToolTrackerDB
+from src.database import ToolTrackerDB
+
+def installation(worker, op):
+    """Arguments of a unique installation for one coroutine's operation"""
+    installed = date(2025, 1, 1) + timedelta(days=op)
+    return f"Machine-{worker % 50}", f"Tool-{worker}", installed.isoformat()
+
+async def sync_worker(db, worker, ops):
+    loop = asyncio.get_running_loop()
+    for op in range(ops):
+        await loop.run_in_executor(None, db.add_installation, *installation(worker, op))
+    machine = installation(worker, 0)[0]
+    await loop.run_in_executor(None, db.get_installations_by_machine, machine)
+
+async def async_worker(db, worker, ops):
+    for op in range(ops):
+        await db.add_installation(*installation(worker, op))
+    await db.get_installations_by_machine(installation(worker, 0)[0])
+
+async def run_sync(db_path, coroutines, ops, journal_mode):
+    db = ToolTrackerDB(db_path, journal_mode=journal_mode)
+    try:
+        await asyncio.gather(*(sync_worker(db, i, ops) for i in range(coroutines)))
+        return db.get_statistics()["total_records"], db.busy_retries
+    finally:
+        db.close()
+
+async def run_async(db_path, coroutines, ops, journal_mode):
+    async with AsyncToolTrackerDB(db_path, journal_mode=journal_mode) as db:
+        await asyncio.gather(*(async_worker(db, i, ops) for i in range(coroutines)))
+        return (await db.get_statistics())["total_records"], db.batches
+
+def timed(coro_func, coroutines, ops, journal_mode):
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        db_path = os.path.join(tmpdir.name, "bench.db")
+        start = time.perf_counter()
+        result = asyncio.run(coro_func(db_path, coroutines, ops, journal_mode))
+        return time.perf_counter() - start, result
+    finally:
+        tmpdir.cleanup()
+
+def run(coroutines, ops, journal_mode):
+    total = coroutines * ops
+    elapsed, (rows, retries) = timed(run_sync, coroutines, ops, journal_mode)
+    print(f"sync API + run_in_executor: {total:,} writes in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} writes/sec, {retries} busy retries)")
+    sync_rate = total / elapsed
+
+    elapsed, (rows, batches) = timed(run_async, coroutines, ops, journal_mode)
+    print(f"AsyncToolTrackerDB:         {total:,} writes in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} writes/sec, {batches:,} transactions)")
+    print(f"speedup: {total / elapsed / sync_rate:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coroutines", type=int, default=1000, help="Concurrent coroutines")
+    parser.add_argument("--ops", type=int, default=5, help="Writes per coroutine")
+    parser.add_argument("--journal-mode", default="wal")
+    args = parser.parse_args()
+    run(args.coroutines, args.ops, args.journal_mode)
+
+if __name__ == "__main__":
+    main()
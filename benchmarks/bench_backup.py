@@ -0,0 +1,138 @@
+"""Benchmark: online backup and maintenance under a steady stream of writes
+
+Generates a seeded database (see benchmarks.datagen), then runs a writer
+thread adding one installation every ``--interval`` seconds for
+``--seconds`` with nothing else happening, then while ``backup()``
+copies the database over and over, and once more while ``maintain()``
+runs. Reports backup throughput and the writer's latency in each
+phase, so the cost of backing up a live database is visible.
+
+Usage:
+    python -m benchmarks.bench_backup [--rows 100000] [--journal-mode wal]
+        [--step-pages 1024] [--interval 0.002] [--seconds 2.0]
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks import datagen
+from src.database import BACKUP_STEP_PAGES, ToolTrackerDB
+
+WRITER_MACHINE = "Backup-Writer"
+
+def writer(db_path, options, interval, counter, stop, latencies):
+    """Add installations until ``stop`` is set, recording each add's latency"""
+    with ToolTrackerDB(db_path, **options) as db:
+        while not stop.is_set():
+            n = next(counter)
+            installed = date(2040, 1, 1) + timedelta(days=n // 50)
+            start = time.perf_counter()
+            db.add_installation(WRITER_MACHINE, f"Tool-{n % 50}", installed.isoformat())
+            latencies.append(time.perf_counter() - start)
+            time.sleep(interval)
+
+def latency_summary(latencies):
+    """Write count and latency percentiles in milliseconds"""
+    if len(latencies) < 2:
+        return {"writes": len(latencies), "p50_ms": None, "p99_ms": None, "max_ms": None}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"writes": len(latencies), "p50_ms": round(cuts[49] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3), "max_ms": round(max(latencies) * 1000, 3)}
+
+def under_writes(db_path, options, interval, counter, work):
+    """Run ``work()`` while the writer runs; return its result and the write latencies"""
+    stop = threading.Event()
+    latencies = []
+    thread = threading.Thread(target=writer,
+                              args=(db_path, options, interval, counter, stop, latencies))
+    thread.start()
+    try:
+        # Let the writer open its connection before measuring
+        while not latencies and thread.is_alive():
+            time.sleep(interval)
+        result = work()
+    finally:
+        stop.set()
+        thread.join()
+    return result, latency_summary(latencies)
+
+def backups(db, target, step_pages, seconds):
+    """Back ``db`` up to ``target`` repeatedly for at least ``seconds``"""
+    results = []
+    deadline = time.monotonic() + seconds
+    while not results or time.monotonic() < deadline:
+        results.append(db.backup(target, step_pages=step_pages))
+    return results
+
+def run(db_path, rows=100_000, journal_mode="wal", step_pages=BACKUP_STEP_PAGES,
+        interval=0.002, seconds=2.0, log=print):
+    """Measure backup and maintenance of ``db_path`` under writes; return the figures"""
+    options = {"journal_mode": journal_mode}
+    counter = itertools.count()
+    with ToolTrackerDB(db_path, **options) as db:
+        start = time.perf_counter()
+        datagen.populate(db, rows)
+        log(f"generated {rows:,} installations in {time.perf_counter() - start:.1f}s")
+        page_size = db.connection.execute("PRAGMA page_size").fetchone()[0]
+
+        _, idle_writes = under_writes(db_path, options, interval, counter,
+                                      lambda: time.sleep(seconds))
+        target = db_path + ".backup"
+        try:
+            results, backup_writes = under_writes(
+                db_path, options, interval, counter,
+                lambda: backups(db, target, step_pages, seconds))
+            with ToolTrackerDB(target) as copy:
+                copy_ok = not copy.maintain(vacuum=False, analyze=False).problems
+        finally:
+            if os.path.exists(target):
+                os.remove(target)
+        maintenance, maintain_writes = under_writes(db_path, options, interval, counter,
+                                                    db.maintain)
+
+    elapsed = sum(result.seconds for result in results)
+    megabytes = sum(result.pages for result in results) * page_size / 1e6
+    return {
+        "backup": {"complete": all(result.complete for result in results) and copy_ok,
+                   "backups": len(results), "megabytes": round(megabytes, 2),
+                   "seconds": round(elapsed, 3), "mb_per_sec": round(megabytes / elapsed, 1),
+                   "restarts": sum(result.restarts for result in results)},
+        "maintain": {"complete": maintenance.complete, "seconds": round(maintenance.seconds, 3),
+                     "problems": len(maintenance.problems)},
+        "write_latency": {"idle": idle_writes, "backup": backup_writes,
+                          "maintain": maintain_writes},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Installations to generate")
+    parser.add_argument("--journal-mode", default="wal", help="Journal mode of every connection")
+    parser.add_argument("--step-pages", type=int, default=BACKUP_STEP_PAGES,
+                        help="Pages copied per backup step")
+    parser.add_argument("--interval", type=float, default=0.002,
+                        help="Seconds the writer waits between adds")
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="Seconds of writes measured idle and during backups")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report = run(os.path.join(tmpdir, "bench.db"), args.rows, args.journal_mode,
+                     args.step_pages, args.interval, args.seconds)
+    backup = report["backup"]
+    print(f"backup: {backup['backups']} backup(s), {backup['megabytes']:.1f} MB "
+          f"in {backup['seconds']:.2f}s "
+          f"({backup['mb_per_sec']:.1f} MB/s), {backup['restarts']} restart(s)")
+    print(f"maintain: {report['maintain']['seconds']:.2f}s")
+    print(f"{'writes during':>14} {'writes':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for phase, summary in report["write_latency"].items():
+        print(f"{phase:>14} {summary['writes']:8,d} {summary['p50_ms'] or 0:8.2f} "
+              f"{summary['p99_ms'] or 0:8.2f} {summary['max_ms'] or 0:8.2f}")
+
+if __name__ == "__main__":
+    main()
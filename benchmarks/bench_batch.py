@@ -0,0 +1,58 @@
+"""Benchmark: per-event cost of `tool-tracker add` vs `tool-tracker batch`
+
+Runs ``--single`` separate ``add`` invocations, one process each, and
+then pipes ``--events`` add operations through one ``batch`` process,
+and reports the cost per event of each.
+
+Usage:
+    python -m benchmarks.bench_batch [--events 20000] [--single 20]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def add_args(i):
+    return ["add", "--machine", f"Machine-{i % 50}", "--tool", f"Tool-{i}",
+            "--installed-date", "2025-01-01"]
+
+def run(events, single):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, TOOL_TRACKER_DB=os.path.join(tmpdir, "bench.db"))
+        cli = [sys.executable, "-m", "src.cli"]
+
+        start = time.perf_counter()
+        for i in range(single):
+            subprocess.run(cli + add_args(i), cwd=ROOT, env=env, capture_output=True,
+                           check=True)
+        per_call = (time.perf_counter() - start) / single
+
+        lines = "".join(
+            json.dumps({"op": "add", "machine": f"Machine-{i % 50}", "tool": f"Tool-{i}",
+                        "installed_date": "2025-01-02"}) + "\n"
+            for i in range(events))
+        start = time.perf_counter()
+        result = subprocess.run(cli + ["batch"], cwd=ROOT, env=env, input=lines,
+                                capture_output=True, text=True, check=True)
+        elapsed = time.perf_counter() - start
+        failed = sum(not json.loads(line)["ok"] for line in result.stdout.splitlines())
+
+    print(f"separate processes: {per_call * 1000:8.3f} ms per event ({single} events)")
+    print(f"batch command:      {elapsed / events * 1000:8.3f} ms per event "
+          f"({events:,} events in {elapsed:.2f}s, {failed} failed)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000, help="Events piped to batch")
+    parser.add_argument("--single", type=int, default=20, help="Separate add invocations")
+    args = parser.parse_args()
+    run(args.events, args.single)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: per-call connections vs the managed connection layer
+
+Compares ops/sec of the old connect-per-call pattern against
+ToolTrackerDB's long-lived per-thread connection.
+
+Usage:
+    python -m benchmarks.bench_connection [--ops 2000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.database import ToolTrackerDB
+
+def legacy_get_machine_id(db_path, name):
+    """Lookup as done before the connection layer: connect, query, close"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM machines WHERE name = ?", (name,))
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+def legacy_add_installation(db_path, machine_id, tool_id, installed_date):
+    """Insert as done before the connection layer: connect, insert, commit, close"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO installations (machine_id, tool_id, installed_date)
+        VALUES (?, ?, ?)
+    """, (machine_id, tool_id, installed_date))
+    conn.commit()
+    conn.close()
+
+def ops_per_sec(func, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    return ops / (time.perf_counter() - start)
+
+def run(ops):
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        with ToolTrackerDB(db_path) as db:
+            machine_id = db.add_machine("Machine-0")
+            tool_ids = [db.add_tool(f"Tool-{i}") for i in range(2)]
+
+            results = {
+                "lookup (per-call connection)": ops_per_sec(
+                    lambda i: legacy_get_machine_id(db_path, "Machine-0"), ops),
+                "lookup (managed connection)": ops_per_sec(
+                    lambda i: db.get_machine_id("Machine-0"), ops),
+                "insert (per-call connection)": ops_per_sec(
+                    lambda i: legacy_add_installation(
+                        db_path, machine_id, tool_ids[0], f"day-{i}"), ops),
+                "insert (managed connection)": ops_per_sec(
+                    lambda i: db.add_installation(
+                        "Machine-0", "Tool-1", f"day-{i}"), ops),
+            }
+            cache = db.id_cache_info()
+    finally:
+        os.remove(db_path)
+
+    for name, rate in results.items():
+        print(f"{name:32s} {rate:12,.0f} ops/sec")
+    print(f"ID cache: {cache['hits']:,} hits, {cache['misses']:,} misses")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per case")
+    args = parser.parse_args()
+    run(args.ops)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: streaming export throughput and peak memory
+
+For each ``--rows`` size, builds a seeded database (see
+benchmarks.datagen) and exports it in every text format, plus Parquet
+when pyarrow is installed, each in a fresh child process. Reports
+records/sec and how much the child's peak RSS grew during the export,
+which should stay flat as the row count grows. A baseline that loads
+every record with get_all_installations() before writing shows what
+the export avoids.
+
+Usage:
+    python -m benchmarks.bench_export [--rows 100000 1000000] [--skip-baseline]
+    python -m benchmarks.bench_export --rows 10000000 --skip-baseline
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+
+CASES = [("csv", False), ("csv", True), ("jsonl", False), ("jsonl", True), ("parquet", False)]
+
+def peak_rss_mb():
+    """This process's peak resident set size in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def export_child(db_path, fmt, compress):
+    """Export in this process; returns (records, seconds, RSS growth in MB)"""
+    with ToolTrackerDB(db_path) as db:
+        db.get_statistics()
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        if fmt == "baseline":
+            records = db.get_all_installations()
+            with open(os.devnull, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(records[0]))
+                writer.writeheader()
+                writer.writerows(records)
+            count = len(records)
+        else:
+            count = db.export_installations(os.devnull, fmt, compress=compress)
+        return count, time.perf_counter() - start, peak_rss_mb() - before
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def run(sizes, skip_baseline=False):
+    cases = [case for case in CASES if case[0] != "parquet" or has_pyarrow()]
+    if not skip_baseline:
+        cases.append(("baseline", False))
+    # A fresh interpreter per export, so each peak RSS is its own
+    context = multiprocessing.get_context("spawn")
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "bench.db")
+            with ToolTrackerDB(db_path) as db:
+                start = time.perf_counter()
+                total = datagen.populate(db, rows)
+            print(f"generated {total:,} installations in {time.perf_counter() - start:.1f}s")
+            for fmt, compress in cases:
+                with context.Pool(1) as pool:
+                    count, elapsed, growth = pool.apply(export_child, (db_path, fmt, compress))
+                label = fmt + (",gzip" if compress else "")
+                print(f"  {label:>12}: {count / elapsed:10,.0f} records/sec "
+                      f"{elapsed:7.2f}s  peak RSS +{growth:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Database sizes to export")
+    parser.add_argument("--skip-baseline", action="store_true",
+                        help="Do not run the load-everything baseline")
+    args = parser.parse_args()
+    run(args.rows, args.skip_baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: fleet-wide reads over many site databases, one by one vs federated
+
+Generates one seeded site database (see benchmarks.datagen) and copies
+it to ``--sites`` files, then times fleet statistics, a search and
+filtered listings two ways: ToolTrackerDB against each file in turn,
+merging in Python afterwards, and FederatedTrackerDB. Both must return
+the same records. The federated timings of the slowest sites are
+printed for the last call.
+
+Usage:
+    python -m benchmarks.bench_federation [--sites 50] [--rows 20000]
+        [--workers 8] [--repeat 5]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+from src.federation import FEDERATION_WORKERS, FederatedTrackerDB
+
+LIMIT = 100
+
+def queries():
+    """(label, federated call, per-site call) for each fleet read"""
+    machine = datagen.machine_name(7)
+    return [
+        ("get_statistics", lambda f: f.get_statistics()["total_records"],
+         lambda db: db.get_statistics()["total_records"]),
+        ("search[limit=100]", lambda f: list(f.iter_search("tool-1", limit=LIMIT)),
+         lambda db: list(db.iter_search("tool-1", limit=LIMIT))),
+        ("list[since,limit=100]",
+         lambda f: list(f.iter_installations(since="2015-01-03", limit=LIMIT)),
+         lambda db: list(db.iter_installations(since="2015-01-03", limit=LIMIT))),
+        ("list[machine]", lambda f: list(f.iter_installations(machine_name=machine)),
+         lambda db: list(db.iter_installations(machine_name=machine))),
+    ]
+
+def one_by_one(dbs, label, call):
+    """What the fleet view replaces: each site in turn, merged afterwards"""
+    results = {site: call(db) for site, db in dbs.items()}
+    if label == "get_statistics":
+        return sum(results.values())
+    merged = [dict(record, site=site) for site, records in results.items() for record in records]
+    if label.startswith("search"):
+        return len(merged[:LIMIT])
+    merged.sort(key=lambda r: (r["installed_date"], r["id"]), reverse=True)
+    return len(merged[:LIMIT] if "limit" in label else merged)
+
+def timed(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+def run(sites, rows, workers, repeat):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = os.path.join(tmpdir, "site-000.db")
+        with ToolTrackerDB(first) as db:
+            start = time.perf_counter()
+            datagen.populate(db, rows)
+            print(f"generated {rows:,} installations in {time.perf_counter() - start:.1f}s, "
+                  f"copied to {sites} sites")
+        paths = [first]
+        for n in range(1, sites):
+            paths.append(os.path.join(tmpdir, f"site-{n:03d}.db"))
+            shutil.copyfile(first, paths[-1])
+
+        dbs = {os.path.splitext(os.path.basename(path))[0]: ToolTrackerDB(path) for path in paths}
+        with FederatedTrackerDB(paths, workers=workers) as fleet:
+            for label, federated, per_site in queries():
+                sequential_ms, expected = timed(lambda: one_by_one(dbs, label, per_site), repeat)
+                federated_ms, result = timed(lambda: federated(fleet), repeat)
+                count = result if isinstance(result, int) else len(result)
+                if count != expected:
+                    raise SystemExit(f"{label}: federated returned {count}, expected {expected}")
+                print(f"{label:>22}: one by one {sequential_ms:8.1f} ms  "
+                      f"federated {federated_ms:8.1f} ms  ({sequential_ms / federated_ms:.1f}x)")
+            print()
+            print("\n".join(fleet.timing_report().splitlines()[:6]))
+        for db in dbs.values():
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=50, help="Site databases")
+    parser.add_argument("--rows", type=int, default=20_000, help="Installations per site")
+    parser.add_argument("--workers", type=int, default=FEDERATION_WORKERS,
+                        help="Federated query threads")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median kept)")
+    args = parser.parse_args()
+    run(args.sites, args.rows, args.workers, args.repeat)
+
+if __name__ == "__main__":
+    main()
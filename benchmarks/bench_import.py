@@ -0,0 +1,61 @@
+"""Benchmark: bulk CSV import throughput
+
+Writes a synthetic CSV feed, imports it with read_records() and
+bulk_add_installations(), and checks the rows/sec target.
+
+Usage:
+    python -m benchmarks.bench_import [--rows 200000] [--target 50000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.database import ToolTrackerDB
+from src.importer import read_records
+
+def write_feed(path, rows, machines=200, tools=2000, seed=42):
+    """Write a CSV feed of unique installation events"""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["machine", "tool", "tool_type", "installed_date", "installation_time", "notes"])
+        for i in range(rows):
+            day = i // (machines * tools) + 1
+            writer.writerow([
+                f"Machine-{i % machines}",
+                f"Tool-{(i // machines) % tools}",
+                f"Type-{rng.randrange(10)}",
+                f"2025-{(day - 1) // 28 % 12 + 1:02d}-{(day - 1) % 28 + 1:02d}",
+                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+                "",
+            ])
+
+def run(rows, target):
+    tmpdir = tempfile.TemporaryDirectory()
+    feed = os.path.join(tmpdir.name, "feed.csv")
+    write_feed(feed, rows)
+    with ToolTrackerDB(os.path.join(tmpdir.name, "bench.db")) as db:
+        start = time.perf_counter()
+        result = db.bulk_add_installations(read_records(feed))
+        elapsed = time.perf_counter() - start
+    tmpdir.cleanup()
+
+    rate = result.inserted / elapsed
+    print(f"imported {result.inserted:,} rows in {elapsed:.2f}s: {rate:,.0f} rows/sec "
+          f"(target {target:,})")
+    return rate >= target
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the feed")
+    parser.add_argument("--target", type=int, default=50_000, help="Minimum rows/sec")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.rows, args.target) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: dict vs tuple vs Installation records from the readers
+
+Builds a seeded database (see benchmarks.datagen), then for each
+``row_type`` of iter_installations() times streaming every record and
+measures the memory held per record when they are all kept in a list
+(tracemalloc, so the figure includes the column strings each record
+refers to).
+
+Usage:
+    python -m benchmarks.bench_records [--rows 300000] [--repeat 3] [--db PATH]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from benchmarks import datagen
+from src.database import ROW_TYPES, ToolTrackerDB
+
+def throughput(db, row_type, repeat):
+    """Best rows/sec streaming every record of one type"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        deque(db.iter_installations(row_type=row_type), maxlen=0)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def memory_per_row(db, row_type, total):
+    """Bytes held per record when every record is kept in a list"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        records = list(db.iter_installations(row_type=row_type))
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del records
+    return held / total
+
+def run(rows, repeat, db_path=None):
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        with ToolTrackerDB(db_path or os.path.join(tmpdir.name, "bench.db")) as db:
+            total = db.get_statistics()["total_records"]
+            if not total:
+                start = time.perf_counter()
+                total = datagen.populate(db, rows)
+                print(f"generated {total:,} installations in {time.perf_counter() - start:.1f}s")
+
+            baseline = None
+            for row_type in ROW_TYPES:
+                elapsed = throughput(db, row_type, repeat)
+                per_row = memory_per_row(db, row_type, total)
+                baseline = baseline or (elapsed, per_row)
+                print(f"{row_type:>12}: {total / elapsed:10,.0f} rows/sec "
+                      f"({baseline[0] / elapsed:4.2f}x)  "
+                      f"{per_row:6.0f} bytes/row ({per_row / baseline[1]:4.2f}x)")
+    finally:
+        tmpdir.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000, help="Installations to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per row type (best is kept)")
+    parser.add_argument("--db", default=None, help="Benchmark this database instead")
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.db)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: dashboard-style repeated reads with and without the result cache
+
+Builds a seeded database (see benchmarks.datagen), then replays the same
+stream of dashboard reads (get_installations_by_machine,
+get_installations_by_tool and get_statistics, skewed towards a few
+popular machines and tools) against an uncached and a cached
+ToolTrackerDB. Every ``--write-every`` reads another connection commits
+a new installation, which the cached instance must notice.
+
+Usage:
+    python -m benchmarks.bench_result_cache [--rows 100000] [--reads 5000]
+        [--write-every 500] [--ttl SECONDS]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+
+MACHINES = 200
+TOOLS = 2000
+
+def dashboard_reads(count, seed=42):
+    """(method name, args) calls, most of them for a few popular names"""
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            calls.append(("get_installations_by_machine",
+                          (datagen.machine_name(int(rng.paretovariate(1.2)) % MACHINES),)))
+        elif kind < 0.7:
+            calls.append(("get_installations_by_tool",
+                          (datagen.tool_name(int(rng.paretovariate(1.2)) % TOOLS),)))
+        else:
+            calls.append(("get_statistics", ()))
+    return calls
+
+def replay(db, writer, calls, write_every, days):
+    """Run the calls, committing a write through ``writer`` every ``write_every``
+
+    ``days`` numbers the writes so repeated replays never insert the
+    same record twice.
+    """
+    latencies = []
+    for number, (method, args) in enumerate(calls, start=1):
+        start = time.perf_counter()
+        getattr(db, method)(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if write_every and number % write_every == 0:
+            installed = date(2200, 1, 1) + timedelta(days=next(days))
+            writer.add_installation(datagen.machine_name(0), datagen.tool_name(0),
+                                    installed.isoformat())
+    return latencies
+
+def describe(label, latencies):
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"{label:>9}: mean {statistics.mean(latencies):7.3f} ms  "
+          f"p50 {statistics.median(latencies):7.3f} ms  p99 {p99:7.3f} ms")
+    return statistics.mean(latencies)
+
+def run(rows, reads, write_every, ttl=None):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bench.db")
+        with ToolTrackerDB(path) as db:
+            start = time.perf_counter()
+            total = datagen.populate(db, rows, machines=MACHINES, tools=TOOLS)
+            print(f"generated {total:,} installations in {time.perf_counter() - start:.1f}s")
+
+        calls = dashboard_reads(reads)
+        days = itertools.count()
+        with ToolTrackerDB(path) as writer, ToolTrackerDB(path) as plain, \
+                ToolTrackerDB(path, result_cache_size=1024, result_cache_ttl=ttl) as cached:
+            uncached_mean = describe("uncached", replay(plain, writer, calls, write_every, days))
+            cached_mean = describe("cached", replay(cached, writer, calls, write_every, days))
+            info = cached.result_cache_info()
+            print(f"hit ratio: {info['hit_ratio']:.1%} ({info['hits']} hits, "
+                  f"{info['misses']} misses, {info['expired']} expired)")
+            print(f"speedup: {uncached_mean / cached_mean:.1f}x (mean latency)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Installations to generate")
+    parser.add_argument("--reads", type=int, default=5000, help="Dashboard reads to replay")
+    parser.add_argument("--write-every", type=int, default=500,
+                        help="Reads between external writes (0 for none)")
+    parser.add_argument("--ttl", type=float, default=None, help="Result cache TTL in seconds")
+    args = parser.parse_args()
+    run(args.rows, args.reads, args.write_every, args.ttl)
+
+if __name__ == "__main__":
+    main()
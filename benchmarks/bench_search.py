@@ -0,0 +1,73 @@
+"""Benchmark: FTS5 search vs LIKE scan
+
+Builds a synthetic database (1M installations by default) and times
+search_installations() through the FTS5 index and through the LIKE
+fallback for a few typical queries.
+
+Usage:
+    python -m benchmarks.bench_search [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.database import ToolTrackerDB
+
+NOTE_WORDS = ["coolant", "spindle", "aluminum", "steel", "rebuilt", "chipped",
+              "regrind", "coated", "roughing", "finishing", "titanium", "insert"]
+
+QUERIES = ["Machine-17", "Tool-1234", "titanium", "rough"]
+
+def records(rows, machines=500, tools=20000, seed=42):
+    """Yield synthetic installation records"""
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield {
+            "machine": f"Machine-{i % machines}",
+            "tool": f"Tool-{(i // machines) % tools}",
+            "tool_type": f"Type-{rng.randrange(20)}",
+            "installed_date": f"{2015 + i // (machines * tools)}-{rng.randrange(1, 13):02d}-"
+                              f"{rng.randrange(1, 29):02d}",
+            "notes": " ".join(rng.sample(NOTE_WORDS, 2)),
+        }
+
+def time_query(db, query, repeat, limit=None):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in db.iter_search(query, limit=limit))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+def run(rows, repeat):
+    tmpdir = tempfile.TemporaryDirectory()
+    with ToolTrackerDB(os.path.join(tmpdir.name, "bench.db")) as db:
+        start = time.perf_counter()
+        db.bulk_add_installations(records(rows))
+        print(f"loaded {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        for limit in (None, 100):
+            print(f"\nlimit={limit}")
+            for query in QUERIES:
+                db._has_fts = True
+                fts_time, fts_count = time_query(db, query, repeat, limit)
+                db._has_fts = False
+                like_time, like_count = time_query(db, query, repeat, limit)
+                print(f"{query!r:14s} fts {fts_time * 1000:9.2f} ms ({fts_count:7,} rows)   "
+                      f"like {like_time * 1000:9.2f} ms ({like_count:7,} rows)   "
+                      f"speedup {like_time / fts_time:8.1f}x")
+    tmpdir.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Installations to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query (best is kept)")
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
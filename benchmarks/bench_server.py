@@ -0,0 +1,139 @@
+"""Benchmark: load test of the HTTP/JSON service on loopback
+
+Generates a seeded database (see benchmarks.datagen), starts the
+``serve`` HTTP server on a free loopback port and has ``--clients``
+threads, each on one keep-alive connection, request a mix of listings,
+searches and statistics as fast as they can for ``--seconds``. Three
+phases are measured:
+
+- ``query``: the response cache is off, so every request runs its query
+- ``cached``: repeated requests are served from the response cache
+- ``not-modified``: clients poll with ``If-None-Match`` and get 304s
+
+Reports requests per second, latency percentiles and the bytes sent per
+response (gzipped where that pays) for each phase.
+
+Usage:
+    python -m benchmarks.bench_server [--rows 100000] [--clients 8]
+        [--readers 4] [--seconds 3.0]
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+from src.server import RESPONSE_CACHE_SIZE, SERVE_READERS, TrackerHTTPServer
+
+PHASES = (("query", 0, False), ("cached", RESPONSE_CACHE_SIZE, False),
+          ("not-modified", RESPONSE_CACHE_SIZE, True))
+
+def request_mix():
+    """The paths each client requests in turn"""
+    machine, tool = datagen.machine_name(7), datagen.tool_name(17)
+    return [
+        "/installations",
+        f"/machines/{machine}/installations",
+        f"/tools/{tool}/installations",
+        "/installations?active=1&limit=50",
+        "/installations?since=2015-01-03&until=2015-01-04",
+        "/search?q=coolant",
+        "/stats",
+        "/machines",
+    ]
+
+def client(address, paths, conditional, deadline, latencies, statuses, sizes):
+    """Request ``paths`` in turn on one keep-alive connection until ``deadline``"""
+    conn = http.client.HTTPConnection(*address)
+    etags = {}
+    try:
+        n = 0
+        while time.monotonic() < deadline:
+            path = paths[n % len(paths)]
+            n += 1
+            headers = {"Accept-Encoding": "gzip"}
+            if conditional and path in etags:
+                headers["If-None-Match"] = etags[path]
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status] += 1
+            sizes.append(len(body))
+            etags[path] = response.getheader("ETag")
+    finally:
+        conn.close()
+
+def load(address, paths, clients, seconds, conditional):
+    """Run ``clients`` client threads for ``seconds``; return the figures"""
+    latencies, sizes = [], []
+    # One counter per client: incrementing a shared one is not thread-safe
+    statuses = [Counter() for _ in range(clients)]
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=client, args=(address, paths[n:] + paths[:n],
+                                                     conditional, deadline, latencies,
+                                                     statuses[n], sizes))
+               for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"requests": len(latencies), "requests_per_sec": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(cuts[49] * 1000, 3), "p99_ms": round(cuts[98] * 1000, 3),
+            "bytes_per_response": round(statistics.mean(sizes)),
+            "statuses": dict(sorted(sum(statuses, Counter()).items()))}
+
+def run(db_path, rows=100_000, clients=8, readers=SERVE_READERS, seconds=3.0, log=print):
+    """Load-test a server over a generated database at ``db_path``; return the figures"""
+    report = {}
+    with ToolTrackerDB(db_path, journal_mode="wal") as db:
+        start = time.perf_counter()
+        datagen.populate(db, rows)
+        log(f"generated {rows:,} installations in {time.perf_counter() - start:.1f}s")
+        paths = request_mix()
+        for phase, cache_size, conditional in PHASES:
+            server = TrackerHTTPServer(db, port=0, readers=readers, cache_size=cache_size)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                report[phase] = load(server.server_address[:2], paths, clients, seconds,
+                                     conditional)
+            finally:
+                server.shutdown()
+                thread.join()
+                server.server_close()
+            log(f"{phase}: {report[phase]['requests_per_sec']:,.0f} requests/s")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Installations to generate")
+    parser.add_argument("--clients", type=int, default=8,
+                        help="Client threads, each with one keep-alive connection")
+    parser.add_argument("--readers", type=int, default=SERVE_READERS,
+                        help="Server threads querying the database")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Seconds per phase")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report = run(os.path.join(tmpdir, "bench.db"), args.rows, args.clients, args.readers,
+                     args.seconds)
+    print(f"{'phase':>14} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'bytes':>8}  statuses")
+    for phase, figures in report.items():
+        print(f"{phase:>14} {figures['requests']:9,d} {figures['requests_per_sec']:9,.0f} "
+              f"{figures['p50_ms']:8.2f} {figures['p99_ms']:8.2f} "
+              f"{figures['bytes_per_response']:8,d}  {figures['statuses']}")
+
+if __name__ == "__main__":
+    main()
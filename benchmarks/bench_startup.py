@@ -0,0 +1,90 @@
+"""Benchmark: CLI startup time
+
+Measures how long ``import src.cli`` takes (via ``python -X importtime``)
+and the wall time of complete ``tool-tracker`` invocations, which is
+what cron wrappers calling the CLI thousands of times a day pay.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Budget for importing src.cli, enforced by tests/test_cli.py
+IMPORT_BUDGET_MS = 100
+# Modules that must stay out of the startup path
+DEFERRED_MODULES = ("tabulate", "urllib.request", "src.profiling", "logging", "src.federation",
+                    "http.server", "src.server")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_profile():
+    """Import src.cli in a fresh interpreter; return {module: cumulative ms}"""
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.cli"],
+                                cwd=cwd, env=env, capture_output=True, text=True,
+                                check=True).stderr
+    profile = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        try:
+            profile[module.strip()] = int(cumulative) / 1000
+        except ValueError:
+            continue  # header line
+    return profile
+
+def import_time_ms(runs=3):
+    """Best-of-``runs`` time to import src.cli, in milliseconds"""
+    return min(import_profile()["src.cli"] for _ in range(runs))
+
+def invocation_ms(args, runs, env=None):
+    """Median wall time of running the CLI with ``args``, in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src.cli"] + args, cwd=ROOT, env=env,
+                       capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def interpreter_ms(runs):
+    """Median wall time of starting and exiting a bare interpreter"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def run(runs):
+    profile = import_profile()
+    print(f"import src.cli: {import_time_ms():.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    slowest = sorted(profile.items(), key=lambda item: item[1], reverse=True)[1:8]
+    for module, ms in slowest:
+        print(f"  {module:30s} {ms:8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, TOOL_TRACKER_DB=os.path.join(tmpdir, "bench.db"))
+        # Create the schema first so the timed runs see an existing database
+        invocation_ms(["stats"], 1, env)
+        print(f"\nbare interpreter          {interpreter_ms(runs):8.1f} ms")
+        for args in (["--help"], ["stats"], ["list", "--limit", "1"]):
+            print(f"tool-tracker {' '.join(args):16s} {invocation_ms(args, runs, env):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Invocations per command")
+    args = parser.parse_args()
+    run(args.runs)
+
+if __name__ == "__main__":
+    main()
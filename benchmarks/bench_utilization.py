@@ -0,0 +1,87 @@
+"""Benchmark: utilization report in SQL vs per-record Python
+
+Builds a seeded database (see benchmarks.datagen), where about two
+installations in three are closed, then times get_utilization() for
+the whole fleet against fetching every row and adding up
+utils.calculate_days_installed() per record.
+
+Usage:
+    python -m benchmarks.bench_utilization [--rows 1000000] [--repeat 3]
+        [--db PATH] [--skip-python]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+from src.utils import calculate_days_installed
+
+UNTIL = "2030-01-01"
+
+def python_report(db, since, until):
+    """Body days per tool and machine, one record at a time"""
+    per_tool = defaultdict(int)
+    per_machine = defaultdict(int)
+    for record in db.iter_installations():
+        start = max(record["installed_date"], since)
+        end = min(record["removal_date"] or until, until)
+        if start > until or end < since:
+            continue
+        days = calculate_days_installed(start, end)
+        per_tool[record["tool"]] += days
+        per_machine[record["machine"]] += days
+    return sum(per_machine.values())
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run(rows, repeat, db_path=None, skip_python=False):
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        with ToolTrackerDB(db_path or os.path.join(tmpdir.name, "bench.db")) as db:
+            total = db.get_statistics()["total_records"]
+            if not total:
+                start = time.perf_counter()
+                total = datagen.populate(db, rows)
+                print(f"generated {total:,} installations in {time.perf_counter() - start:.1f}s")
+
+            since = db.connection.execute(
+                "SELECT MIN(installed_date) FROM installations").fetchone()[0]
+            sql_time, report = best_of(repeat, lambda: db.get_utilization(since, UNTIL))
+            print(f"get_utilization:        {sql_time:8.2f}s "
+                  f"({total / sql_time:,.0f} installations/sec, "
+                  f"{report['fleet']['body_days']:,} body days)")
+
+            elapsed, _ = best_of(repeat, lambda: db.get_utilization(
+                since, UNTIL, machine_name=datagen.machine_name(0)))
+            print(f"get_utilization[machine]: {elapsed * 1000:6.1f} ms")
+
+            if not skip_python:
+                py_time, body_days = best_of(1, lambda: python_report(db, since, UNTIL))
+                print(f"per-record Python:      {py_time:8.2f}s ({body_days:,} body days)")
+                print(f"speedup: {py_time / sql_time:.1f}x")
+    finally:
+        tmpdir.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Installations to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per report (best is kept)")
+    parser.add_argument("--db", default=None, help="Benchmark this database instead")
+    parser.add_argument("--skip-python", action="store_true",
+                        help="Do not time the per-record baseline")
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.db, args.skip_python)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark: batch date/time validation against per-value strptime
+
+Generates a feed-like column of dates and times (repeating values, some
+not zero-padded and a share of bad ones) and checks it three ways:
+validate_date/validate_time on every value, normalize_date/
+normalize_time on every value, and BatchValidator over chunks. All
+three must agree on which values are valid.
+
+Usage:
+    python -m benchmarks.bench_validation [--values 1000000] [--bad 0.05]
+        [--chunk-size 5000] [--distinct N]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from src.database import BULK_CHUNK_SIZE
+from src.utils import validate_date, validate_time
+from src.validation import BatchValidator, normalize_date, normalize_time
+
+BAD_DATES = ("2025-02-30", "2025-13-01", "2025/01/01", "01-02-2025", "", "2025-1-32", "soon")
+BAD_TIMES = ("24:00:00", "12:60:00", "9:30 AM", "12:00", "noon", "00:00:60")
+
+def make_column(kind, count, bad, distinct=None, seed=42):
+    """``count`` date or time strings, a ``bad`` share of them invalid
+
+    With ``distinct`` values are drawn from that many candidates,
+    otherwise from every day of ten years or every second of a day
+    (times never have more than a day's worth).
+    """
+    rng = random.Random(seed)
+    if kind == "date":
+        span = distinct or 3653
+        start = date(2020, 1, 1)
+        def good():
+            day = start + timedelta(days=rng.randrange(span))
+            if rng.random() < 0.1:
+                return f"{day.year}-{day.month}-{day.day}"
+            return day.isoformat()
+        bad_values = BAD_DATES
+    else:
+        span = min(distinct or 86400, 86400)
+        def good():
+            second = rng.randrange(span)
+            return f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+        bad_values = BAD_TIMES
+    return [rng.choice(bad_values) if rng.random() < bad else good() for _ in range(count)]
+
+def timed(label, count, check):
+    start = time.perf_counter()
+    valid = check()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:>22}: {elapsed:6.2f}s  {count / elapsed / 1e6:6.2f}M values/sec")
+    return elapsed, valid
+
+def compare(kind, values, chunk_size):
+    validate, normalize = (validate_date, normalize_date) if kind == "date" \
+        else (validate_time, normalize_time)
+    print(f"{kind}s ({len(set(values)):,} distinct):")
+    baseline, expected = timed("per-value strptime", len(values),
+                               lambda: [validate(value) for value in values])
+    _, single = timed("per-value pattern", len(values),
+                      lambda: [normalize(value) is not None for value in values])
+
+    def batches():
+        validator = BatchValidator()
+        method = validator.normalize_dates if kind == "date" else validator.normalize_times
+        valid = []
+        for start in range(0, len(values), chunk_size):
+            valid.extend(value is not None for value in method(values[start:start + chunk_size]))
+        return valid
+    elapsed, batched = timed("BatchValidator", len(values), batches)
+    if not expected == single == batched:
+        raise SystemExit(f"{kind} validation results differ")
+    print(f"  {'speedup':>22}: {baseline / elapsed:.1f}x, "
+          f"{expected.count(False):,} invalid values agreed on")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=1_000_000, help="Values per column")
+    parser.add_argument("--bad", type=float, default=0.05, help="Share of invalid values")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE,
+                        help="Values per batch")
+    parser.add_argument("--distinct", type=int, default=None,
+                        help="Distinct valid values (default: ten years of days / a day of seconds)")
+    args = parser.parse_args()
+    for kind in ("date", "time"):
+        compare(kind, make_column(kind, args.values, args.bad, args.distinct), args.chunk_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Seeded synthetic installation data for benchmarks
+
+Generates any number of installation records (10k to 10M and beyond)
+spread over a configurable number of machines and tools. The same seed
+always produces the same records, so benchmark databases built on
+different commits hold identical data.
+
+Every machine/tool pair is installed once per cycle of ``stride`` days,
+so records never collide on the (machine, date, tool) unique key and
+arrive roughly in date order, like a real collector feed. A ``removed``
+fraction of the installations (two in three by default) is closed again
+before the pair's next cycle, so queries see a realistic mix of open and
+closed history.
+
+Usage:
+    python -m benchmarks.datagen OUTPUT [--rows 100000] [--machines 200]
+        [--tools 2000] [--removed 0.65] [--seed 42]
+
+OUTPUT ending in .csv or .jsonl writes a feed for the ``import``
+command, which carries no removals; anything else is created as a
+database.
+"""
+
+import argparse
+import csv
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator
+
+from src.database import ToolTrackerDB
+
+FIELDS = ["machine", "tool", "tool_type", "installed_date", "installation_time", "notes"]
+TOOL_TYPES = ["End-Mill", "Drill", "Tap", "Reamer", "Face-Mill", "Boring-Bar",
+              "Insert", "Chamfer", "Thread-Mill", "Slot-Cutter"]
+NOTE_WORDS = ["coolant", "spindle", "aluminum", "steel", "rebuilt", "chipped",
+              "regrind", "coated", "roughing", "finishing", "titanium", "insert",
+              "vibration", "runout", "offset", "balanced"]
+START_DATE = date(2015, 1, 1)
+# Share of generated installations that are closed again
+REMOVED = 0.65
+
+def machine_name(index: int) -> str:
+    return f"Machine-{index}"
+
+def tool_name(index: int) -> str:
+    return f"Tool-{index}"
+
+def generate_records(rows: int, machines: int = 200, tools: int = 2000, seed: int = 42,
+                     start: date = START_DATE, stride: int = 7,
+                     removed: float = REMOVED) -> Iterator[Dict]:
+    """Yield ``rows`` unique installation records
+
+    Machine and tool names are ``Machine-N`` and ``Tool-N``; each tool has
+    a fixed type, and about one record in three carries notes. About
+    ``removed`` of the records have a ``removal_date``, at most the first
+    day of the pair's next cycle; the rest have None.
+    """
+    rng = random.Random(seed)
+    pairs = machines * tools
+    for i in range(rows):
+        cycle, pair = divmod(i, pairs)
+        tool = pair // machines
+        offset = rng.randrange(stride)
+        day = start + timedelta(days=cycle * stride + offset)
+        notes = " ".join(rng.sample(NOTE_WORDS, 2)) if rng.random() < 0.35 else None
+        removal = None
+        if rng.random() < removed:
+            removal = (day + timedelta(days=rng.randint(1, stride - offset))).isoformat()
+        yield {
+            "machine": machine_name(pair % machines),
+            "tool": tool_name(tool),
+            "tool_type": TOOL_TYPES[tool % len(TOOL_TYPES)],
+            "installed_date": day.isoformat(),
+            "installation_time": f"{rng.randrange(6, 22):02d}:{rng.randrange(60):02d}:00",
+            "notes": notes,
+            "removal_date": removal,
+        }
+
+def populate(db: ToolTrackerDB, rows: int, **options) -> int:
+    """Bulk-load generated records into ``db`` and return the number inserted
+
+    Bulk loads add open installations, so the removal dates are set
+    afterwards. A load that inserts every record gives them consecutive
+    IDs in record order, which is how their rows are found; if some
+    records were already in ``db``, no removals are applied.
+    """
+    inserted = db.bulk_add_installations(generate_records(rows, **options)).inserted
+    if inserted == rows:
+        with db.transaction() as conn:
+            first_id = conn.execute("SELECT MAX(id) FROM installations").fetchone()[0] - rows
+            conn.executemany(
+                "UPDATE installations SET removal_date = ? WHERE id = ?",
+                ((record["removal_date"], first_id + number)
+                 for number, record in enumerate(generate_records(rows, **options), start=1)
+                 if record["removal_date"]))
+    return inserted
+
+def write_feed(path: str, rows: int, fmt: str = "csv", **options):
+    """Write generated records, without their removal dates, to a CSV or JSONL feed"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(generate_records(rows, **options))
+        else:
+            for record in generate_records(rows, **options):
+                f.write(json.dumps({field: record[field] for field in FIELDS}) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="Database file, or .csv/.jsonl feed")
+    parser.add_argument("--rows", type=int, default=100_000, help="Installations to generate")
+    parser.add_argument("--machines", type=int, default=200, help="Distinct machines")
+    parser.add_argument("--tools", type=int, default=2000, help="Distinct tools")
+    parser.add_argument("--removed", type=float, default=REMOVED,
+                        help="Share of installations closed again (database output only)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    options = {"machines": args.machines, "tools": args.tools, "seed": args.seed,
+               "removed": args.removed}
+
+    start = time.perf_counter()
+    extension = args.output.rsplit(".", 1)[-1].lower()
+    if extension in ("csv", "jsonl"):
+        write_feed(args.output, args.rows, extension, **options)
+        count = args.rows
+    else:
+        with ToolTrackerDB(args.output) as db:
+            count = populate(db, args.rows, **options)
+    print(f"wrote {count:,} installations to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""Benchmark suite: time every public ToolTrackerDB method and CLI command
+
+Builds a seeded synthetic database (see benchmarks.datagen), times each
+case ``--repeat`` times and writes the results as JSON, so runs on
+different commits can be compared:
+
+    python -m benchmarks.run --rows 1000000 --output before.json
+    git checkout my-branch
+    python -m benchmarks.run --rows 1000000 --output after.json --compare before.json
+
+Read cases run first, on the data as generated. Write cases then add a
+few rows each and close some installations, so pass ``--db`` only for a
+database you can throw away.
+
+Usage:
+    python -m benchmarks.run [--rows 100000] [--machines 200] [--tools 2000]
+        [--seed 42] [--repeat 5] [--db PATH] [--output results.json]
+        [--compare BASELINE.json] [--threshold 1.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+from click.testing import CliRunner
+
+from benchmarks import datagen
+from src import cli as cli_module
+from src.database import ToolTrackerDB
+from src.server import TrackerService
+
+class Context:
+    """State shared by the benchmark cases"""
+
+    def __init__(self, db, tmpdir, machines):
+        self.db = db
+        self.tmpdir = tmpdir
+        self.machines = machines
+        self.counter = 0
+        self.days = 0
+        self.closed_out = set()
+        self.runner = CliRunner()
+        self._cached = None
+        self._replica = None
+        self._service = None
+        self.synced_seq = None
+
+    @property
+    def cached(self):
+        """A second instance on the same file with the result cache enabled"""
+        if self._cached is None:
+            self._cached = ToolTrackerDB(self.db.db_path, result_cache_size=RESULT_CACHE_SIZE)
+        return self._cached
+
+    @property
+    def replica(self):
+        """A database synced from the benchmark database, from its changes so far on"""
+        if self._replica is None:
+            self._replica = ToolTrackerDB(os.path.join(self.tmpdir, "replica.db"))
+            self.synced_seq = self.db.change_seq()
+        return self._replica
+
+    @property
+    def service(self):
+        """The HTTP service's request handling, with its response cache off"""
+        if self._service is None:
+            self._service = TrackerService(self.db, cache_size=0)
+        return self._service
+
+    def close(self):
+        if self._cached is not None:
+            self._cached.close()
+        if self._replica is not None:
+            self._replica.close()
+
+    def unique(self, prefix):
+        """A name no earlier call has returned"""
+        self.counter += 1
+        return f"{prefix}-{self.counter}"
+
+    def future_date(self, days=1):
+        """Start of a run of ``days`` days after all generated and earlier dates"""
+        start = FUTURE + timedelta(days=self.days)
+        self.days += days
+        return start
+
+    def new_records(self, rows=1000):
+        """Generator options for ``rows`` records not yet in the database"""
+        # 10 machines x 100 tools: each 1000 records span one 7-day cycle.
+        # All stay open, so the write cases time only the adds.
+        return {"machines": 10, "tools": 100, "seed": self.counter, "removed": 0,
+                "start": self.future_date(7 * (rows // 1000 + 1))}
+
+    def open_pairs(self, count=1):
+        """(machine, tool) pairs with a generated installation still open"""
+        pairs = {}
+        for record in self.db.iter_installations(active=True, until=LAST_GENERATED.isoformat()):
+            pairs[(record["machine"], record["tool"])] = None
+            if len(pairs) == count:
+                break
+        return list(pairs)
+
+    def machine_to_close(self):
+        """A generated machine that still has tools installed, from the last one down"""
+        name = datagen.machine_name(self.machines - 1 - len(self.closed_out))
+        self.closed_out.add(name)
+        return name
+
+    def feed(self, rows=1000):
+        """Write a small CSV feed of records not yet in the database"""
+        path = os.path.join(self.tmpdir, f"{self.unique('feed')}.csv")
+        datagen.write_feed(path, rows, **self.new_records(rows))
+        return path
+
+    def cli(self, *args, input=None, db=None):
+        """Invoke a CLI command against the benchmark database, or ``db``"""
+        db = db or self.db
+        with mock.patch.object(cli_module, "db", db):
+            result = self.runner.invoke(cli_module.cli, ["--db", db.db_path] + list(args),
+                                        input=input)
+        if result.exit_code != 0:
+            raise RuntimeError(f"cli {' '.join(args)} failed: {result.output}") from result.exception
+        return result.output.count("\n")
+
+def drain(iterator):
+    return sum(1 for _ in iterator)
+
+MACHINE = datagen.machine_name(0)
+TOOL = datagen.tool_name(0)
+# Write cases use dates from here on, after any generated data
+FUTURE = date(2200, 1, 1)
+LAST_GENERATED = FUTURE - timedelta(days=1)
+RESULT_CACHE_SIZE = 256
+# Two days of the generated data, for the date range cases
+SINCE, UNTIL = "2015-01-03", "2015-01-04"
+
+def typical_reads(ctx):
+    """A few cheap reads of the kind the CLI makes, for the profiling cases"""
+    ctx.db.get_machine_id(MACHINE)
+    ctx.db.get_statistics()
+    return drain(ctx.db.iter_installations(machine_name=MACHINE, limit=100))
+
+def profiled_reads(ctx):
+    ctx.db.enable_profiling()
+    try:
+        typical_reads(ctx)
+    finally:
+        profiler = ctx.db.disable_profiling()
+    return len(profiler.statements)
+
+def toggle_profiling(ctx):
+    ctx.db.enable_profiling()
+    return len(ctx.db.disable_profiling().methods)
+
+def serve(ctx, path):
+    """Answer a GET as the HTTP service does, gzipped; return the body size"""
+    status, _, body = ctx.service.respond(path, accept_gzip=True)
+    if status != 200:
+        raise RuntimeError(f"GET {path} failed: {body}")
+    return len(body)
+
+# (case name, function(ctx) -> number of rows or lines produced)
+READ_CASES = [
+    ("init_database", lambda ctx: ctx.db.init_database()),
+    ("id_cache_info", lambda ctx: ctx.db.id_cache_info()),
+    ("get_machine_id", lambda ctx: ctx.db.get_machine_id(MACHINE)),
+    ("get_tool_id", lambda ctx: ctx.db.get_tool_id(TOOL)),
+    ("get_all_installations", lambda ctx: len(ctx.db.get_all_installations())),
+    ("get_installations_by_machine",
+     lambda ctx: len(ctx.db.get_installations_by_machine(MACHINE))),
+    ("get_installations_by_tool", lambda ctx: len(ctx.db.get_installations_by_tool(TOOL))),
+    ("get_installations_by_machine[cached]",
+     lambda ctx: len(ctx.cached.get_installations_by_machine(MACHINE))),
+    ("get_installations_by_tool[cached]",
+     lambda ctx: len(ctx.cached.get_installations_by_tool(TOOL))),
+    ("iter_installations", lambda ctx: drain(ctx.db.iter_installations())),
+    ("iter_installations[limit=100]", lambda ctx: drain(ctx.db.iter_installations(limit=100))),
+    ("iter_installations[machine,limit=100]",
+     lambda ctx: drain(ctx.db.iter_installations(machine_name=MACHINE, limit=100))),
+    ("iter_installations[active,limit=100]",
+     lambda ctx: drain(ctx.db.iter_installations(active=True, limit=100))),
+    ("iter_installations[since,until]",
+     lambda ctx: drain(ctx.db.iter_installations(since=SINCE, until=UNTIL))),
+    ("iter_installations[machine,since]",
+     lambda ctx: drain(ctx.db.iter_installations(machine_name=MACHINE, since=SINCE))),
+    ("iter_installations[archived,limit=100]",
+     lambda ctx: drain(ctx.db.iter_installations(archived=True, limit=100))),
+    ("iter_installations[tuple]", lambda ctx: drain(ctx.db.iter_installations(row_type="tuple"))),
+    ("iter_installations[installation]",
+     lambda ctx: drain(ctx.db.iter_installations(row_type="installation"))),
+    ("search_installations[word]", lambda ctx: len(ctx.db.search_installations("titanium"))),
+    ("search_installations[name]", lambda ctx: len(ctx.db.search_installations("Tool-17"))),
+    ("iter_search[limit=100]", lambda ctx: drain(ctx.db.iter_search("coolant", limit=100))),
+    ("get_machine_summary", lambda ctx: len(ctx.db.get_machine_summary())),
+    ("get_machine_summary[machine]", lambda ctx: len(ctx.db.get_machine_summary(MACHINE))),
+    ("get_tool_summary", lambda ctx: len(ctx.db.get_tool_summary())),
+    ("get_tool_summary[tool]", lambda ctx: len(ctx.db.get_tool_summary(TOOL))),
+    ("get_statistics", lambda ctx: len(ctx.db.get_statistics()["tools_per_machine"])),
+    ("get_statistics[cached]", lambda ctx: len(ctx.cached.get_statistics()["tools_per_machine"])),
+    ("result_cache_info", lambda ctx: ctx.cached.result_cache_info()["hits"]),
+    ("get_utilization", lambda ctx: len(ctx.db.get_utilization()["tools"])),
+    ("get_changes[5000]", lambda ctx: len(ctx.db.get_changes(0, 5000))),
+    ("change_seq", lambda ctx: ctx.db.change_seq()),
+    ("serve /installations", lambda ctx: serve(ctx, "/installations")),
+    ("serve /machines/NAME/installations",
+     lambda ctx: serve(ctx, f"/machines/{MACHINE}/installations")),
+    ("serve /search", lambda ctx: serve(ctx, "/search?q=titanium")),
+    ("serve /stats[not modified]",
+     lambda ctx: ctx.service.respond("/stats", if_none_match=ctx.service.etag())[0]),
+    ("backup", lambda ctx: ctx.db.backup(os.path.join(ctx.tmpdir, "backup.db")).pages),
+    ("cli backup", lambda ctx: ctx.cli("backup", os.path.join(ctx.tmpdir, "cli-backup.db"))),
+    ("export_installations[csv]", lambda ctx: ctx.db.export_installations(os.devnull, "csv")),
+    ("export_installations[jsonl,gzip]",
+     lambda ctx: ctx.db.export_installations(os.devnull, "jsonl", compress=True)),
+    ("typical_reads", typical_reads),
+    ("enable_profiling[typical_reads]", profiled_reads),
+    ("disable_profiling", toggle_profiling),
+    ("get_utilization[archived]", lambda ctx: len(ctx.db.get_utilization(archived=True)["tools"])),
+    ("get_utilization[machine]",
+     lambda ctx: len(ctx.db.get_utilization(machine_name=MACHINE)["tools"])),
+    ("cli list[limit=1000]", lambda ctx: ctx.cli("list", "--limit", "1000")),
+    ("cli list[machine]", lambda ctx: ctx.cli("list", "--machine", MACHINE)),
+    ("cli list[active,limit=1000]", lambda ctx: ctx.cli("list", "--active", "--limit", "1000")),
+    ("cli list[since,limit=1000]",
+     lambda ctx: ctx.cli("list", "--since", SINCE, "--limit", "1000")),
+    ("cli search[limit=1000]", lambda ctx: ctx.cli("search", "--query", "titanium",
+                                                   "--limit", "1000")),
+    ("cli search[name]", lambda ctx: ctx.cli("search", "--query", "Tool-17")),
+    ("cli stats", lambda ctx: ctx.cli("stats")),
+    ("cli machines", lambda ctx: ctx.cli("machines")),
+    ("cli machines[machine]", lambda ctx: ctx.cli("machines", "--machine", MACHINE)),
+    ("cli tools", lambda ctx: ctx.cli("tools")),
+    ("cli tools[tool]", lambda ctx: ctx.cli("tools", "--tool", TOOL)),
+    ("cli report utilization", lambda ctx: ctx.cli("report", "utilization", "--limit", "100")),
+    ("cli export[machine]", lambda ctx: ctx.cli("export", "--machine", MACHINE)),
+    ("cli stats[profile]", lambda ctx: ctx.cli("--profile", "stats")),
+]
+
+def add_in_transaction(ctx):
+    with ctx.db.transaction():
+        for _ in range(10):
+            ctx.db.add_installation(MACHINE, TOOL, ctx.future_date().isoformat())
+    return 10
+
+def apply_adds(ctx):
+    calls = [(ctx.db.add_installation, (MACHINE, TOOL, ctx.future_date().isoformat()), {})
+             for _ in range(10)]
+    return len(ctx.db.apply_writes(calls))
+
+def batch_input(ctx, events=1000):
+    """JSON lines adding ``events`` new installations"""
+    return "".join(
+        json.dumps({"op": "add", "machine": MACHINE, "tool": TOOL,
+                    "installed_date": ctx.future_date().isoformat()}) + "\n"
+        for _ in range(events))
+
+def bulk_removals(ctx, count=1000):
+    removals = [{"machine": machine, "tool": tool, "removal_date": FUTURE.isoformat()}
+                for machine, tool in ctx.open_pairs(count)]
+    return ctx.db.bulk_remove(removals).removed
+
+def cli_remove(ctx):
+    machine, tool = ctx.open_pairs()[0]
+    return ctx.cli("remove", "--machine", machine, "--tool", tool,
+                   "--removal-date", FUTURE.isoformat())
+
+def archive_machine(ctx):
+    """Close out a machine's tools, then move them to the archive"""
+    ctx.db.close_out_machine(ctx.machine_to_close(), FUTURE.isoformat())
+    return ctx.db.archive_installations((FUTURE + timedelta(days=1)).isoformat())
+
+def sync_adds(ctx):
+    """Add 1000 installations, then sync them to the replica"""
+    replica = ctx.replica
+    datagen.populate(ctx.db, 1000, **ctx.new_records(1000))
+    result = replica.sync_from(ctx.db, since=ctx.synced_seq)
+    ctx.synced_seq = result.seq
+    return result.applied
+
+def reapply_changes(ctx):
+    """Apply the last 1000 changes to a replica that already has them"""
+    changes = ctx.db.get_changes(ctx.synced_seq - 1000, 1000)
+    return len(changes) - ctx.replica.apply_changes(changes)
+
+def cli_sync(ctx):
+    replica = ctx.replica
+    datagen.populate(ctx.db, 1000, **ctx.new_records(1000))
+    lines = ctx.cli("sync", "--from", ctx.db.db_path, "--since", str(ctx.synced_seq), db=replica)
+    ctx.synced_seq = replica.sync_from(ctx.db).seq
+    return lines
+
+def close_and_reconnect(ctx):
+    ctx.db.close()
+    return ctx.db.get_machine_id(MACHINE)
+
+WRITE_CASES = [
+    ("add_machine", lambda ctx: ctx.db.add_machine(ctx.unique("Bench-Machine"))),
+    ("add_tool", lambda ctx: ctx.db.add_tool(ctx.unique("Bench-Tool"), "Bench")),
+    ("add_installation",
+     lambda ctx: ctx.db.add_installation(MACHINE, TOOL, ctx.future_date().isoformat())),
+    ("transaction[10 adds]", add_in_transaction),
+    ("apply_writes[10 adds]", apply_adds),
+    ("bulk_add_installations[1000]",
+     lambda ctx: datagen.populate(ctx.db, 1000, **ctx.new_records(1000))),
+    ("remove_installation",
+     lambda ctx: ctx.db.remove_installation(*ctx.open_pairs()[0], FUTURE.isoformat())),
+    ("bulk_remove[1000]", bulk_removals),
+    ("close_out_machine",
+     lambda ctx: ctx.db.close_out_machine(ctx.machine_to_close(), FUTURE.isoformat())),
+    ("rebuild_statistics", lambda ctx: ctx.db.rebuild_statistics()),
+    ("archive_installations[machine]", archive_machine),
+    ("sync_from[1000 adds]", sync_adds),
+    ("apply_changes[1000, already applied]", reapply_changes),
+    ("close", close_and_reconnect),
+    ("cli add", lambda ctx: ctx.cli("add", "--machine", MACHINE, "--tool", TOOL,
+                                    "--installed-date", ctx.future_date().isoformat())),
+    ("cli import[1000]", lambda ctx: ctx.cli("import", ctx.feed(1000))),
+    ("cli remove", cli_remove),
+    ("cli remove[all]", lambda ctx: ctx.cli("remove", "--machine", ctx.machine_to_close(),
+                                            "--all", "--removal-date", FUTURE.isoformat())),
+    ("cli stats[rebuild]", lambda ctx: ctx.cli("stats", "--rebuild")),
+    ("cli batch[1000 adds]", lambda ctx: ctx.cli("batch", input=batch_input(ctx))),
+    ("cli sync[1000 adds]", cli_sync),
+    # Last: the planner statistics it gathers can change the plans of later cases
+    ("maintain", lambda ctx: ctx.db.maintain().tables_checked),
+]
+
+CASES = READ_CASES + WRITE_CASES
+
+def time_case(func, ctx, repeat):
+    """Run one case ``repeat`` times and summarise the timings in milliseconds"""
+    timings = []
+    size = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = func(ctx)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.mean(timings), 4),
+        "repeat": repeat,
+        "size": size if isinstance(size, int) else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(rows=100_000, machines=200, tools=2000, seed=42, repeat=5, db_path=None,
+        cases=None, log=print):
+    """Build (or reuse) a database, time the cases and return the report"""
+    tmpdir = tempfile.TemporaryDirectory()
+    path = db_path or os.path.join(tmpdir.name, "bench.db")
+    try:
+        with ToolTrackerDB(path) as db:
+            if db_path is None or not db.get_statistics()["total_records"]:
+                start = time.perf_counter()
+                datagen.populate(db, rows, machines=machines, tools=tools, seed=seed)
+                log(f"generated {rows:,} installations in {time.perf_counter() - start:.1f}s")
+            total = db.get_statistics()["total_records"]
+
+            ctx = Context(db, tmpdir.name, machines)
+            results = {}
+            try:
+                for name, func in cases or CASES:
+                    results[name] = time_case(func, ctx, repeat)
+                    log(f"{name:40s} {results[name]['median_ms']:12.3f} ms")
+                result_cache = ctx.cached.result_cache_info()
+            finally:
+                ctx.close()
+            log(f"result cache: {result_cache['hits']} hits, {result_cache['misses']} misses "
+                f"({result_cache['hit_ratio']:.0%} hit ratio)")
+            # Median speedup of each cached case over the same call uncached
+            result_cache["speedups"] = {}
+            for name, result in results.items():
+                uncached = results.get(name.replace("[cached]", ""))
+                if name.endswith("[cached]") and uncached and result["median_ms"]:
+                    speedup = round(uncached["median_ms"] / result["median_ms"], 2)
+                    result_cache["speedups"][name] = speedup
+                    log(f"  {name:38s} {speedup:8.1f}x faster")
+    finally:
+        tmpdir.cleanup()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "rows": total,
+            "machines": machines,
+            "tools": tools,
+            "seed": seed,
+        },
+        "results": results,
+        "result_cache": result_cache,
+    }
+
+def compare(report, baseline, threshold=1.25, log=print):
+    """Print median-time ratios against a baseline report; return the regressions"""
+    regressions = []
+    log(f"\n{'case':40s} {'baseline':>12s} {'current':>12s} {'ratio':>8s}")
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            log(f"{name:40s} {'-':>12s} {result['median_ms']:12.3f}      new")
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        flag = " SLOWER" if ratio > threshold else ""
+        log(f"{name:40s} {base['median_ms']:12.3f} {result['median_ms']:12.3f} "
+            f"{ratio:8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Installations to generate")
+    parser.add_argument("--machines", type=int, default=200, help="Distinct machines")
+    parser.add_argument("--tools", type=int, default=2000, help="Distinct tools")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case")
+    parser.add_argument("--db", default=None,
+                        help="Benchmark this database instead of a generated one")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON report path")
+    parser.add_argument("--compare", default=None, help="Baseline JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Median-time ratio reported as a regression")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.machines, args.tools, args.seed, args.repeat, args.db)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.threshold}x baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
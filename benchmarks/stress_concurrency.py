@@ -0,0 +1,117 @@
+"""Stress test: several processes writing and reading one database file
+
+Starts writer processes that add installations and reader processes that
+list records and compute statistics, all against the same file for a
+fixed duration, then reports throughput and lock errors per role.
+
+Usage:
+    python -m benchmarks.stress_concurrency [--writers 4] [--readers 4]
+        [--seconds 10] [--journal-mode wal] [--synchronous normal]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from src.database import ToolTrackerDB, is_busy_error
+
+def db_options(args):
+    """ToolTrackerDB keyword arguments for the chosen concurrency mode"""
+    return {"journal_mode": args["journal_mode"], "synchronous": args["synchronous"],
+            "busy_timeout": args["busy_timeout"]}
+
+def writer(worker, db_path, args, results):
+    """Add installations until the deadline, counting lock errors"""
+    ops = errors = 0
+    with ToolTrackerDB(db_path, **db_options(args)) as db:
+        deadline = time.monotonic() + args["seconds"]
+        while time.monotonic() < deadline:
+            try:
+                installed = date(2000, 1, 1) + timedelta(days=ops // 50)
+                db.add_installation(f"Machine-{worker}", f"Tool-{ops % 50}",
+                                    installed.isoformat(), notes=f"writer {worker} op {ops}")
+                ops += 1
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                errors += 1
+        results.put(("writer", ops, errors, db.busy_retries))
+
+def reader(worker, db_path, args, results):
+    """Page through records and read statistics until the deadline"""
+    ops = errors = 0
+    with ToolTrackerDB(db_path, **db_options(args)) as db:
+        deadline = time.monotonic() + args["seconds"]
+        while time.monotonic() < deadline:
+            try:
+                for _ in db.iter_installations(limit=100):
+                    pass
+                db.get_statistics()
+                ops += 1
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                errors += 1
+        results.put(("reader", ops, errors, db.busy_retries))
+
+def run(db_path, writers, readers, seconds, journal_mode=None, synchronous=None,
+        busy_timeout=5.0):
+    """Run the workers against ``db_path`` and return per-role totals"""
+    args = {"seconds": seconds, "journal_mode": journal_mode,
+            "synchronous": synchronous, "busy_timeout": busy_timeout}
+    # Create the schema up front so workers do not race on migrations
+    ToolTrackerDB(db_path, **db_options(args)).close()
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=writer, args=(i, db_path, args, results))
+                 for i in range(writers)]
+    processes += [multiprocessing.Process(target=reader, args=(i, db_path, args, results))
+                  for i in range(readers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    totals = {role: {"ops": 0, "lock_errors": 0, "busy_retries": 0}
+              for role in ("writer", "reader")}
+    for role, ops, errors, retries in reports:
+        totals[role]["ops"] += ops
+        totals[role]["lock_errors"] += errors
+        totals[role]["busy_retries"] += retries
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--journal-mode", default="wal")
+    parser.add_argument("--synchronous", default="normal")
+    parser.add_argument("--busy-timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        totals = run(db_path, args.writers, args.readers, args.seconds,
+                     args.journal_mode, args.synchronous, args.busy_timeout)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print(f"journal_mode={args.journal_mode} synchronous={args.synchronous} "
+          f"busy_timeout={args.busy_timeout}s, {args.seconds:g}s run")
+    for role, counts in totals.items():
+        rate = counts["ops"] / args.seconds
+        print(f"{role + 's':8s} {counts['ops']:8,d} ops {rate:10,.0f} ops/sec "
+              f"{counts['lock_errors']:6,d} lock errors "
+              f"{counts['busy_retries']:6,d} retries")
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ setup(
     version="1.0.0",
     description="A program to track tool body time installed on machines",
     author="Your Name",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     install_requires=[
         "click>=8.1.0",
         "tabulate>=0.9.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=7.0"],
+    },
     entry_points={
         "console_scripts": [
             "tool-tracker=src.cli:main",
@@ -0,0 +1,293 @@
+"""Asyncio interface to the tool tracking database"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Union
+
+from src.database import (DB_PATH, BACKUP_STEP_PAGES, BULK_CHUNK_SIZE, FETCH_BATCH_SIZE,
+                          SYNC_BATCH_SIZE, VACUUM_STEP_PAGES, ToolTrackerDB)
+from src.exporter import EXPORT_BATCH_SIZE
+from src.models import BackupResult, ImportResult, MaintenanceResult, RemovalResult, SyncResult
+
+READER_THREADS = 4
+# Most queued writes committed together in one transaction
+MAX_WRITE_BATCH = 500
+
+_STOP = object()
+
+class AsyncToolTrackerDB:
+    """Asyncio wrapper around ToolTrackerDB for collectors and other async code
+
+    Writes are queued to one dedicated writer thread. Whatever has queued
+    up while the previous transaction was committing, up to
+    ``max_batch`` writes, is committed as a single transaction, so many
+    concurrent coroutines cost one commit instead of one each. Each
+    awaiting coroutine gets its own result or exception once its batch
+    has committed.
+
+    Reads run on a pool of ``readers`` threads, each with its own
+    long-lived connection. Open the database with ``journal_mode="wal"``
+    so reads proceed while the writer commits. Other keyword arguments
+    are passed to ToolTrackerDB.
+
+    Use it as an async context manager, or await ``close()``, to flush
+    pending writes and release the threads.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, readers: int = READER_THREADS,
+                 max_batch: int = MAX_WRITE_BATCH, **options):
+        self.db = ToolTrackerDB(db_path, **options)
+        self.max_batch = max_batch
+        self.batches = 0
+        self._writes = queue.Queue()
+        self._readers = ThreadPoolExecutor(max_workers=readers,
+                                           thread_name_prefix="tool-tracker-reader")
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="tool-tracker-writer", daemon=True)
+        self._writer.start()
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Commit pending writes, stop the threads and close the connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        self._readers.shutdown(wait=True)
+        self.db.close()
+
+    def _write_loop(self):
+        """Writer thread: commit queued writes in batches until stopped"""
+        stopping = False
+        while not stopping:
+            batch = [self._writes.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                batch.remove(_STOP)
+                stopping = True
+            self._commit(batch)
+
+    def _commit(self, batch: List):
+        """Commit queued writes in order, batching all but bulk writes"""
+        pending = []
+        for item in batch:
+            # Bulk writes manage their own chunked transactions
+            if item[0] in (self.db.bulk_add_installations, self.db.bulk_remove,
+                           self.db.archive_installations, self.db.sync_from,
+                           self.db.maintain):
+                self._commit_batch(pending)
+                pending = []
+                method, args, kwargs, future = item
+                try:
+                    future.set_result(method(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                pending.append(item)
+        self._commit_batch(pending)
+
+    def _commit_batch(self, batch: List):
+        """Commit writes as one transaction and settle their futures"""
+        if not batch:
+            return
+        try:
+            outcomes = self.db.apply_writes([item[:3] for item in batch])
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        for (_, _, _, future), (result, error) in zip(batch, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    async def _write(self, method, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("database is closed")
+        future = Future()
+        self._writes.put((method, args, kwargs, future))
+        return await asyncio.wrap_future(future)
+
+    async def _read(self, method, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("database is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(method, *args, **kwargs))
+
+    async def _iterate(self, iterator) -> AsyncIterator[Dict]:
+        """Drain a blocking row iterator on the reader pool, one batch per hop"""
+        def next_batch():
+            return [row for _, row in zip(range(FETCH_BATCH_SIZE), iterator)]
+
+        while True:
+            rows = await self._read(next_batch)
+            for row in rows:
+                yield row
+            if len(rows) < FETCH_BATCH_SIZE:
+                return
+
+    async def add_machine(self, name: str) -> int:
+        """Add a new machine"""
+        return await self._write(self.db.add_machine, name)
+
+    async def add_tool(self, name: str, tool_type: str = None) -> int:
+        """Add a new tool"""
+        return await self._write(self.db.add_tool, name, tool_type)
+
+    async def add_installation(self, machine_name: str, tool_name: str,
+                               installed_date: str, installation_time: str = None,
+                               notes: str = None) -> int:
+        """Add an installation record"""
+        return await self._write(self.db.add_installation, machine_name, tool_name,
+                                 installed_date, installation_time, notes)
+
+    async def bulk_add_installations(self, records: Iterable[Dict],
+                                     chunk_size: int = BULK_CHUNK_SIZE) -> ImportResult:
+        """Add many installation records efficiently"""
+        return await self._write(self.db.bulk_add_installations, records, chunk_size)
+
+    async def remove_installation(self, machine_name: str, tool_name: str,
+                                  removal_date: str) -> int:
+        """Record that a tool was taken off a machine"""
+        return await self._write(self.db.remove_installation, machine_name, tool_name,
+                                 removal_date)
+
+    async def close_out_machine(self, machine_name: str, removal_date: str) -> int:
+        """Remove every tool installed on a machine as of a date"""
+        return await self._write(self.db.close_out_machine, machine_name, removal_date)
+
+    async def bulk_remove(self, removals: Iterable[Dict],
+                          chunk_size: int = BULK_CHUNK_SIZE) -> RemovalResult:
+        """Apply many removals efficiently"""
+        return await self._write(self.db.bulk_remove, removals, chunk_size)
+
+    async def archive_installations(self, before: str,
+                                    chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Move installations removed before a date to the archive"""
+        return await self._write(self.db.archive_installations, before, chunk_size)
+
+    async def apply_changes(self, changes: List[Dict], source: str = None) -> int:
+        """Apply changes read from another database"""
+        return await self._write(self.db.apply_changes, changes, source)
+
+    async def sync_from(self, source: Union[str, ToolTrackerDB], since: int = None,
+                        batch_size: int = SYNC_BATCH_SIZE) -> SyncResult:
+        """Bring this database up to date with the changes of another one"""
+        return await self._write(self.db.sync_from, source, since, batch_size)
+
+    async def maintain(self, time_budget: float = None, vacuum: bool = True,
+                       analyze: bool = True, check: bool = True, full_vacuum: bool = False,
+                       step_pages: int = VACUUM_STEP_PAGES) -> MaintenanceResult:
+        """Give free space back, refresh planner statistics and check integrity"""
+        return await self._write(self.db.maintain, time_budget, vacuum, analyze, check,
+                                 full_vacuum, step_pages)
+
+    async def get_machine_id(self, name: str) -> Optional[int]:
+        """Get machine ID by name"""
+        return await self._read(self.db.get_machine_id, name)
+
+    async def get_tool_id(self, name: str) -> Optional[int]:
+        """Get tool ID by name"""
+        return await self._read(self.db.get_tool_id, name)
+
+    async def iter_installations(self, machine_name: str = None, tool_name: str = None,
+                                 limit: int = None, offset: int = None,
+                                 after: tuple = None, active: bool = False,
+                                 row_type: str = "dict", since: str = None,
+                                 until: str = None, archived: bool = False) -> AsyncIterator:
+        """Stream installation records, newest first"""
+        iterator = await self._read(self.db.iter_installations, machine_name, tool_name,
+                                    limit, offset, after, active, FETCH_BATCH_SIZE, row_type,
+                                    since, until, archived)
+        async for row in self._iterate(iterator):
+            yield row
+
+    async def iter_search(self, query: str, limit: int = None, offset: int = None,
+                          row_type: str = "dict") -> AsyncIterator:
+        """Stream search results, best match first"""
+        iterator = await self._read(self.db.iter_search, query, limit, offset,
+                                    FETCH_BATCH_SIZE, row_type)
+        async for row in self._iterate(iterator):
+            yield row
+
+    async def export_installations(self, output: Union[str, BinaryIO], fmt: str = None,
+                                   machine_name: str = None, tool_name: str = None,
+                                   since: str = None, until: str = None,
+                                   compress: bool = None,
+                                   batch_size: int = EXPORT_BATCH_SIZE,
+                                   archived: bool = False) -> int:
+        """Write installation records to a CSV, JSONL or Parquet extract"""
+        return await self._read(self.db.export_installations, output, fmt, machine_name,
+                                tool_name, since, until, compress, batch_size, archived)
+
+    async def get_all_installations(self, since: str = None, until: str = None,
+                                    archived: bool = False) -> List[Dict]:
+        """Get all installation records"""
+        return await self._read(self.db.get_all_installations, since, until, archived)
+
+    async def get_installations_by_machine(self, machine_name: str, since: str = None,
+                                           until: str = None,
+                                           archived: bool = False) -> List[Dict]:
+        """Get all installations for a specific machine"""
+        return await self._read(self.db.get_installations_by_machine, machine_name,
+                                since, until, archived)
+
+    async def get_installations_by_tool(self, tool_name: str, since: str = None,
+                                        until: str = None,
+                                        archived: bool = False) -> List[Dict]:
+        """Get all installations for a specific tool"""
+        return await self._read(self.db.get_installations_by_tool, tool_name,
+                                since, until, archived)
+
+    async def search_installations(self, query: str) -> List[Dict]:
+        """Search installations by machine, tool name or notes"""
+        return await self._read(self.db.search_installations, query)
+
+    async def get_machine_summary(self, machine_name: str = None) -> List[Dict]:
+        """Installation counts per machine"""
+        return await self._read(self.db.get_machine_summary, machine_name)
+
+    async def get_tool_summary(self, tool_name: str = None) -> List[Dict]:
+        """Machine counts per tool"""
+        return await self._read(self.db.get_tool_summary, tool_name)
+
+    async def get_changes(self, since: int = 0, limit: int = SYNC_BATCH_SIZE) -> List[Dict]:
+        """Rows changed after a change log sequence"""
+        return await self._read(self.db.get_changes, since, limit)
+
+    async def change_seq(self) -> int:
+        """Sequence number of the latest change logged"""
+        return await self._read(self.db.change_seq)
+
+    async def backup(self, target: str, step_pages: int = BACKUP_STEP_PAGES,
+                     time_budget: float = None) -> BackupResult:
+        """Copy the database to a file while it stays in use"""
+        return await self._read(self.db.backup, target, step_pages, time_budget=time_budget)
+
+    async def get_statistics(self) -> Dict:
+        """Get statistics about tool installations"""
+        return await self._read(self.db.get_statistics)
+
+    async def get_utilization(self, since: str = None, until: str = None,
+                              machine_name: str = None, tool_name: str = None,
+                              archived: bool = False) -> Dict:
+        """Tool body time and utilization between two dates"""
+        return await self._read(self.db.get_utilization, since, until, machine_name, tool_name,
+                                archived)
@@ -0,0 +1,168 @@
+"""Run many CLI operations from one input stream in a single process"""
+
+import json
+import shlex
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from src.database import ToolTrackerDB
+from src.validation import normalize_date, normalize_time
+
+# Writes committed together in one transaction
+BATCH_GROUP_SIZE = 1000
+
+def _add(db: ToolTrackerDB, params: Dict):
+    if normalize_date(params["installed_date"]) is None:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if params.get("installation_time") and normalize_time(params["installation_time"]) is None:
+        raise ValueError("Invalid time format. Use HH:MM:SS")
+    return db.add_installation, (), params
+
+def _remove(db: ToolTrackerDB, params: Dict):
+    if normalize_date(params["removal_date"]) is None:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if params.get("tool"):
+        return db.remove_installation, (), params
+    # Without a tool, close out the whole machine
+    params = {name: value for name, value in params.items() if name != "tool"}
+    return db.close_out_machine, (), params
+
+def _list(db: ToolTrackerDB, params: Dict):
+    return list(db.iter_installations(
+        machine_name=params.get("machine"),
+        tool_name=params.get("tool"),
+        active=_flag(params, "active"),
+        limit=_integer(params, "limit"),
+        offset=_integer(params, "offset"),
+        since=params.get("since"),
+        until=params.get("until"),
+        archived=_flag(params, "archived")
+    ))
+
+def _search(db: ToolTrackerDB, params: Dict):
+    return list(db.iter_search(params["query"], limit=_integer(params, "limit")))
+
+def _stats(db: ToolTrackerDB, params: Dict):
+    return db.get_statistics()
+
+# op -> (handler, required fields, optional fields, is_write). A write
+# handler validates its parameters and returns the call to make inside
+# the batch's transaction; a read handler returns the result directly.
+OPERATIONS: Dict[str, Tuple[Callable, Tuple[str, ...], Tuple[str, ...], bool]] = {
+    "add": (_add, ("machine", "tool", "installed_date"),
+            ("installation_time", "notes"), True),
+    "remove": (_remove, ("machine", "removal_date"), ("tool",), True),
+    "list": (_list, (), ("machine", "tool", "limit", "offset", "active",
+                         "since", "until", "archived"), False),
+    "search": (_search, ("query",), ("limit",), False),
+    "stats": (_stats, (), (), False),
+}
+
+# Field names accepted in place of the CLI's option names
+FIELD_ALIASES = {"machine_name": "machine", "tool_name": "tool"}
+CALL_NAMES = {"machine": "machine_name", "tool": "tool_name"}
+
+def _integer(params: Dict, name: str):
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+
+def _flag(params: Dict, name: str) -> bool:
+    value = params.get(name, False)
+    if isinstance(value, str):
+        if value.lower() not in ("true", "false", "1", "0", "yes", "no"):
+            raise ValueError(f"'{name}' must be true or false")
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+def parse_operation(line: str) -> Tuple[str, Dict]:
+    """Parse one input line into an operation name and its parameters
+
+    A line is either a JSON object with an ``op`` key, such as
+    ``{"op": "add", "machine": "M1", "tool": "T1", "installed_date": "2025-01-01"}``,
+    or a command in CLI syntax, such as
+    ``add --machine M1 --tool T1 --installed-date 2025-01-01``.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            params = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON ({e.msg})")
+        if not isinstance(params, dict):
+            raise ValueError("expected a JSON object")
+        op = params.pop("op", None)
+    else:
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            raise ValueError(f"cannot parse command ({e})")
+        op, options = words[0], words[1:]
+        if len(options) % 2 or not all(name.startswith("--") for name in options[::2]):
+            raise ValueError("expected '--option value' pairs after the command")
+        params = {name[2:].replace("-", "_"): value
+                  for name, value in zip(options[::2], options[1::2])}
+
+    if op not in OPERATIONS:
+        raise ValueError(f"unknown operation '{op}'. Use one of: {', '.join(OPERATIONS)}")
+    _, required, optional, _ = OPERATIONS[op]
+    params = {FIELD_ALIASES.get(name, name): value for name, value in params.items()}
+    missing = [name for name in required if params.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"'{op}' needs {', '.join(missing)}")
+    unknown = sorted(set(params) - set(required) - set(optional))
+    if unknown:
+        raise ValueError(f"'{op}' does not take {', '.join(unknown)}")
+    return op, params
+
+def run_batch(db: ToolTrackerDB, lines: Iterable[str],
+              group_size: int = BATCH_GROUP_SIZE) -> Iterator[Dict]:
+    """Run operations from ``lines`` and yield one result per operation
+
+    Consecutive writes are committed together, up to ``group_size`` per
+    transaction, each in its own savepoint so one failing write does not
+    undo the others. A write's result is yielded once its group has
+    committed; a read first commits any pending writes so it sees them.
+    Results are dicts with the input ``line`` number and either
+    ``"ok": true`` and a ``result``, or ``"ok": false`` and an ``error``.
+    """
+    # (line number, call, parse error) for writes and errors awaiting commit
+    pending: List[Tuple[int, Tuple, Exception]] = []
+
+    def commit():
+        calls = [call for _, call, _ in pending if call]
+        outcomes = iter(db.apply_writes(calls) if calls else [])
+        for number, call, error in pending:
+            yield _outcome(number, *(next(outcomes) if call else (None, error)))
+        pending.clear()
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            op, params = parse_operation(line)
+            handler, _, _, is_write = OPERATIONS[op]
+            if is_write:
+                method, args, params = handler(db, params)
+                kwargs = {CALL_NAMES.get(name, name): value for name, value in params.items()}
+                pending.append((number, (method, args, kwargs), None))
+                if len(pending) >= group_size:
+                    yield from commit()
+                continue
+            yield from commit()
+            yield _outcome(number, handler(db, params), None)
+        except ValueError as e:
+            if pending:
+                # Keep results in input order behind the uncommitted writes
+                pending.append((number, None, e))
+            else:
+                yield _outcome(number, None, e)
+    yield from commit()
+
+def _outcome(number: int, result, error: Exception) -> Dict:
+    if error is None:
+        return {"line": number, "ok": True, "result": result}
+    return {"line": number, "ok": False, "error": str(error)}
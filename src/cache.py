@@ -0,0 +1,128 @@
+"""In-process caches used by ToolTrackerDB"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class LRUCache:
+    """Thread-safe mapping with a size bound and least-recently-used eviction"""
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry; hit and miss counters are kept"""
+        with self._lock:
+            self._data.clear()
+    
+    def info(self) -> Dict:
+        """Hit/miss counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._data),
+        }
+
+class ResultCache(LRUCache):
+    """LRU cache of query results with an optional time to live
+    
+    Entries older than ``ttl`` seconds are treated as misses. Every
+    ``clear()`` bumps ``generation``; passing the generation read before
+    running a query to ``put()`` refuses a result that may predate a
+    write committed while it ran.
+    """
+    
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.generation = 0
+        self.expired = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss or once expired"""
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires is not None and time.monotonic() >= expires:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """Store a value unless the cache was cleared since ``generation``"""
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry and start a new generation"""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+    
+    def info(self) -> Dict:
+        """Hit/miss counters, hit ratio, expirations and current size"""
+        info = super().info()
+        lookups = info["hits"] + info["misses"]
+        info["hit_ratio"] = info["hits"] / lookups if lookups else 0.0
+        info["expired"] = self.expired
+        info["ttl"] = self.ttl
+        return info
+
+def copy_result(value: Any) -> Any:
+    """Copy a query result so callers cannot alter the cached one
+    
+    Copies two levels deep, which covers every cached result: lists of
+    flat records, and dicts of counts and flat dicts or lists.
+    """
+    if isinstance(value, list):
+        return [item.copy() if isinstance(item, (dict, list)) else item for item in value]
+    if isinstance(value, dict):
+        return {key: item.copy() if isinstance(item, (dict, list)) else item
+                for key, item in value.items()}
+    return value
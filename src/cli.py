@@ -1,16 +1,66 @@
 """Command-line interface for tool tracking"""
 
+import json
+import os
+import sys
+from datetime import date
+
 import click
-from tabulate import tabulate
-from src.database import ToolTrackerDB
-from src.utils import validate_date, validate_time, format_record
+from src.batch import BATCH_GROUP_SIZE, run_batch
+from src.database import (DB_PATH, ToolTrackerDB, BACKUP_STEP_PAGES, BULK_CHUNK_SIZE,
+                          SYNC_BATCH_SIZE, VACUUM_STEP_PAGES)
+from src.exporter import EXPORT_BATCH_SIZE, FORMATS as EXPORT_FORMATS
+from src.importer import FORMATS, read_records
+from src.utils import format_record
+from src.validation import normalize_date, normalize_time
+
+DB_ENV_VAR = 'TOOL_TRACKER_DB'
+
+# Opened by get_db() the first time a command needs it, so --help and
+# invalid arguments never touch the database
+db = None
+db_path = DB_PATH
+# Set by --profile / --slow-query-ms: None, or the slow query threshold (0 for none)
+profile_threshold = None
 
-db = ToolTrackerDB()
+def get_db() -> ToolTrackerDB:
+    """Return the CLI's database, opening it on first use"""
+    global db
+    if db is None:
+        db = ToolTrackerDB(db_path, profile=profile_threshold is not None,
+                           slow_query_ms=profile_threshold or None)
+    elif profile_threshold is not None and db.profiler is None:
+        db.enable_profiling(profile_threshold or None)
+    return db
+
+def echo_profile():
+    """Print the profile collected during the command to stderr"""
+    profiler = db.disable_profiling() if db is not None else None
+    if profiler is None:
+        click.echo("\nPROFILE: the database was not used", err=True)
+    else:
+        click.echo("\n" + profiler.report(), err=True)
 
 @click.group()
-def cli():
+@click.option('--db', 'path', envvar=DB_ENV_VAR, default=DB_PATH, show_default=True,
+              help=f'Database file (or set {DB_ENV_VAR})')
+@click.option('--profile', is_flag=True,
+              help='Print method and query timings to stderr after the command')
+@click.option('--slow-query-ms', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Log statements taking at least this long (implies --profile)')
+@click.pass_context
+def cli(ctx, path, profile, slow_query_ms):
     """Tool Body Time Tracker - Track tool installations on machines"""
-    pass
+    global db, db_path, profile_threshold
+    # Invoked again in the same process (batch runs, tests) for another database
+    if db is not None and os.path.abspath(db.db_path) != os.path.abspath(path):
+        db.close()
+        db = None
+    db_path = path
+    profile_threshold = None
+    if profile or slow_query_ms is not None:
+        profile_threshold = slow_query_ms or 0
+        ctx.call_on_close(echo_profile)
 
 @cli.command()
 @click.option('--machine', required=True, help='Machine name')
@@ -22,18 +72,21 @@ def cli():
 def add(machine, tool, installed_date, installation_time, tool_type, notes):
     """Add a new tool installation record"""
     
-    # Validate date
-    if not validate_date(installed_date):
+    # Validate and zero-pad the date
+    installed_date = normalize_date(installed_date)
+    if installed_date is None:
         click.echo("Error: Invalid date format. Use YYYY-MM-DD", err=True)
         return
     
     # Validate time if provided
-    if installation_time and not validate_time(installation_time):
-        click.echo("Error: Invalid time format. Use HH:MM:SS", err=True)
-        return
+    if installation_time:
+        installation_time = normalize_time(installation_time)
+        if installation_time is None:
+            click.echo("Error: Invalid time format. Use HH:MM:SS", err=True)
+            return
     
     try:
-        record_id = db.add_installation(
+        record_id = get_db().add_installation(
             machine_name=machine,
             tool_name=tool,
             installed_date=installed_date,
@@ -47,32 +100,117 @@ def add(machine, tool, installed_date, installation_time, tool_type, notes):
     except ValueError as e:
         click.echo(f"Error: {e}", err=True)
 
+@cli.command(name='import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Feed format (default: from file extension)')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=BULK_CHUNK_SIZE,
+              show_default=True, help='Records per transaction')
+def import_(path, fmt, chunk_size):
+    """Import installation records from a CSV or JSONL file"""
+    
+    try:
+        result = get_db().bulk_add_installations(read_records(path, fmt), chunk_size=chunk_size)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    
+    click.echo(f"✓ Imported {result.inserted} installation record(s)")
+    
+    if result.duplicates:
+        click.echo(f"\nSkipped {len(result.duplicates)} duplicate record(s):", err=True)
+        for number, machine, tool, installed_date in result.duplicates[:10]:
+            click.echo(f"  - record {number}: {machine} / {tool} on {installed_date}", err=True)
+        if len(result.duplicates) > 10:
+            click.echo(f"  ... and {len(result.duplicates) - 10} more", err=True)
+    
+    if result.errors:
+        click.echo(f"\nRejected {len(result.errors)} invalid record(s):", err=True)
+        for number, message in result.errors[:10]:
+            click.echo(f"  - record {number}: {message}", err=True)
+        if len(result.errors) > 10:
+            click.echo(f"  ... and {len(result.errors) - 10} more", err=True)
+
 @cli.command()
-@click.option('--machine', default=None, help='Filter by machine name')
-@click.option('--tool', default=None, help='Filter by tool name')
-@click.option('--limit', type=int, default=None, help='Limit number of records')
-def list(machine, tool, limit):
-    """List all installation records"""
+@click.option('--machine', default=None, help='Machine name')
+@click.option('--tool', default=None, help='Tool name')
+@click.option('--all', 'all_tools', is_flag=True, help='Remove every tool installed on the machine')
+@click.option('--removal-date', default=None, help='Removal date (YYYY-MM-DD, default: today)')
+@click.option('--file', 'path', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='CSV or JSONL file of removals (machine, tool, removal_date)')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=BULK_CHUNK_SIZE,
+              show_default=True, help='Removals per transaction (with --file)')
+def remove(machine, tool, all_tools, removal_date, path, chunk_size):
+    """Record tools taken off machines
     
-    if machine:
-        records = db.get_installations_by_machine(machine)
-    elif tool:
-        records = db.get_installations_by_tool(tool)
-    else:
-        records = db.get_all_installations()
+    Remove one tool with --machine and --tool, every tool on a machine
+    with --machine and --all, or many at once from a --file whose rows
+    have machine, removal_date and optionally tool (a row without a tool
+    removes every tool on its machine).
+    """
     
-    if limit:
-        records = records[:limit]
+    if path:
+        if machine or tool or all_tools:
+            click.echo("Error: --file cannot be combined with --machine, --tool or --all", err=True)
+            return
+        try:
+            result = get_db().bulk_remove(read_records(path), chunk_size=chunk_size)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+        click.echo(f"✓ Closed {result.removed} installation(s)")
+        if result.errors:
+            click.echo(f"\nRejected {len(result.errors)} removal(s):", err=True)
+            for number, message in result.errors[:10]:
+                click.echo(f"  - record {number}: {message}", err=True)
+            if len(result.errors) > 10:
+                click.echo(f"  ... and {len(result.errors) - 10} more", err=True)
+        return
     
-    if not records:
-        click.echo("No records found")
+    if not machine or bool(tool) == all_tools:
+        click.echo("Error: Give --machine and either --tool or --all (or --file)", err=True)
         return
+    removal_date = removal_date or date.today().isoformat()
     
-    # Format records for display
-    headers = ['Machine', 'Tool', 'Tool Type', 'Installed Date', 'Time', 'Removal Date', 'Notes']
+    try:
+        if all_tools:
+            closed = get_db().close_out_machine(machine, removal_date)
+            click.echo(f"✓ Removed {closed} tool installation(s) from {machine} as of {removal_date}")
+        else:
+            get_db().remove_installation(machine, tool, removal_date)
+            click.echo(f"✓ Removed {tool} from {machine} on {removal_date}")
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+
+@cli.command()
+@click.option('--input', 'source', type=click.File('r'), default='-', show_default=True,
+              help='File of operations, one per line')
+@click.option('--group-size', type=click.IntRange(min=1), default=BATCH_GROUP_SIZE,
+              show_default=True, help='Writes committed per transaction')
+def batch(source, group_size):
+    """Run add, remove, list, search and stats operations read from stdin
+    
+    Each line is a JSON object such as {"op": "add", "machine": "M1", ...}
+    or a command such as: add --machine M1 --tool T1 --installed-date
+    2025-01-01. One JSON result line is written per operation.
+    """
+    for outcome in run_batch(get_db(), source, group_size):
+        click.echo(json.dumps(outcome))
+
+RECORD_HEADERS = ['Machine', 'Tool', 'Tool Type', 'Installed Date', 'Time', 'Removal Date', 'Notes']
+# Records rendered per table so output streams without loading every row
+PAGE_SIZE = 100
+
+def echo_records(records, with_site: bool = False) -> int:
+    """Print records as grid tables, one page at a time, and return the count"""
+    # Imported here: it is slow to import and most commands never need it
+    from tabulate import tabulate
+    
+    headers = ['Site'] + RECORD_HEADERS if with_site else RECORD_HEADERS
+    count = 0
     rows = []
     for record in records:
-        rows.append([
+        row = [
             record.get('machine', ''),
             record.get('tool', ''),
             record.get('tool_type', '') or '-',
@@ -80,48 +218,240 @@ def list(machine, tool, limit):
             record.get('installation_time', '') or '-',
             record.get('removal_date', '') or '-',
             record.get('notes', '') or '-'
-        ])
+        ]
+        rows.append([record['site']] + row if with_site else row)
+        if len(rows) == PAGE_SIZE:
+            click.echo(tabulate(rows, headers=headers, tablefmt='grid'))
+            count += len(rows)
+            rows = []
+    if rows:
+        click.echo(tabulate(rows, headers=headers, tablefmt='grid'))
+        count += len(rows)
+    return count
+
+@cli.command()
+@click.option('--machine', default=None, help='Filter by machine name')
+@click.option('--tool', default=None, help='Filter by tool name')
+@click.option('--limit', type=int, default=None, help='Limit number of records')
+@click.option('--offset', type=int, default=None, help='Skip this many records')
+@click.option('--active', is_flag=True, help='Only tools still installed')
+@click.option('--since', default=None, help='Installed on or after (YYYY-MM-DD)')
+@click.option('--until', default=None, help='Installed on or before (YYYY-MM-DD)')
+@click.option('--archived', is_flag=True, help='Include archived installations')
+def list(machine, tool, limit, offset, active, since, until, archived):
+    """List all installation records"""
     
-    click.echo(tabulate(rows, headers=headers, tablefmt='grid'))
-    click.echo(f"\nTotal records: {len(records)}")
+    try:
+        records = get_db().iter_installations(
+            machine_name=machine,
+            tool_name=tool,
+            active=active,
+            limit=limit or None,
+            offset=offset,
+            since=since,
+            until=until,
+            archived=archived
+        )
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    count = echo_records(records)
+    
+    if not count:
+        click.echo("No records found")
+        return
+    
+    click.echo(f"\nTotal records: {count}")
 
 @cli.command()
 @click.option('--query', required=True, help='Search query (machine, tool name, or notes)')
-def search(query):
+@click.option('--limit', type=int, default=None, help='Limit number of records')
+def search(query, limit):
     """Search installation records"""
     
-    records = db.search_installations(query)
+    try:
+        count = echo_records(get_db().iter_search(query, limit=limit or None))
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
     
-    if not records:
+    if not count:
         click.echo(f"No records found matching '{query}'")
         return
     
-    headers = ['Machine', 'Tool', 'Tool Type', 'Installed Date', 'Time', 'Removal Date', 'Notes']
-    rows = []
-    for record in records:
-        rows.append([
-            record.get('machine', ''),
-            record.get('tool', ''),
-            record.get('tool_type', '') or '-',
-            record.get('installed_date', ''),
-            record.get('installation_time', '') or '-',
-            record.get('removal_date', '') or '-',
-            record.get('notes', '') or '-'
-        ])
+    click.echo(f"\nFound {count} matching record(s)")
+
+@cli.command()
+@click.option('--output', '-o', default='-', show_default=True,
+              help='File to write (- for stdout)')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default=None,
+              help='Extract format (default: from file extension, or csv)')
+@click.option('--gzip', 'compress', is_flag=True, default=None,
+              help='Compress the extract (default: when the file name ends in .gz)')
+@click.option('--machine', default=None, help='Filter by machine name')
+@click.option('--tool', default=None, help='Filter by tool name')
+@click.option('--since', default=None, help='Installed on or after (YYYY-MM-DD)')
+@click.option('--until', default=None, help='Installed on or before (YYYY-MM-DD)')
+@click.option('--archived', is_flag=True, help='Include archived installations')
+@click.option('--batch-size', type=click.IntRange(min=1), default=EXPORT_BATCH_SIZE,
+              show_default=True, help='Records fetched and written at a time')
+def export(output, fmt, compress, machine, tool, since, until, archived, batch_size):
+    """Export installation records to CSV, JSONL or Parquet
+    
+    Records are streamed from the database oldest first, so extracts of
+    any size use a fixed amount of memory.
+    """
+    target = sys.stdout.buffer if output == '-' else output
+    try:
+        count = get_db().export_installations(
+            target, fmt=fmt, machine_name=machine, tool_name=tool,
+            since=since, until=until, compress=compress, batch_size=batch_size,
+            archived=archived
+        )
+    except (ValueError, ImportError) as e:
+        click.echo(f"Error: {e}", err=True)
+        return
     
-    click.echo(tabulate(rows, headers=headers, tablefmt='grid'))
-    click.echo(f"\nFound {len(records)} matching record(s)")
+    destination = 'stdout' if output == '-' else output
+    click.echo(f"✓ Exported {count} installation record(s) to {destination}", err=True)
 
 @cli.command()
-def stats():
-    """Display statistics"""
+@click.option('--before', required=True,
+              help='Archive installations removed before this date (YYYY-MM-DD)')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=BULK_CHUNK_SIZE,
+              show_default=True, help='Installation IDs scanned per transaction')
+def archive(before, chunk_size):
+    """Move old closed installations out of the live table
+    
+    Installations removed before --before move to the archive table.
+    Everyday commands then only read recent and open history; list,
+    export and report utilization take --archived to include it.
+    """
+    try:
+        archived = get_db().archive_installations(before, chunk_size=chunk_size)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    click.echo(f"✓ Archived {archived} installation(s) removed before {before}")
+
+@cli.command()
+@click.option('--from', 'source', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='Tracker database to copy changes from')
+@click.option('--since', type=click.IntRange(min=0), default=None,
+              help='Apply changes after this sequence number (default: where the last sync stopped)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=SYNC_BATCH_SIZE,
+              show_default=True, help='Change log entries applied per transaction')
+def sync(source, since, batch_size):
+    """Bring this database up to date with another one
+    
+    Only the changes logged in the other database since the last sync
+    are copied, so repeated syncs stay quick however large it grows.
+    """
+    try:
+        result = get_db().sync_from(source, since=since, batch_size=batch_size)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    click.echo(f"✓ Applied {result.applied} change(s) in {result.batches} batch(es), "
+               f"up to sequence {result.seq}")
+
+def progress_printer(unit: str):
+    """Progress callback printing each step to stderr at most once per 10%"""
+    shown = {}
+    
+    def show(step, done, total):
+        tenth = done * 10 // total if total else 10
+        if shown.get(step, -1) < tenth:
+            shown[step] = tenth
+            click.echo(f"  {step}: {done}/{total} {unit(step)} ({tenth * 10}%)", err=True)
+    return show
+
+@cli.command()
+@click.argument('target', type=click.Path(dir_okay=False))
+@click.option('--step-pages', type=click.IntRange(min=1), default=BACKUP_STEP_PAGES,
+              show_default=True, help='Pages copied per step')
+@click.option('--time-budget', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Give up after this many seconds')
+def backup(target, step_pages, time_budget):
+    """Copy the database to TARGET while it stays in use
+    
+    Pages are copied a few at a time, so writers are not held up; in WAL
+    mode they are never blocked. TARGET is only replaced once the copy is
+    complete.
+    """
+    db = get_db()
+    show = progress_printer(lambda step: "pages")
+    try:
+        result = db.backup(target, step_pages=step_pages, time_budget=time_budget,
+                           progress=lambda done, total: show("backup", done, total))
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    if not result.complete:
+        click.echo(f"Error: time budget ran out after {result.pages}/{result.total_pages} "
+                   f"pages; {target} was not written", err=True)
+        sys.exit(1)
+    megabytes = result.pages * db.connection.execute("PRAGMA page_size").fetchone()[0] / 1e6
+    click.echo(f"✓ Backed up {megabytes:.1f} MB to {target} in {result.seconds:.2f}s "
+               f"({megabytes / max(result.seconds, 1e-6):.1f} MB/s, "
+               f"{result.restarts} restart(s))")
+
+@cli.command()
+@click.option('--time-budget', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Stop after this many seconds; the next run carries on')
+@click.option('--full-vacuum', is_flag=True,
+              help='Rewrite the whole file if incremental vacuum is not enabled yet (blocks other users)')
+@click.option('--no-vacuum', 'vacuum', is_flag=True, flag_value=False, default=True,
+              help='Skip giving free space back')
+@click.option('--no-analyze', 'analyze', is_flag=True, flag_value=False, default=True,
+              help='Skip refreshing query planner statistics')
+@click.option('--no-check', 'check', is_flag=True, flag_value=False, default=True,
+              help='Skip the integrity check')
+@click.option('--step-pages', type=click.IntRange(min=1), default=VACUUM_STEP_PAGES,
+              show_default=True, help='Free pages given back per transaction')
+def maintain(time_budget, full_vacuum, vacuum, analyze, check, step_pages):
+    """Reclaim free space, refresh statistics and check integrity
     
-    stats = db.get_statistics()
+    Safe to run while the database is in use, for example nightly with a
+    --time-budget that fits the maintenance window.
+    """
+    units = {"vacuum": "pages", "analyze": "steps", "check": "tables"}
+    result = get_db().maintain(time_budget=time_budget, vacuum=vacuum, analyze=analyze,
+                               check=check, full_vacuum=full_vacuum, step_pages=step_pages,
+                               progress=progress_printer(units.get))
+    if vacuum:
+        click.echo(f"✓ Freed {result.pages_freed} page(s), {result.free_pages} free page(s) left")
+    if result.analyzed:
+        click.echo("✓ Refreshed query planner statistics")
+    if check:
+        click.echo(f"✓ Checked {result.tables_checked} table(s), "
+                   f"{len(result.problems)} problem(s) found")
+    if not result.complete:
+        click.echo(f"Stopped after the {time_budget}s time budget; run again to finish", err=True)
+    if result.problems:
+        for problem in result.problems[:10]:
+            click.echo(f"  - {problem}", err=True)
+        if len(result.problems) > 10:
+            click.echo(f"  ... and {len(result.problems) - 10} more", err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.option('--rebuild', is_flag=True, help='Recompute the statistics from scratch first')
+def stats(rebuild):
+    """Display statistics"""
     
+    db = get_db()
+    if rebuild:
+        db.rebuild_statistics()
+    echo_statistics(db.get_statistics(), "TOOL INSTALLATION STATISTICS")
+
+def echo_statistics(stats, title):
+    """Print the output of get_statistics()"""
     click.echo("=" * 50)
-    click.echo("TOOL INSTALLATION STATISTICS")
+    click.echo(title)
     click.echo("=" * 50)
     click.echo(f"Total Installation Records: {stats['total_records']}")
+    click.echo(f"Active Installations: {stats['active_installations']}")
     click.echo(f"Total Machines: {stats['total_machines']}")
     click.echo(f"Total Tools: {stats['total_tools']}")
     
@@ -130,63 +460,230 @@ def stats():
         click.echo("-" * 50)
         for machine, count in stats['tools_per_machine'].items():
             click.echo(f"  {machine}: {count} tool(s)")
+    
+    if stats['installations_per_tool_type']:
+        click.echo("\nInstallations per Tool Type:")
+        click.echo("-" * 50)
+        for tool_type, count in stats['installations_per_tool_type'].items():
+            click.echo(f"  {tool_type or '(none)'}: {count}")
 
 @cli.command()
 @click.option('--machine', default=None, help='Filter by machine name')
 def machines(machine):
     """List all machines or get details for a specific machine"""
     
+    db = get_db()
     if machine:
-        records = db.get_installations_by_machine(machine)
-        if records:
+        summary = db.get_machine_summary(machine)
+        if summary:
             click.echo(f"Machine: {machine}")
-            click.echo(f"Tools installed: {len(records)}")
+            click.echo(f"Tools installed: {summary[0]['installations']}")
             click.echo("\nTools:")
-            for record in records:
+            for record in db.iter_installations(machine_name=machine):
                 click.echo(f"  - {record['tool']} (installed: {record['installed_date']})")
         else:
             click.echo(f"No records found for machine '{machine}'")
     else:
-        records = db.get_all_installations()
-        machines_set = set(record['machine'] for record in records)
+        summary = db.get_machine_summary()
         
-        if not machines_set:
+        if not summary:
             click.echo("No machines found")
             return
         
         click.echo("Machines in database:")
-        for m in sorted(machines_set):
-            tool_count = len([r for r in records if r['machine'] == m])
-            click.echo(f"  - {m} ({tool_count} tool(s))")
+        for entry in summary:
+            click.echo(f"  - {entry['machine']} ({entry['installations']} tool(s))")
 
 @cli.command()
 @click.option('--tool', default=None, help='Filter by tool name')
 def tools(tool):
     """List all tools or get details for a specific tool"""
     
+    db = get_db()
     if tool:
-        records = db.get_installations_by_tool(tool)
-        if records:
+        summary = db.get_tool_summary(tool)
+        if summary:
             click.echo(f"Tool: {tool}")
-            click.echo(f"Installed on: {len(records)} machine(s)")
+            click.echo(f"Installed on: {summary[0]['machines']} machine(s)")
             click.echo("\nMachines:")
-            for record in records:
+            for record in db.iter_installations(tool_name=tool):
                 click.echo(f"  - {record['machine']} (installed: {record['installed_date']})")
         else:
             click.echo(f"No records found for tool '{tool}'")
     else:
-        records = db.get_all_installations()
-        tools_set = set((record['tool'], record['tool_type']) for record in records)
+        summary = db.get_tool_summary()
         
-        if not tools_set:
+        if not summary:
             click.echo("No tools found")
             return
         
         click.echo("Tools in database:")
-        for tool_name, tool_type in sorted(tools_set):
-            machine_count = len([r for r in records if r['tool'] == tool_name])
-            type_str = f" ({tool_type})" if tool_type else ""
-            click.echo(f"  - {tool_name}{type_str}: installed on {machine_count} machine(s)")
+        for entry in summary:
+            type_str = f" ({entry['tool_type']})" if entry['tool_type'] else ""
+            click.echo(f"  - {entry['tool']}{type_str}: installed on {entry['machines']} machine(s)")
+
+@cli.group()
+def report():
+    """Reports computed over the installation history"""
+
+@report.command()
+@click.option('--since', default=None, help='Start of the period (YYYY-MM-DD, default: first installation)')
+@click.option('--until', default=None, help='End of the period (YYYY-MM-DD, default: today)')
+@click.option('--by', type=click.Choice(['tool', 'machine']), default='tool', show_default=True,
+              help='Break the report down by tool or by machine')
+@click.option('--machine', default=None, help='Filter by machine name')
+@click.option('--tool', default=None, help='Filter by tool name')
+@click.option('--limit', type=int, default=None, help='Show only the top N entries')
+@click.option('--archived', is_flag=True, help='Include archived installations')
+@click.option('--json', 'as_json', is_flag=True, help='Print the full report as JSON')
+def utilization(since, until, by, machine, tool, limit, archived, as_json):
+    """Tool body time and utilization over a period
+
+    Utilization is body days divided by the days in the period: the share
+    of the period a tool was installed, or the average number of tools
+    installed on a machine. Open installations count up to --until.
+    """
+    try:
+        result = get_db().get_utilization(since, until, machine_name=machine, tool_name=tool,
+                                          archived=archived)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+
+    if as_json:
+        click.echo(json.dumps(result, indent=2))
+        return
+
+    fleet = result['fleet']
+    click.echo(f"Period: {result['since']} to {result['until']} ({result['days']} days)")
+    click.echo(f"Machines: {fleet['machines']}  Tools: {fleet['tools']}  "
+               f"Installations: {fleet['installations']}  Active: {fleet['active']}")
+    click.echo(f"Body time: {fleet['body_days']} days  "
+               f"Average tools per machine: {fleet['utilization']:.2f}")
+
+    entries = result['tools' if by == 'tool' else 'machines'][:limit or None]
+    if not entries:
+        click.echo("No installations in this period")
+        return
+
+    from tabulate import tabulate
+    if by == 'tool':
+        headers = ['Tool', 'Tool Type', 'Machines', 'Installations', 'Active', 'Body Days', 'Utilization']
+        rows = [[e['tool'], e['tool_type'] or '-', e['machines'], e['installations'],
+                 e['active'], e['body_days'], e['utilization']] for e in entries]
+    else:
+        headers = ['Machine', 'Tools', 'Installations', 'Active', 'Body Days', 'Utilization']
+        rows = [[e['machine'], e['tools'], e['installations'], e['active'],
+                 e['body_days'], e['utilization']] for e in entries]
+    click.echo()
+    click.echo(tabulate(rows, headers=headers, tablefmt='grid', floatfmt='.2f'))
+
+def site_options(command):
+    """Site paths and options shared by the fleet commands"""
+    command = click.argument('sites', nargs=-1, required=True,
+                             type=click.Path(exists=True, dir_okay=False))(command)
+    command = click.option('--workers', type=click.IntRange(min=1), default=None,
+                           help='Sites queried at once (default: 8)')(command)
+    return click.option('--timings', is_flag=True,
+                        help='Print the time spent on each site to stderr')(command)
+
+def open_fleet(sites, workers, timings) -> "FederatedTrackerDB":
+    """Open the fleet view, printing its timings when the command ends"""
+    # Imported here: its thread pool modules are slow to import
+    from src.federation import FederatedTrackerDB
+    
+    fleet_db = FederatedTrackerDB(sites, **({"workers": workers} if workers else {}))
+    ctx = click.get_current_context()
+    if timings:
+        ctx.call_on_close(lambda: click.echo("\n" + fleet_db.timing_report(), err=True))
+    ctx.call_on_close(fleet_db.close)
+    return fleet_db
+
+@cli.group()
+def fleet():
+    """Read several sites' databases as one fleet
+    
+    Give each site's database file as an argument; sites are named after
+    their files, or their directories when the file names are the same.
+    """
+
+@fleet.command(name='list')
+@click.option('--machine', default=None, help='Filter by machine name')
+@click.option('--tool', default=None, help='Filter by tool name')
+@click.option('--limit', type=int, default=None, help='Limit number of records')
+@click.option('--active', is_flag=True, help='Only tools still installed')
+@click.option('--since', default=None, help='Installed on or after (YYYY-MM-DD)')
+@click.option('--until', default=None, help='Installed on or before (YYYY-MM-DD)')
+@site_options
+def fleet_list(machine, tool, limit, active, since, until, sites, workers, timings):
+    """List installation records of every site, newest first"""
+    
+    try:
+        records = open_fleet(sites, workers, timings).iter_installations(
+            machine_name=machine, tool_name=tool, limit=limit or None,
+            active=active, since=since, until=until)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    count = echo_records(records, with_site=True)
+    click.echo(f"\nTotal records: {count}" if count else "No records found")
+
+@fleet.command(name='search')
+@click.option('--query', required=True, help='Search query (machine, tool name, or notes)')
+@click.option('--limit', type=int, default=None, help='Limit number of records')
+@site_options
+def fleet_search(query, limit, sites, workers, timings):
+    """Search installation records of every site"""
+    
+    try:
+        records = open_fleet(sites, workers, timings).iter_search(query, limit=limit or None)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    count = echo_records(records, with_site=True)
+    click.echo(f"\nFound {count} matching record(s)" if count
+               else f"No records found matching '{query}'")
+
+@fleet.command(name='stats')
+@site_options
+def fleet_stats(sites, workers, timings):
+    """Display statistics of the whole fleet"""
+    
+    stats = open_fleet(sites, workers, timings).get_statistics()
+    echo_statistics(stats, f"FLEET STATISTICS ({len(stats['sites'])} SITES)")
+
+@cli.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', type=click.IntRange(min=0, max=65535), default=8080, show_default=True,
+              help='Port to listen on (0 picks a free one)')
+@click.option('--readers', type=click.IntRange(min=1), default=None,
+              help='Requests queried at once, one connection each (default: 4)')
+@click.option('--log-requests', is_flag=True, help='Log each request to stderr')
+def serve(host, port, readers, log_requests):
+    """Serve the read commands as JSON over HTTP until interrupted
+    
+    GET /installations, /machines/NAME/installations,
+    /tools/NAME/installations, /search?q=QUERY, /stats, /machines or
+    /tools. Responses carry an ETag that changes with the data, so
+    clients polling with If-None-Match get 304 Not Modified cheaply.
+    """
+    # Imported here: the HTTP server modules are slow to import
+    from src.server import TrackerHTTPServer
+    
+    db = get_db()
+    try:
+        server = TrackerHTTPServer(db, host, port, log_requests=log_requests,
+                                   **({"readers": readers} if readers else {}))
+    except OSError as e:
+        click.echo(f"Error: cannot listen on {host}:{port}: {e}", err=True)
+        sys.exit(1)
+    click.echo(f"Serving {db.db_path} on {server.url} (press Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 def main():
     """Entry point for the CLI"""
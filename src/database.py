@@ -2,266 +2,1735 @@
 
 import sqlite3
 import os
-from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from functools import wraps
+from itertools import islice
+from pathlib import Path
+from typing import (TYPE_CHECKING, BinaryIO, Callable, List, Dict, Tuple, Optional, Iterator,
+                    Iterable, Union)
+
+from src.cache import LRUCache, ResultCache, copy_result
+from src.exporter import EXPORT_BATCH_SIZE, detect_format, write_rows
+from src.migrations import ROLLUP_REBUILD, SCHEMA_VERSION, get_version, has_table, migrate
+from src.models import (BackupResult, ImportResult, Installation, INSTALLATION_FIELDS,
+                        MaintenanceResult, RemovalResult, SyncResult)
+from src.utils import date_to_day, day_to_date, validate_date
+from src.validation import BatchValidator, normalize_date, normalize_time
+
+if TYPE_CHECKING:
+    from src.profiling import Profiler
 
 DB_PATH = "tool_tracker.db"
+ID_CACHE_SIZE = 4096
+BUSY_TIMEOUT = 5.0
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 2.0
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+FETCH_BATCH_SIZE = 500
+# Record types the streaming readers can return
+ROW_TYPES = ("dict", "tuple", "installation")
+BULK_CHUNK_SIZE = 5000
+# Page cache of a bulk load, in KiB: the index pages a chunk touches are
+# scattered over the indexes, and are then still cached for the next one
+BULK_CACHE_KB = 64 * 1024
+# Per-row insert triggers replaced by set-based catch-up in bulk loads
+BULK_INSERT_TRIGGERS = ("installations_fts_insert", "installations_rollup_insert",
+                        "installations_log_insert")
+# Stay below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds
+MAX_SQL_PARAMS = 500
+# Rows per multi-row INSERT in bulk loads; SQLite 3.32 raised the default
+# parameter limit from 999 to 32766
+BULK_INSERT_ROWS = 1000 if sqlite3.sqlite_version_info >= (3, 32, 0) else MAX_SQL_PARAMS // 5
+# Public methods that are not timed when profiling
+UNPROFILED_METHODS = ("close", "transaction", "id_cache_info", "result_cache_info",
+                      "enable_profiling", "disable_profiling")
+
+INSTALLATION_SELECT = """
+    SELECT 
+        i.id, m.name as machine, t.name as tool, t.type as tool_type,
+        i.installed_date, i.installation_time, i.removal_date,
+        i.notes, i.created_at
+    FROM installations i
+    JOIN machines m ON i.machine_id = m.id
+    JOIN tools t ON i.tool_id = t.id
+"""
+
+INSTALLATION_SEARCH_SELECT = """
+    SELECT 
+        i.id, m.name as machine, t.name as tool, t.type as tool_type,
+        i.installed_date, i.installation_time, i.removal_date,
+        i.notes, i.created_at
+    FROM installations_fts
+    JOIN installations i ON i.id = installations_fts.rowid
+    JOIN machines m ON i.machine_id = m.id
+    JOIN tools t ON i.tool_id = t.id
+"""
+
+# Open installations only, read through their partial index in listing
+# order: the planner has no statistics telling it how few rows it holds
+ACTIVE_INSTALLATION_SELECT = """
+    SELECT 
+        i.id, m.name as machine, t.name as tool, t.type as tool_type,
+        i.installed_date, i.installation_time, i.removal_date,
+        i.notes, i.created_at
+    FROM installations i INDEXED BY idx_installations_active_day
+    JOIN machines m ON i.machine_id = m.id
+    JOIN tools t ON i.tool_id = t.id
+"""
+
+# One half of a query across live and archived installations. The day is
+# selected too, so the two halves can be merged in order: SQLite reads
+# each through its own date index and merges them without sorting
+HISTORY_SELECT = """
+    SELECT 
+        i.id as id, m.name as machine, t.name as tool, t.type as tool_type,
+        i.installed_date, i.installation_time, i.removal_date,
+        i.notes, i.created_at, i.installed_day as installed_day
+    FROM {table} i
+    JOIN machines m ON i.machine_id = m.id
+    JOIN tools t ON i.tool_id = t.id
+"""
+
+# Columns moved, as they are, from installations to the archive
+ARCHIVE_COLUMNS = ("id, machine_id, tool_id, installed_date, installation_time, "
+                   "removal_date, notes, created_at")
+
+# Stored columns of each table the change log covers, copied as they are by sync
+SYNC_COLUMNS = {
+    "machines": ("id", "name", "created_at"),
+    "tools": ("id", "name", "type", "created_at"),
+    "installations": tuple(ARCHIVE_COLUMNS.split(", ")),
+    "installations_archive": tuple(ARCHIVE_COLUMNS.split(", ")),
+}
+# Change log entries pulled per sync batch
+SYNC_BATCH_SIZE = 5000
+# Pages copied per online backup step, and the pause between steps
+BACKUP_STEP_PAGES = 1024
+BACKUP_PAUSE = 0.005
+# Restarts caused by other writers before a backup copies from a snapshot instead
+BACKUP_MAX_RESTARTS = 3
+# Free pages given back per incremental vacuum transaction
+VACUUM_STEP_PAGES = 1024
+# SQLite virtual machine steps between time budget checks
+BUDGET_CHECK_STEPS = 10000
+
+def installation_row(cursor: sqlite3.Cursor, row: Tuple) -> Installation:
+    """Row factory building Installation records from installation queries"""
+    return Installation(*row)
+
+# Characters and keywords that mark a query as using FTS5 syntax
+FTS_SYNTAX = re.compile(r'["*()^:+]|\b(AND|OR|NOT|NEAR)\b')
+
+def to_fts_query(query: str, literal: bool = False) -> str:
+    """Translate a user search into an FTS5 MATCH expression
+    
+    Plain words become quoted prefix terms; queries that already use FTS5
+    syntax are returned unchanged. With ``literal``, every word of any
+    query is quoted as an exact term, so ``C++`` or ``10:30`` are
+    searched for rather than read as syntax.
+    """
+    if literal:
+        terms = ['"{}"'.format(word.replace('"', '""')) for word in query.split()]
+    elif FTS_SYNTAX.search(query):
+        return query
+    else:
+        terms = [f'"{word}"*' for word in query.split()]
+    return " ".join(terms) if terms else '""'
+
+def is_busy_error(error: sqlite3.OperationalError) -> bool:
+    """Whether an error means another connection holds a conflicting lock"""
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+class _StopBackup(Exception):
+    """Raised from the backup progress callback to abandon the copy"""
+
+def retry_on_busy(method):
+    """Retry a write method with exponential backoff while the database is locked
+    
+    Only the outermost call retries; nested calls fail into it so the whole
+    transaction is rerun.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self._local, "depth", 0):
+            return method(self, *args, **kwargs)
+        attempt = 0
+        while True:
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if attempt >= self.max_retries or not is_busy_error(e):
+                    raise
+                self.busy_retries += 1
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                attempt += 1
+    return wrapper
+
+def cached_result(method):
+    """Serve a read method from the result cache, when it is enabled
+    
+    Results are keyed by method and arguments. Calls inside a transaction
+    bypass the cache, since they may see uncommitted writes.
+    """
+    name = method.__name__
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self._result_cache
+        if cache.maxsize <= 0 or getattr(self._local, "depth", 0):
+            return method(self, *args, **kwargs)
+        self._sync_caches(self.connection)
+        key = (name, args, tuple(sorted(kwargs.items())))
+        result = cache.get(key)
+        if result is not None:
+            return copy_result(result)
+        generation = cache.generation
+        result = method(self, *args, **kwargs)
+        cache.put(key, copy_result(result), generation)
+        return result
+    return wrapper
 
 class ToolTrackerDB:
-    """Database handler for tool installation records"""
+    """Database handler for tool installation records
+
+    Each thread gets one long-lived connection which is reused by every
+    method. Use the instance as a context manager (or call ``close()``)
+    to release the connections when done.
+    
+    Machine and tool name->ID lookups are served from an LRU cache of
+    ``id_cache_size`` entries (0 disables it). The cache is dropped whenever
+    ``PRAGMA data_version`` shows that another connection has committed.
+    
+    For several processes sharing one file, open it with
+    ``journal_mode="wal"`` (and usually ``synchronous="normal"``): readers
+    then never block writers. In WAL mode queries run on separate
+    read-only connections unless ``read_only_queries`` is False. Writers
+    wait up to ``busy_timeout`` seconds for a lock and retry the whole
+    transaction with backoff up to ``max_retries`` times.
     
-    def __init__(self, db_path: str = DB_PATH):
+    ``profile=True`` (or a ``slow_query_ms`` threshold) turns on
+    instrumentation from the start; see ``enable_profiling()``.
+    
+    ``result_cache_size`` > 0 caches the results of the list, summary
+    and statistics methods for repeated calls with the same arguments,
+    up to ``result_cache_ttl`` seconds each. The cache is cleared when a
+    write commits through this instance or, detected with ``PRAGMA
+    data_version``, through any other connection, so it never serves
+    stale results. Callers get their own copies of cached results.
+    """
+    
+    def __init__(self, db_path: str = DB_PATH, id_cache_size: int = ID_CACHE_SIZE,
+                 journal_mode: str = None, synchronous: str = None,
+                 busy_timeout: float = BUSY_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 read_only_queries: bool = True, profile: bool = False,
+                 slow_query_ms: float = None, result_cache_size: int = 0,
+                 result_cache_ttl: float = None):
+        if journal_mode is not None and journal_mode.lower() not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode must be one of: {', '.join(JOURNAL_MODES)}")
+        if synchronous is not None and synchronous.lower() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"synchronous must be one of: {', '.join(SYNCHRONOUS_LEVELS)}")
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout = busy_timeout
+        self.max_retries = max_retries
+        self.read_only_queries = read_only_queries
+        self.busy_retries = 0
+        self._wal = False
+        self._id_cache = LRUCache(id_cache_size)
+        self._result_cache = ResultCache(result_cache_size, result_cache_ttl)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+        self.profiler = None
+        if profile or slow_query_ms is not None:
+            self.enable_profiling(slow_query_ms)
         self.init_database()
     
-    def init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create machines table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS machines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection to the database"""
+        if read_only:
+            uri = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+        else:
+            # Autocommit mode: transactions are managed explicitly by transaction()
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+        try:
+            if self.journal_mode and not read_only:
+                conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            if self.synchronous:
+                conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        if self.profiler is not None:
+            return self.profiler.wrap_connection(conn, "read" if read_only else "write")
+        return conn
+    
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread, opened on first use"""
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            conn = self._connect()
+            with self._lock:
+                self._connections.append(conn)
+                local.conn = conn
+                local.generation = self._generation
+                local.depth = 0
+                local.data_version = None
+        return local.conn
+    
+    @property
+    def read_connection(self) -> sqlite3.Connection:
+        """Connection the calling thread should use for queries
         
-        # Create tools table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tools (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                type TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        In WAL mode this is a separate read-only connection, so long reads
+        never hold up this thread's writes. Inside a transaction, or
+        outside WAL mode, it is the regular connection.
+        """
+        local = self._local
+        if not (self._wal and self.read_only_queries) or getattr(local, "depth", 0):
+            return self.connection
+        if getattr(local, "reader_generation", None) != self._generation:
+            conn = self._connect(read_only=True)
+            with self._lock:
+                self._connections.append(conn)
+                local.reader = conn
+                local.reader_generation = self._generation
+        return local.reader
+    
+    def close(self):
+        """Close every connection opened by this instance
+
+        The instance stays usable; the next call opens fresh connections.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+    
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """Run a block of statements atomically on this thread's connection
+
+        The outermost block commits on success and rolls back on error.
+        Nested blocks use savepoints so a failing inner block can be
+        rolled back without aborting the enclosing transaction.
+        ``immediate`` takes the write lock up front for the outermost
+        block, so a busy database is reported (and retried) before any
+        work is done rather than at the first write.
+        """
+        conn = self.connection
+        local = self._local
+        depth = local.depth
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT sp_{depth}")
+        local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            local.depth = depth
+            # IDs cached during the rolled back work may no longer exist
+            self._id_cache.clear()
+            if depth == 0:
+                # Interrupted statements and some I/O errors already rolled it back
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO sp_{depth}")
+                conn.execute(f"RELEASE sp_{depth}")
+            raise
+        local.depth = depth
+        if depth == 0:
+            try:
+                conn.execute("COMMIT")
+            except sqlite3.OperationalError:
+                # A busy COMMIT leaves the transaction open; undo it so the
+                # connection is usable and the caller can retry cleanly
+                self._id_cache.clear()
+                conn.execute("ROLLBACK")
+                raise
+            # Our own commits do not change this connection's data_version
+            self._result_cache.clear()
+        else:
+            conn.execute(f"RELEASE sp_{depth}")
+    
+    def _sync_caches(self, conn: sqlite3.Connection):
+        """Drop cached lookups and results if another connection committed since the last check"""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        local = self._local
+        if local.data_version != version:
+            self._id_cache.clear()
+            self._result_cache.clear()
+            local.data_version = version
+    
+    def id_cache_info(self) -> Dict:
+        """Hit/miss counters and size of the name->ID cache"""
+        return self._id_cache.info()
+    
+    def result_cache_info(self) -> Dict:
+        """Hit/miss counters, hit ratio, expirations and size of the result cache"""
+        return self._result_cache.info()
+    
+    def enable_profiling(self, slow_query_ms: float = None) -> "Profiler":
+        """Start recording timings and return the Profiler collecting them
         
-        # Create installation records table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS installations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                machine_id INTEGER NOT NULL,
-                tool_id INTEGER NOT NULL,
-                installed_date DATE NOT NULL,
-                installation_time TIME,
-                removal_date DATE,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (machine_id) REFERENCES machines(id),
-                FOREIGN KEY (tool_id) REFERENCES tools(id),
-                UNIQUE(machine_id, tool_id, installed_date)
-            )
-        """)
+        Every public method call is timed (including consuming a returned
+        iterator), and so is every SQL statement, with the rows it
+        returned or changed. Connections opened and ID cache hits are
+        counted. Statements taking ``slow_query_ms`` or longer are logged
+        to the ``tool_tracker.slow_queries`` logger. Read the results with
+        ``profiler.summary()`` or ``profiler.report()``.
         
-        conn.commit()
-        conn.close()
+        Open connections are closed so they reopen instrumented; enable
+        profiling before other threads start using the instance. While
+        disabled, nothing is wrapped and there is no overhead.
+        """
+        if self.profiler is None:
+            # Imported here: most runs never profile
+            from src.profiling import Profiler
+            self.profiler = Profiler(slow_query_ms)
+            self.profiler.add_cache("id", self._id_cache)
+            if self._result_cache.maxsize > 0:
+                self.profiler.add_cache("result", self._result_cache)
+            # Wrapped per instance, so other instances and a disabled
+            # profiler pay nothing
+            for name, attr in vars(ToolTrackerDB).items():
+                if callable(attr) and not name.startswith("_") and name not in UNPROFILED_METHODS:
+                    setattr(self, name, self.profiler.wrap_method(name, getattr(self, name)))
+            self.close()
+        else:
+            self.profiler.slow_query_ms = slow_query_ms
+        return self.profiler
+    
+    def disable_profiling(self) -> Optional["Profiler"]:
+        """Stop recording timings and return the Profiler with what was recorded"""
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            for name, attr in list(vars(self).items()):
+                if callable(attr) and hasattr(ToolTrackerDB, name):
+                    delattr(self, name)
+            self.close()
+        return profiler
     
+    @retry_on_busy
+    def init_database(self):
+        """Initialize the database, applying any pending schema migrations"""
+        conn = self.connection
+        if get_version(conn) < SCHEMA_VERSION:
+            if get_version(conn) == 0:
+                # Only takes effect before the first table is created: new
+                # databases can then give free pages back with maintain()
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            with self.transaction():
+                migrate(conn)
+        self._wal = conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        self._has_fts = has_table(conn, "installations_fts")
+        self.database_id = conn.execute(
+            "SELECT value FROM meta WHERE key = 'database_id'").fetchone()[0]
+        self._sync_caches(conn)
+    
+    @retry_on_busy
     def add_machine(self, name: str) -> int:
         """Add a new machine"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("INSERT INTO machines (name) VALUES (?)", (name,))
-            conn.commit()
-            machine_id = cursor.lastrowid
-            return machine_id
+            with self.transaction() as conn:
+                cursor = conn.execute("INSERT INTO machines (name) VALUES (?)", (name,))
+                self._id_cache.put(("machines", name), cursor.lastrowid)
+                return cursor.lastrowid
         except sqlite3.IntegrityError:
-            conn.close()
             raise ValueError(f"Machine '{name}' already exists")
-        finally:
-            conn.close()
     
+    @retry_on_busy
     def add_tool(self, name: str, tool_type: str = None) -> int:
         """Add a new tool"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO tools (name, type) VALUES (?, ?)",
-                (name, tool_type)
-            )
-            conn.commit()
-            tool_id = cursor.lastrowid
-            return tool_id
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO tools (name, type) VALUES (?, ?)",
+                    (name, tool_type)
+                )
+                self._id_cache.put(("tools", name), cursor.lastrowid)
+                return cursor.lastrowid
         except sqlite3.IntegrityError:
-            conn.close()
             raise ValueError(f"Tool '{name}' already exists")
-        finally:
-            conn.close()
     
     def get_machine_id(self, name: str) -> Optional[int]:
         """Get machine ID by name"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM machines WHERE name = ?", (name,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+        return self._get_id("machines", name)
     
     def get_tool_id(self, name: str) -> Optional[int]:
         """Get tool ID by name"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM tools WHERE name = ?", (name,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+        return self._get_id("tools", name)
+    
+    def _get_id(self, table: str, name: str) -> Optional[int]:
+        """Look up the ID of a named row in ``table``, using the ID cache"""
+        self._sync_caches(self.connection)
+        row_id = self._id_cache.get((table, name))
+        if row_id is None:
+            cursor = self.read_connection.execute(f"SELECT id FROM {table} WHERE name = ?", (name,))
+            result = cursor.fetchone()
+            if result is None:
+                return None
+            row_id = result[0]
+            self._id_cache.put((table, name), row_id)
+        return row_id
     
+    @retry_on_busy
     def add_installation(self, machine_name: str, tool_name: str, 
                         installed_date: str, installation_time: str = None,
                         notes: str = None) -> int:
-        """Add an installation record"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Add an installation record
+        
+        The date and time are stored zero-padded (``2025-3-7`` becomes
+        ``2025-03-07``); ValueError is raised if either is invalid.
+        """
+        date_value = normalize_date(installed_date)
+        if date_value is None:
+            raise ValueError(f"Invalid date '{installed_date}'. Use YYYY-MM-DD")
+        installed_date = date_value
+        if installation_time:
+            time_value = normalize_time(installation_time)
+            if time_value is None:
+                raise ValueError(f"Invalid time '{installation_time}'. Use HH:MM:SS")
+            installation_time = time_value
+        try:
+            with self.transaction() as conn:
+                # Get or create machine
+                machine_id = self.get_machine_id(machine_name)
+                if machine_id is None:
+                    machine_id = self.add_machine(machine_name)
+                
+                # Get or create tool
+                tool_id = self.get_tool_id(tool_name)
+                if tool_id is None:
+                    tool_id = self.add_tool(tool_name)
+                
+                cursor = conn.execute("""
+                    INSERT INTO installations 
+                    (machine_id, tool_id, installed_date, installation_time, notes)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (machine_id, tool_id, installed_date, installation_time, notes))
+                return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Installation record already exists for {machine_name} and {tool_name} on {installed_date}")
+    
+    @retry_on_busy
+    def remove_installation(self, machine_name: str, tool_name: str,
+                            removal_date: str) -> int:
+        """Record that a tool was taken off a machine
         
-        # Get or create machine
+        Sets ``removal_date`` on the tool's open installation on the
+        machine and returns the number of installations closed (more
+        than one only if the tool was recorded as installed twice).
+        Raises ValueError if the tool is not installed there.
+        """
+        with self.transaction() as conn:
+            return self._close_installations(conn, machine_name, tool_name, removal_date)
+    
+    @retry_on_busy
+    def close_out_machine(self, machine_name: str, removal_date: str) -> int:
+        """Remove every tool installed on a machine as of a date
+        
+        Closes all of the machine's open installations made on or before
+        ``removal_date`` with a single UPDATE and returns how many were
+        closed.
+        """
+        with self.transaction() as conn:
+            return self._close_installations(conn, machine_name, None, removal_date)
+    
+    def bulk_remove(self, removals: Iterable[Dict],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> RemovalResult:
+        """Apply many removals efficiently
+        
+        ``removals`` is any iterable of dicts with ``machine`` and
+        ``removal_date`` keys and an optional ``tool``; without a tool the
+        whole machine is closed out. Each chunk of ``chunk_size`` removals
+        is applied in one transaction. Removals that cannot be applied
+        are reported as errors instead of aborting the rest.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        result = RemovalResult()
+        validator = BatchValidator()
+        numbered = enumerate(removals, start=1)
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+            removed, errors = self._remove_chunk(chunk, validator)
+            result.removed += removed
+            result.errors.extend(errors)
+        return result
+    
+    @retry_on_busy
+    def _remove_chunk(self, chunk: List[Tuple[int, Dict]],
+                      validator: BatchValidator) -> Tuple[int, List[Tuple[int, str]]]:
+        """Apply one chunk of numbered removals in one transaction"""
+        removed = 0
+        checked, errors = validator.validate(chunk, required=("machine", "removal_date"),
+                                             dates=("removal_date",))
+        with self.transaction() as conn:
+            for number, removal in checked:
+                try:
+                    removed += self._close_installations(
+                        conn, removal["machine"], removal.get("tool") or None,
+                        removal["removal_date"])
+                except ValueError as e:
+                    errors.append((number, str(e)))
+        errors.sort()
+        return removed, errors
+    
+    def _close_installations(self, conn: sqlite3.Connection, machine_name: str,
+                             tool_name: Optional[str], removal_date: str) -> int:
+        """Set ``removal_date`` on open installations of a machine (and tool)
+        
+        Served by the partial index on open installations.
+        """
+        if not machine_name or not removal_date:
+            raise ValueError("machine and removal_date are required")
+        normalized = normalize_date(removal_date)
+        if normalized is None:
+            raise ValueError(f"Invalid date '{removal_date}'. Use YYYY-MM-DD")
+        removal_date = normalized
         machine_id = self.get_machine_id(machine_name)
         if machine_id is None:
-            machine_id = self.add_machine(machine_name)
+            raise ValueError(f"Unknown machine '{machine_name}'")
+        if tool_name is None:
+            return conn.execute("""
+                UPDATE installations INDEXED BY idx_installations_active
+                SET removal_date = ?
+                WHERE machine_id = ? AND removal_date IS NULL AND installed_date <= ?
+            """, (removal_date, machine_id, removal_date)).rowcount
         
-        # Get or create tool
         tool_id = self.get_tool_id(tool_name)
-        if tool_id is None:
-            tool_id = self.add_tool(tool_name)
+        closed = 0
+        if tool_id is not None:
+            closed = conn.execute("""
+                UPDATE installations INDEXED BY idx_installations_active
+                SET removal_date = ?
+                WHERE machine_id = ? AND tool_id = ? AND removal_date IS NULL
+                  AND installed_date <= ?
+            """, (removal_date, machine_id, tool_id, removal_date)).rowcount
+        if not closed:
+            later = tool_id is not None and conn.execute("""
+                SELECT 1 FROM installations INDEXED BY idx_installations_active
+                WHERE machine_id = ? AND tool_id = ? AND removal_date IS NULL
+            """, (machine_id, tool_id)).fetchone()
+            if later:
+                raise ValueError(f"{tool_name} was installed on {machine_name} after {removal_date}")
+            raise ValueError(f"{tool_name} is not installed on {machine_name}")
+        return closed
+    
+    def _resolve_ids(self, conn: sqlite3.Connection, table: str,
+                     names: Dict[str, Optional[str]]) -> Dict[str, int]:
+        """Map names to IDs in ``table``, creating the missing rows in bulk
+
+        ``names`` maps each name to the tool type used if the row has to be
+        created (ignored for machines).
+        """
+        def select(wanted):
+            found = {}
+            for start in range(0, len(wanted), MAX_SQL_PARAMS):
+                batch = wanted[start:start + MAX_SQL_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                for name, row_id in conn.execute(
+                    f"SELECT name, id FROM {table} WHERE name IN ({placeholders})",
+                    batch
+                ):
+                    found[name] = row_id
+                    self._id_cache.put((table, name), row_id)
+            return found
+        
+        ids = {}
+        uncached = []
+        for name in names:
+            row_id = self._id_cache.get((table, name))
+            if row_id is None:
+                uncached.append(name)
+            else:
+                ids[name] = row_id
+        if uncached:
+            ids.update(select(uncached))
+        missing = [name for name in uncached if name not in ids]
+        if missing:
+            if table == "tools":
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tools (name, type) VALUES (?, ?)",
+                    [(name, names[name]) for name in missing]
+                )
+            else:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO machines (name) VALUES (?)",
+                    [(name,) for name in missing]
+                )
+            ids.update(select(missing))
+        return ids
+    
+    @retry_on_busy
+    def apply_writes(self, calls: List[Tuple]) -> List[Tuple]:
+        """Run several write calls as one transaction
+        
+        ``calls`` are ``(method, args, kwargs)`` tuples, typically bound
+        write methods of this instance. Each runs in its own savepoint,
+        so a failing call is rolled back on its own and the rest still
+        commit. Returns a ``(result, error)`` pair per call; a busy
+        database reruns the whole group.
+        """
+        outcomes = []
+        with self.transaction():
+            for method, args, kwargs in calls:
+                try:
+                    with self.transaction():
+                        outcomes.append((method(*args, **kwargs), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+        return outcomes
+    
+    def bulk_add_installations(self, records: Iterable[Dict],
+                               chunk_size: int = BULK_CHUNK_SIZE) -> ImportResult:
+        """Add many installation records efficiently
+        
+        ``records`` is any iterable of dicts with ``machine``, ``tool`` and
+        ``installed_date`` keys and optional ``installation_time``,
+        ``tool_type`` and ``notes``. It is consumed in chunks; each chunk
+        resolves its machine/tool names in one pass and is inserted with
+        multi-row ``INSERT`` statements inside its own transaction. Rows
+        that already exist are reported as duplicates instead of aborting
+        the import.
+        
+        The search index, statistics rollups and change log are brought
+        up to date once per chunk, set-based, instead of by per-row
+        triggers.
+        
+        A load into an empty installations table (a first import) runs as
+        one transaction instead, so it is applied completely or not at
+        all, and builds the table's secondary indexes, search index,
+        rollups and change log once at the end.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        result = ImportResult()
+        # One validator for the whole feed, so repeated dates and times are checked once
+        validator = BatchValidator()
+        numbered = enumerate(records, start=1)
+        conn = self.connection
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.execute(f"PRAGMA cache_size = -{BULK_CACHE_KB}")
+        try:
+            with self._initial_load() as initial:
+                while True:
+                    chunk = list(islice(numbered, chunk_size))
+                    if not chunk:
+                        break
+                    self._insert_chunk(chunk, result, validator, catch_up=not initial)
+        finally:
+            conn.execute(f"PRAGMA cache_size = {cache_size}")
+        result.duplicates.sort()
+        return result
+    
+    @contextmanager
+    def _initial_load(self) -> Iterator[bool]:
+        """Hold a bulk load into an empty installations table in one transaction
         
+        Yields whether it does. The table's secondary indexes and per-row
+        insert triggers are then dropped for the load. Before the commit
+        the indexes are built again in one pass each, and the search
+        index, rollups and change log are brought up to date for all the
+        loaded rows at once. Other connections see none of this until the
+        commit. Loads into a table that has rows run as they are, one
+        transaction per chunk.
+        """
+        conn = self.connection
+        if conn.execute("SELECT 1 FROM installations LIMIT 1").fetchone():
+            yield False
+            return
+        with self.transaction():
+            # Rows another connection added since the check are indexed already
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM installations").fetchone()[0]
+            # The unique key's index has no SQL: it stays, to catch duplicates
+            schema = conn.execute("""
+                SELECT type, name, sql FROM sqlite_master
+                WHERE tbl_name = 'installations' AND sql IS NOT NULL
+                  AND (type = 'index' OR name IN ({}))
+            """.format(", ".join("?" * len(BULK_INSERT_TRIGGERS))), BULK_INSERT_TRIGGERS
+            ).fetchall()
+            for kind, name, _ in schema:
+                conn.execute(f"DROP {kind.upper()} {name}")
+            yield True
+            self._index_new_rows(conn, first_id)
+            for statement in ROLLUP_REBUILD:
+                conn.execute(statement)
+            for _, _, sql in schema:
+                conn.execute(sql)
+    
+    def _insert_chunk(self, chunk: List[Tuple[int, Dict]], result: ImportResult,
+                      validator: BatchValidator, catch_up: bool = True):
+        """Validate, resolve and insert one chunk of numbered records"""
+        checked, errors = validator.validate(chunk, required=("machine", "tool", "installed_date"),
+                                             dates=("installed_date",),
+                                             times=("installation_time",))
+        result.errors.extend(errors)
+        valid = []
+        machines = {}
+        tools = {}
+        for number, record in checked:
+            machine = record["machine"]
+            tool = record["tool"]
+            machines[machine] = None
+            tools.setdefault(tool, record.get("tool_type") or None)
+            valid.append((number, machine, tool, record["installed_date"],
+                          record.get("installation_time") or None, record.get("notes") or None))
+        if not valid:
+            return
+        
+        inserted, duplicates = self._write_chunk(valid, machines, tools, catch_up)
+        result.inserted += inserted
+        result.duplicates.extend(duplicates)
+    
+    @retry_on_busy
+    def _write_chunk(self, valid: List[Tuple], machines: Dict[str, None],
+                     tools: Dict[str, Optional[str]],
+                     catch_up: bool = True) -> Tuple[int, List[Tuple]]:
+        """Insert validated rows in one transaction
+        
+        Returns the number of rows inserted and the duplicates skipped.
+        Without ``catch_up`` the search index, rollups and change log are
+        left to the caller, as an initial load does.
+        """
+        duplicates = []
+        with self.transaction() as conn:
+            self._sync_caches(conn)
+            machine_ids = self._resolve_ids(conn, "machines", machines)
+            tool_ids = self._resolve_ids(conn, "tools", tools)
+            
+            # Insert parameters, and the records they came from
+            rows = []
+            records = []
+            seen = set()
+            for record in valid:
+                number, machine, tool, installed_date, installation_time, notes = record
+                key = (machine_ids[machine], tool_ids[tool], installed_date)
+                if key in seen:
+                    duplicates.append((number, machine, tool, installed_date))
+                    continue
+                seen.add(key)
+                rows.append(key + (installation_time, notes))
+                records.append(record)
+            if not catch_up:
+                return len(self._insert_rows(conn, rows, records, duplicates)), duplicates
+            
+            # Search index, rollup and change log maintenance is done
+            # set-based for the whole chunk below, with the per-row insert
+            # triggers dropped. Nothing else sees them missing, as this
+            # transaction holds the write lock throughout.
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM installations").fetchone()[0]
+            triggers = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({})"
+                .format(", ".join("?" * len(BULK_INSERT_TRIGGERS))), BULK_INSERT_TRIGGERS
+            ).fetchall()
+            for name, _ in triggers:
+                conn.execute(f"DROP TRIGGER {name}")
+            added = self._insert_rows(conn, rows, records, duplicates)
+            self._index_new_rows(conn, first_id)
+            self._add_to_rollups(conn, [row[:2] for row in added])
+            for _, sql in triggers:
+                conn.execute(sql)
+        return len(added), duplicates
+    
+    def _insert_rows(self, conn: sqlite3.Connection, rows: List[Tuple], records: List[Tuple],
+                     duplicates: List[Tuple]) -> List[Tuple]:
+        """Insert resolved rows, returning those added
+        
+        Rows that already exist are reported in ``duplicates`` from their
+        ``records``.
+        """
+        insert = """
+            INSERT INTO installations
+            (machine_id, tool_id, installed_date, installation_time, notes)
+            VALUES {}
+        """
         try:
-            cursor.execute("""
-                INSERT INTO installations 
-                (machine_id, tool_id, installed_date, installation_time, notes)
-                VALUES (?, ?, ?, ?, ?)
-            """, (machine_id, tool_id, installed_date, installation_time, notes))
-            conn.commit()
-            return cursor.lastrowid
+            with self.transaction():
+                # One statement per batch of rows rather than per row
+                for start in range(0, len(rows), BULK_INSERT_ROWS):
+                    batch = rows[start:start + BULK_INSERT_ROWS]
+                    conn.execute(insert.format(", ".join(["(?, ?, ?, ?, ?)"] * len(batch))),
+                                 [value for row in batch for value in row])
+            return rows
         except sqlite3.IntegrityError:
-            conn.close()
-            raise ValueError(f"Installation record already exists for {machine_name} and {tool_name} on {installed_date}")
+            # Some rows already exist: redo the chunk row by row to find them
+            added = []
+            for row, record in zip(rows, records):
+                try:
+                    conn.execute(insert.format("(?, ?, ?, ?, ?)"), row)
+                except sqlite3.IntegrityError:
+                    duplicates.append(record[:4])
+                else:
+                    added.append(row)
+            return added
+    
+    def _index_new_rows(self, conn: sqlite3.Connection, first_id: int):
+        """Add the installations after ``first_id`` to the search index and change log"""
+        if self._has_fts:
+            conn.execute("""
+                INSERT INTO installations_fts (rowid, machine, tool, tool_type, notes)
+                SELECT i.id, m.name, t.name, t.type, i.notes
+                FROM installations i
+                JOIN machines m ON i.machine_id = m.id
+                JOIN tools t ON i.tool_id = t.id
+                WHERE i.id > ?
+            """, (first_id,))
+        conn.execute("""
+            INSERT INTO change_log (table_name, row_id, op)
+            SELECT 'installations', id, 'insert' FROM installations WHERE id > ?
+        """, (first_id,))
+    
+    def _add_to_rollups(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        """Count newly inserted bulk rows into the rollup tables
+        
+        Set-based equivalent of the ``installations_rollup_insert`` trigger
+        for rows inserted while it was dropped. ``rows`` are the inserted
+        ``(machine_id, tool_id)`` pairs; bulk rows are always active.
+        """
+        upsert = """
+            ON CONFLICT ({key}) DO UPDATE SET
+                installations = installations + excluded.installations,
+                active = active + excluded.active
+        """
+        machine_counts = Counter(machine_id for machine_id, _ in rows)
+        tool_counts = Counter(tool_id for _, tool_id in rows)
+        conn.executemany(
+            "INSERT INTO machine_stats (machine_id, installations, active) VALUES (?, ?, ?)"
+            + upsert.format(key="machine_id"),
+            [(machine_id, count, count) for machine_id, count in machine_counts.items()]
+        )
+        conn.executemany(
+            "INSERT INTO tool_stats (tool_id, installations, active) VALUES (?, ?, ?)"
+            + upsert.format(key="tool_id"),
+            [(tool_id, count, count) for tool_id, count in tool_counts.items()]
+        )
+        conn.executemany(
+            """INSERT INTO tool_type_stats (tool_type, installations, active)
+               SELECT COALESCE(type, ''), ?, ? FROM tools WHERE id = ?"""
+            + upsert.format(key="tool_type"),
+            [(count, count, tool_id) for tool_id, count in tool_counts.items()]
+        )
+        conn.execute(
+            "UPDATE stats_totals SET installations = installations + ?, active = active + ?",
+            (len(rows), len(rows))
+        )
+    
+    @retry_on_busy
+    def rebuild_statistics(self):
+        """Recompute the statistics rollup tables from scratch
+        
+        The rollups are maintained incrementally on every write; this is
+        only needed after changing ``installations`` with triggers
+        disabled, or to check them against a full recount.
+        """
+        with self.transaction() as conn:
+            for statement in ROLLUP_REBUILD:
+                conn.execute(statement)
+    
+    def archive_installations(self, before: str, chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Move installations removed before a date to the archive
+        
+        Closed installations with a removal date before ``before`` move,
+        keeping their IDs, from ``installations`` to
+        ``installations_archive``. The live table and its indexes then
+        hold only open and recent history, so everyday writes and
+        queries stay fast however many years are kept. Readers given
+        ``archived=True`` still see both; statistics, summaries and
+        searches cover the live installations only.
+        
+        The table is walked in ID ranges of ``chunk_size``, each moved in
+        its own transaction so other writers are never held up for long.
+        Returns the number of installations archived.
+        """
+        if not validate_date(before):
+            raise ValueError("Invalid date format. Use YYYY-MM-DD")
+        cutoff = date_to_day(before)
+        first, last = self.connection.execute(
+            "SELECT MIN(id), MAX(id) FROM installations").fetchone()
+        if first is None:
+            return 0
+        return sum(self._archive_range(cutoff, start, start + chunk_size)
+                   for start in range(first, last + 1, chunk_size))
+    
+    @retry_on_busy
+    def _archive_range(self, cutoff: int, start: int, end: int) -> int:
+        """Archive the installations with IDs in [start, end) removed before day ``cutoff``"""
+        condition = "id >= ? AND id < ? AND removal_day < ?"
+        with self.transaction() as conn:
+            conn.execute(f"""
+                INSERT INTO installations_archive ({ARCHIVE_COLUMNS})
+                SELECT {ARCHIVE_COLUMNS} FROM installations WHERE {condition}
+            """, (start, end, cutoff))
+            # The delete triggers take the rows out of the rollups and search index
+            return conn.execute(f"DELETE FROM installations WHERE {condition}",
+                                (start, end, cutoff)).rowcount
+    
+    def get_changes(self, since: int = 0, limit: int = SYNC_BATCH_SIZE) -> List[Dict]:
+        """Rows changed after change log sequence ``since``, oldest change first
+        
+        Reads up to ``limit`` change log entries and returns one change
+        per row they touch: a dict with the ``table`` and ``id`` of the
+        row, ``seq``, the last of those entries for the row, and ``row``,
+        its current stored values, or None if it no longer exists. The
+        ``seq`` of the last change is where the next call continues; an
+        empty list means there are no more changes.
+        
+        A row that changed again since its last entry here is returned
+        as it is now, and again by the call covering the later change,
+        so applying the changes in order always ends in the same state.
+        """
+        conn = self.read_connection
+        entries = conn.execute(
+            "SELECT seq, table_name, row_id FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+            (since, limit)).fetchall()
+        latest = {}
+        for seq, table, row_id in entries:
+            # Keep each row once, at its latest entry
+            latest.pop((table, row_id), None)
+            latest[(table, row_id)] = seq
+        
+        ids_by_table: Dict[str, List[int]] = {}
+        for table, row_id in latest:
+            ids_by_table.setdefault(table, []).append(row_id)
+        rows = {}
+        for table, ids in ids_by_table.items():
+            columns = SYNC_COLUMNS[table]
+            for start in range(0, len(ids), MAX_SQL_PARAMS):
+                batch = ids[start:start + MAX_SQL_PARAMS]
+                placeholders = ", ".join("?" * len(batch))
+                for values in conn.execute(
+                        f"SELECT {', '.join(columns)} FROM {table} WHERE id IN ({placeholders})",
+                        batch):
+                    rows[(table, values[0])] = dict(zip(columns, values))
+        return [{"seq": seq, "table": table, "id": row_id, "row": rows.get((table, row_id))}
+                for (table, row_id), seq in latest.items()]
+    
+    def change_seq(self) -> int:
+        """Sequence number of the latest change logged, 0 before any
+        
+        Every committed write to the logged tables raises it, whichever
+        connection or process made it, so two equal readings mean the
+        data has not changed in between.
+        """
+        return self.read_connection.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    
+    @retry_on_busy
+    def apply_changes(self, changes: List[Dict], source: str = None) -> int:
+        """Apply changes read from another database by ``get_changes``
+        
+        Deleted rows are deleted and the others inserted or updated to
+        the source's values, keeping the source's IDs, all in one
+        transaction. Applying the same changes again changes nothing.
+        With a ``source`` (the other database's ``database_id``), the
+        last applied ``seq`` is recorded for it in the same transaction,
+        for ``sync_from`` to continue from. Returns the number of rows
+        inserted, updated or deleted.
+        """
+        if not changes:
+            return 0
+        deleted: Dict[str, List[Tuple]] = {table: [] for table in SYNC_COLUMNS}
+        upserted: Dict[str, List[List]] = {table: [] for table in SYNC_COLUMNS}
+        for change in changes:
+            table, row = change["table"], change["row"]
+            if row is None:
+                deleted[table].append((change["id"],))
+            else:
+                upserted[table].append([row[column] for column in SYNC_COLUMNS[table]])
+        applied = 0
+        with self.transaction() as conn:
+            # Deletes first, so a deleted row's unique key is free for any row that took it
+            for table, ids in deleted.items():
+                if ids:
+                    applied += conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids).rowcount
+            for table, rows in upserted.items():
+                if not rows:
+                    continue
+                columns = SYNC_COLUMNS[table]
+                fields = ", ".join(columns[1:])
+                excluded = ", ".join("excluded." + column for column in columns[1:])
+                # Rows that are already up to date are left alone, so no trigger fires
+                applied += conn.executemany(f"""
+                    INSERT INTO {table} ({', '.join(columns)})
+                    VALUES ({', '.join('?' * len(columns))})
+                    ON CONFLICT(id) DO UPDATE SET ({fields}) = ({excluded})
+                    WHERE ({fields}) IS NOT ({excluded})
+                """, rows).rowcount
+            if source is not None:
+                conn.execute("""
+                    INSERT INTO sync_state (source, seq) VALUES (?, ?)
+                    ON CONFLICT(source) DO UPDATE SET seq = excluded.seq
+                """, (source, max(change["seq"] for change in changes)))
+        return applied
+    
+    def sync_from(self, source: Union[str, "ToolTrackerDB"], since: int = None,
+                  batch_size: int = SYNC_BATCH_SIZE) -> SyncResult:
+        """Bring this database up to date with the changes of another one
+        
+        ``source`` is the path of the other tracker database or an open
+        ToolTrackerDB. Changes logged there after ``since`` are pulled in
+        batches of ``batch_size`` log entries and each batch is applied
+        in its own transaction, so the work done is proportional to the
+        number of changes, not to the size of either database. Without
+        ``since`` the sync continues after the last change applied from
+        that source, or starts from the beginning, copying everything.
+        
+        The rows keep the source's IDs, so this database should be a
+        replica that only sync writes to.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise ValueError(f"Database not found: {source}")
+            with ToolTrackerDB(source) as db:
+                return self.sync_from(db, since, batch_size)
+        if source.database_id == self.database_id:
+            raise ValueError("Cannot sync a database from itself")
+        if since is None:
+            row = self.read_connection.execute(
+                "SELECT seq FROM sync_state WHERE source = ?", (source.database_id,)).fetchone()
+            since = row[0] if row else 0
+        result = SyncResult(seq=since)
+        while True:
+            changes = source.get_changes(result.seq, batch_size)
+            if not changes:
+                return result
+            result.applied += self.apply_changes(changes, source.database_id)
+            result.batches += 1
+            result.seq = changes[-1]["seq"]
+    
+    def backup(self, target: str, step_pages: int = BACKUP_STEP_PAGES,
+               pause: float = BACKUP_PAUSE, time_budget: float = None,
+               progress: Callable[[int, int], None] = None) -> BackupResult:
+        """Copy the database to the file ``target`` while it stays in use
+        
+        Pages are copied ``step_pages`` at a time with SQLite's online
+        backup API, pausing ``pause`` seconds between steps, and
+        ``progress(copied, total)`` is called after each step. The copy
+        is written beside ``target`` and renamed over it once complete,
+        so ``target`` is always a whole, consistent database.
+        
+        In WAL mode the copy reads one snapshot of the database: writers
+        carry on as usual, and what they commit meanwhile is left for the
+        next backup. Otherwise a commit by another connection restarts
+        the copy, and after ``BACKUP_MAX_RESTARTS`` restarts the rest is
+        copied from a snapshot, holding writers off until it is done.
+        
+        With a ``time_budget`` in seconds the backup gives up when it
+        runs out, leaving ``target`` as it was; the result is then not
+        ``complete``.
+        """
+        if step_pages < 1:
+            raise ValueError("step_pages must be at least 1")
+        if os.path.abspath(target) == os.path.abspath(self.db_path):
+            raise ValueError("Cannot back up a database onto itself")
+        start = time.monotonic()
+        deadline = None if time_budget is None else start + time_budget
+        result = BackupResult()
+        snapshot = self._wal
+        
+        def step(status, remaining, total):
+            copied = total - remaining
+            # A step that copied pages without getting further started over
+            if status == sqlite3.SQLITE_OK and copied <= result.pages:
+                result.restarts += 1
+                if not snapshot and result.restarts > BACKUP_MAX_RESTARTS:
+                    raise _StopBackup()
+            result.pages, result.total_pages = copied, total
+            if progress is not None:
+                progress(copied, total)
+            if remaining:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise _StopBackup()
+                if pause:
+                    time.sleep(pause)
+        
+        partial = target + ".partial"
+        # A connection of its own: never profiled, and free to hold a snapshot
+        source = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            while not result.complete:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                copy = sqlite3.connect(partial)
+                try:
+                    if snapshot:
+                        source.execute("BEGIN")
+                        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                    source.backup(copy, pages=step_pages, progress=step, sleep=RETRY_BASE_DELAY)
+                    result.complete = True
+                except _StopBackup:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break
+                    snapshot = True
+                finally:
+                    copy.close()
+                    if source.in_transaction:
+                        source.execute("COMMIT")
+            if result.complete:
+                os.replace(partial, target)
         finally:
-            conn.close()
+            source.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+        result.seconds = time.monotonic() - start
+        return result
     
-    def get_all_installations(self) -> List[Dict]:
-        """Get all installation records"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def maintain(self, time_budget: float = None, vacuum: bool = True, analyze: bool = True,
+                 check: bool = True, full_vacuum: bool = False,
+                 step_pages: int = VACUUM_STEP_PAGES,
+                 progress: Callable[[str, int, int], None] = None) -> MaintenanceResult:
+        """Give free space back, refresh planner statistics and check integrity
         
-        cursor.execute("""
-            SELECT 
-                m.name as machine, t.name as tool, t.type as tool_type,
-                i.installed_date, i.installation_time, i.removal_date,
-                i.notes, i.created_at
-            FROM installations i
-            JOIN machines m ON i.machine_id = m.id
-            JOIN tools t ON i.tool_id = t.id
-            ORDER BY i.installed_date DESC
-        """)
+        Runs these steps in turn, calling ``progress(step, done, total)``
+        as each one advances:
+        
+        - ``vacuum``: pages freed by deleted and archived rows are given
+          back to the file system, ``step_pages`` per short transaction.
+          Databases created since incremental vacuum was enabled support
+          this; an older one needs ``full_vacuum`` once, which rewrites
+          the whole file, blocking other connections while it runs.
+        - ``analyze``: ANALYZE, so the query planner has statistics on
+          how the rows are spread over the indexes.
+        - ``check``: PRAGMA integrity_check of each table and its indexes.
         
-        columns = [description[0] for description in cursor.description]
-        records = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return records
+        With a ``time_budget`` in seconds, a running statement is
+        interrupted (and rolled back) when it runs out and the remaining
+        steps are skipped; the result is then not ``complete``.
+        """
+        if step_pages < 1:
+            raise ValueError("step_pages must be at least 1")
+        start = time.monotonic()
+        deadline = None if time_budget is None else start + time_budget
+        report = progress or (lambda step, done, total: None)
+        result = MaintenanceResult()
+        conn = self.connection
+        if deadline is not None:
+            conn.set_progress_handler(lambda: time.monotonic() >= deadline, BUDGET_CHECK_STEPS)
+        vacuumed = not vacuum
+        tables = []
+        try:
+            if vacuum:
+                vacuumed = self._vacuum(result, full_vacuum, step_pages, deadline, report)
+            if analyze and (deadline is None or time.monotonic() < deadline):
+                report("analyze", 0, 1)
+                self._analyze()
+                result.analyzed = True
+                report("analyze", 1, 1)
+            if check:
+                tables = [row[0] for row in conn.execute("""
+                    SELECT name FROM sqlite_master
+                    WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%' ORDER BY name
+                """)]
+                report("check", 0, len(tables))
+                for table in tables:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break
+                    result.problems.extend(
+                        row[0] for row in conn.execute(f'PRAGMA integrity_check("{table}")')
+                        if row[0] != "ok")
+                    result.tables_checked += 1
+                    report("check", result.tables_checked, len(tables))
+            result.complete = (vacuumed and (result.analyzed or not analyze)
+                               and (result.tables_checked == len(tables) or not check))
+        except sqlite3.OperationalError as e:
+            if "interrupted" not in str(e):
+                raise
+        finally:
+            if deadline is not None:
+                conn.set_progress_handler(None, 0)
+        result.free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        result.seconds = time.monotonic() - start
+        return result
     
-    def get_installations_by_machine(self, machine_name: str) -> List[Dict]:
-        """Get installation records for a specific machine"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _vacuum(self, result: MaintenanceResult, full_vacuum: bool, step_pages: int,
+                deadline: Optional[float], report: Callable[[str, int, int], None]) -> bool:
+        """The vacuum step of ``maintain()``; False if the time budget ran out first"""
+        conn = self.connection
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        report("vacuum", 0, free)
+        if full_vacuum and not incremental:
+            # Takes effect with the VACUUM, which rewrites the file
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            result.pages_freed = free
+            report("vacuum", free, free)
+            return True
+        total = free
+        while incremental and free:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            left = self._vacuum_step(step_pages)
+            if left >= free:
+                break
+            result.pages_freed += free - left
+            free = left
+            report("vacuum", total - free, total)
+        return True
+    
+    @retry_on_busy
+    def _vacuum_step(self, pages: int) -> int:
+        """Give back up to ``pages`` free pages; returns the free pages left"""
+        conn = self.connection
+        # executescript runs the pragma to completion: it frees one page per step
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        return conn.execute("PRAGMA freelist_count").fetchone()[0]
+    
+    @retry_on_busy
+    def _analyze(self):
+        with self.transaction() as conn:
+            conn.execute("ANALYZE")
+    
+    def _iter_rows(self, cursor: sqlite3.Cursor, batch_size: int,
+                   row_type: str = "dict") -> Iterator:
+        """Yield a cursor's rows, fetching ``batch_size`` rows at a time
         
-        cursor.execute("""
-            SELECT 
-                m.name as machine, t.name as tool, t.type as tool_type,
-                i.installed_date, i.installation_time, i.removal_date,
-                i.notes, i.created_at
-            FROM installations i
-            JOIN machines m ON i.machine_id = m.id
-            JOIN tools t ON i.tool_id = t.id
-            WHERE m.name = ?
-            ORDER BY i.installed_date DESC
-        """, (machine_name,))
-        
-        columns = [description[0] for description in cursor.description]
-        records = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return records
-    
-    def get_installations_by_tool(self, tool_name: str) -> List[Dict]:
-        """Get installation records for a specific tool"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Rows are dicts keyed by column name, the plain tuples SQLite
+        returns, or (for installation queries) Installation records.
+        """
+        if row_type == "installation":
+            cursor.row_factory = installation_row
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if row_type == "dict":
+                columns = [description[0] for description in cursor.description]
+                for row in rows:
+                    yield dict(zip(columns, row))
+            else:
+                yield from rows
+    
+    def _query_installations(self, where: List[str], params: List,
+                             limit: Optional[int], offset: Optional[int],
+                             after: Optional[Tuple[str, int]],
+                             batch_size: int, select: str = None,
+                             order_by: str = None, row_type: str = "dict",
+                             archived: bool = False) -> Iterator:
+        """Run the installation listing query with the given filters
         
-        cursor.execute("""
-            SELECT 
-                m.name as machine, t.name as tool, t.type as tool_type,
-                i.installed_date, i.installation_time, i.removal_date,
-                i.notes, i.created_at
-            FROM installations i
-            JOIN machines m ON i.machine_id = m.id
-            JOIN tools t ON i.tool_id = t.id
-            WHERE t.name = ?
-            ORDER BY i.installed_date DESC
-        """, (tool_name,))
-        
-        columns = [description[0] for description in cursor.description]
-        records = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return records
+        With ``archived``, live and archived installations are queried
+        as two halves merged in ``order_by`` order, which must then be on
+        ``i.installed_day`` and ``i.id`` only.
+        """
+        if row_type not in ROW_TYPES:
+            raise ValueError(f"Unknown row type '{row_type}'. Use one of: {', '.join(ROW_TYPES)}")
+        where = list(where)
+        params = list(params)
+        if after is not None:
+            # Keyset pagination: continue below the last (installed_date, id) seen
+            installed_date, last_id = after
+            if not validate_date(installed_date):
+                raise ValueError("Invalid date format. Use YYYY-MM-DD")
+            where.append("(i.installed_day, i.id) < (?, ?)")
+            params.extend((date_to_day(installed_date), last_id))
+        order_by = order_by or "i.installed_day DESC, i.id DESC"
+        condition = " WHERE " + " AND ".join(where) if where else ""
+        
+        if archived:
+            halves = [HISTORY_SELECT.format(table=table) + condition
+                      for table in ("installations", "installations_archive")]
+            # A compound query is ordered by its result columns
+            sql = " UNION ALL ".join(halves) + " ORDER BY " + order_by.replace("i.", "")
+            params = params * 2
+        else:
+            sql = (select or INSTALLATION_SELECT) + condition + " ORDER BY " + order_by
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset or 0])
+        if archived:
+            # Drop the day again, so rows are the same as for live queries
+            sql = f"SELECT {', '.join(INSTALLATION_FIELDS)} FROM ({sql})"
+        
+        cursor = self.read_connection.execute(sql, params)
+        return self._iter_rows(cursor, batch_size, row_type)
+    
+    def _installation_filters(self, machine_name: Optional[str], tool_name: Optional[str],
+                              since: Optional[str], until: Optional[str]) -> Tuple[List[str], List]:
+        """WHERE conditions and parameters shared by the installation readers
+        
+        ``since`` and ``until`` are inclusive bounds on the installation
+        date, compared as day numbers so the date indexes serve them.
+        """
+        where = []
+        params = []
+        for value in (since, until):
+            if value is not None and not validate_date(value):
+                raise ValueError("Invalid date format. Use YYYY-MM-DD")
+        since_day = date_to_day(since) if since is not None else None
+        until_day = date_to_day(until) if until is not None else None
+        # Compared as days: as strings, '2025-3-1' sorts after '2025-10-31'
+        if since_day is not None and until_day is not None and since_day > until_day:
+            raise ValueError("'since' must not be after 'until'")
+        if since_day is not None:
+            where.append("i.installed_day >= ?")
+            params.append(since_day)
+        if until_day is not None:
+            where.append("i.installed_day <= ?")
+            params.append(until_day)
+        if machine_name is not None:
+            where.append("m.name = ?")
+            params.append(machine_name)
+        if tool_name is not None:
+            where.append("t.name = ?")
+            params.append(tool_name)
+        return where, params
+    
+    def iter_installations(self, machine_name: str = None, tool_name: str = None,
+                           limit: int = None, offset: int = None,
+                           after: Tuple[str, int] = None, active: bool = False,
+                           batch_size: int = FETCH_BATCH_SIZE,
+                           row_type: str = "dict", since: str = None, until: str = None,
+                           archived: bool = False) -> Iterator:
+        """Stream installation records, newest first
+        
+        Records are fetched from the cursor ``batch_size`` rows at a time.
+        ``limit``/``offset`` page through the results in SQL; for deep
+        pages pass ``after=(installed_date, id)`` of the last record seen
+        instead of an offset. ``active`` keeps only the tools still
+        installed (no removal date). ``since`` and ``until`` keep the
+        installations made in that period (inclusive), read from the
+        date index rather than filtered from the full history.
+        ``archived`` also includes the installations moved to the
+        archive by ``archive_installations()``.
+        
+        Records are dicts by default. For large results pass
+        ``row_type="installation"`` for slotted Installation records, or
+        ``row_type="tuple"`` for plain tuples in ``Installation`` field
+        order; both are much smaller and faster to build.
+        """
+        where, params = self._installation_filters(machine_name, tool_name, since, until)
+        select = None
+        if active:
+            # Archived installations are all closed
+            where.insert(0, "i.removal_date IS NULL")
+            select = ACTIVE_INSTALLATION_SELECT
+            archived = False
+        return self._query_installations(where, params, limit, offset, after, batch_size,
+                                         select=select, row_type=row_type, archived=archived)
+    
+    def iter_search(self, query: str, limit: int = None, offset: int = None,
+                    batch_size: int = FETCH_BATCH_SIZE, row_type: str = "dict") -> Iterator:
+        """Stream installation records matching a search, best matches first
+        
+        Searches machine name, tool name, tool type and notes through the
+        FTS5 index. Plain words match as prefixes (``cnc mill`` finds
+        records containing words starting with both); queries using FTS5
+        syntax (quotes, ``*``, ``AND``/``OR``/``NOT``, parentheses) are
+        passed through for phrase and boolean searches. A query that is
+        not valid FTS5, such as ``C++`` or ``10:30``, is searched for as
+        plain words instead. Results are ranked
+        with bm25. Without FTS5 this falls back to a substring LIKE search
+        ordered by date. ``row_type`` is as for ``iter_installations``.
+        """
+        if not self._has_fts:
+            search_pattern = f"%{query}%"
+            return self._query_installations(
+                ["(m.name LIKE ? OR t.name LIKE ? OR t.type LIKE ? OR i.notes LIKE ?)"],
+                [search_pattern] * 4,
+                limit, offset, None, batch_size, row_type=row_type
+            )
+        
+        def match(expression):
+            return self._query_installations(
+                ["installations_fts MATCH ?"], [expression],
+                limit, offset, None, batch_size,
+                select=INSTALLATION_SEARCH_SELECT,
+                order_by="installations_fts.rank, i.id DESC",
+                row_type=row_type
+            )
+        
+        try:
+            return match(to_fts_query(query))
+        except sqlite3.OperationalError:
+            pass
+        # Not valid FTS5: its punctuation is part of the words searched for
+        try:
+            return match(to_fts_query(query, literal=True))
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query '{query}': {e}")
+    
+    def export_installations(self, output: Union[str, BinaryIO], fmt: str = None,
+                             machine_name: str = None, tool_name: str = None,
+                             since: str = None, until: str = None, compress: bool = None,
+                             batch_size: int = EXPORT_BATCH_SIZE, archived: bool = False) -> int:
+        """Write installation records to a CSV, JSONL or Parquet extract
+        
+        ``output`` is a file path or a binary file object. ``fmt`` and
+        ``compress`` (gzip) default from the path's extension, such as
+        ``.csv.gz``; for a file object ``fmt`` defaults to CSV. Records
+        are filtered like ``iter_installations`` and are written oldest
+        first, streamed from the cursor ``batch_size`` rows at a time, so
+        memory use is the same for any size of extract. Parquet needs the
+        optional pyarrow package.
+        
+        Returns the number of records written.
+        """
+        if isinstance(output, (str, os.PathLike)):
+            path = os.fspath(output)
+            fmt = fmt or detect_format(path)[0]
+            if compress is None:
+                compress = path.lower().endswith(".gz")
+        
+        where, params = self._installation_filters(machine_name, tool_name, since, until)
+        rows = self._query_installations(where, params, None, None, None, batch_size,
+                                         order_by="i.installed_day, i.id", row_type="tuple",
+                                         archived=archived)
+        return write_rows(output, INSTALLATION_FIELDS, rows, fmt or "csv", bool(compress),
+                          batch_size)
+    
+    @cached_result
+    def get_all_installations(self, since: str = None, until: str = None,
+                              archived: bool = False) -> List[Dict]:
+        """Get all installation records, optionally installed between two dates"""
+        return list(self.iter_installations(since=since, until=until, archived=archived))
     
+    @cached_result
+    def get_installations_by_machine(self, machine_name: str, since: str = None,
+                                     until: str = None, archived: bool = False) -> List[Dict]:
+        """Get installation records for a specific machine"""
+        return list(self.iter_installations(machine_name=machine_name, since=since,
+                                            until=until, archived=archived))
+    
+    @cached_result
+    def get_installations_by_tool(self, tool_name: str, since: str = None,
+                                  until: str = None, archived: bool = False) -> List[Dict]:
+        """Get installation records for a specific tool"""
+        return list(self.iter_installations(tool_name=tool_name, since=since,
+                                            until=until, archived=archived))
+    
+    @cached_result
     def search_installations(self, query: str) -> List[Dict]:
         """Search installation records by machine or tool name"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return list(self.iter_search(query))
+    
+    @cached_result
+    def get_machine_summary(self, machine_name: str = None) -> List[Dict]:
+        """Installation counts per machine, computed with GROUP BY
         
-        search_pattern = f"%{query}%"
-        cursor.execute("""
-            SELECT 
-                m.name as machine, t.name as tool, t.type as tool_type,
-                i.installed_date, i.installation_time, i.removal_date,
-                i.notes, i.created_at
-            FROM installations i
-            JOIN machines m ON i.machine_id = m.id
-            JOIN tools t ON i.tool_id = t.id
-            WHERE m.name LIKE ? OR t.name LIKE ? OR i.notes LIKE ?
-            ORDER BY i.installed_date DESC
-        """, (search_pattern, search_pattern, search_pattern))
-        
-        columns = [description[0] for description in cursor.description]
-        records = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return records
+        Each entry has ``machine``, ``installations``, ``tools`` (distinct),
+        ``active`` and ``removed`` keys, ordered by machine name.
+        """
+        sql = """
+            SELECT m.name AS machine, c.installations, c.tools, c.active,
+                   c.installations - c.active AS removed
+            FROM (
+                SELECT machine_id, COUNT(*) AS installations,
+                       COUNT(DISTINCT tool_id) AS tools,
+                       SUM(removal_date IS NULL) AS active
+                FROM installations
+                {where}
+                GROUP BY machine_id
+            ) c
+            JOIN machines m ON m.id = c.machine_id
+            ORDER BY m.name
+        """
+        params = []
+        where = ""
+        if machine_name is not None:
+            where = "WHERE machine_id = (SELECT id FROM machines WHERE name = ?)"
+            params.append(machine_name)
+        cursor = self.read_connection.execute(sql.format(where=where), params)
+        return list(self._iter_rows(cursor, FETCH_BATCH_SIZE))
     
-    def get_statistics(self) -> Dict:
-        """Get statistics about tool installations"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @cached_result
+    def get_tool_summary(self, tool_name: str = None) -> List[Dict]:
+        """Installation counts per tool, computed with GROUP BY
         
-        # Total records
-        cursor.execute("SELECT COUNT(*) FROM installations")
-        total_records = cursor.fetchone()[0]
+        Each entry has ``tool``, ``tool_type``, ``installations``,
+        ``machines`` (distinct), ``active`` and ``removed`` keys, ordered
+        by tool name.
+        """
+        sql = """
+            SELECT t.name AS tool, t.type AS tool_type, c.installations,
+                   c.machines, c.active, c.installations - c.active AS removed
+            FROM (
+                SELECT tool_id, COUNT(*) AS installations,
+                       COUNT(DISTINCT machine_id) AS machines,
+                       SUM(removal_date IS NULL) AS active
+                FROM installations
+                {where}
+                GROUP BY tool_id
+            ) c
+            JOIN tools t ON t.id = c.tool_id
+            ORDER BY t.name
+        """
+        params = []
+        where = ""
+        if tool_name is not None:
+            where = "WHERE tool_id = (SELECT id FROM tools WHERE name = ?)"
+            params.append(tool_name)
+        cursor = self.read_connection.execute(sql.format(where=where), params)
+        return list(self._iter_rows(cursor, FETCH_BATCH_SIZE))
+    
+    @cached_result
+    def get_statistics(self) -> Dict:
+        """Get statistics about tool installations
         
-        # Total machines
-        cursor.execute("SELECT COUNT(*) FROM machines")
-        total_machines = cursor.fetchone()[0]
+        Read from the rollup tables, so the cost does not grow with the
+        number of installations.
+        """
+        cursor = self.read_connection.cursor()
         
-        # Total tools
-        cursor.execute("SELECT COUNT(*) FROM tools")
-        total_tools = cursor.fetchone()[0]
+        cursor.execute("SELECT installations, active, machines, tools FROM stats_totals")
+        total_records, active, total_machines, total_tools = cursor.fetchone()
         
         # Tools per machine
         cursor.execute("""
-            SELECT m.name, COUNT(*) as tool_count
-            FROM installations i
-            JOIN machines m ON i.machine_id = m.id
-            GROUP BY m.name
-            ORDER BY tool_count DESC
+            SELECT m.name, s.installations
+            FROM machine_stats s
+            JOIN machines m ON m.id = s.machine_id
+            WHERE s.installations > 0
+            ORDER BY s.installations DESC, m.name
         """)
         tools_per_machine = {row[0]: row[1] for row in cursor.fetchall()}
         
-        conn.close()
+        cursor.execute("""
+            SELECT tool_type, installations FROM tool_type_stats
+            WHERE installations > 0
+            ORDER BY installations DESC, tool_type
+        """)
+        installations_per_tool_type = {row[0] or None: row[1] for row in cursor.fetchall()}
         
         return {
             "total_records": total_records,
+            "active_installations": active,
             "total_machines": total_machines,
             "total_tools": total_tools,
-            "tools_per_machine": tools_per_machine
+            "tools_per_machine": tools_per_machine,
+            "installations_per_tool_type": installations_per_tool_type
+        }
+    
+    def get_utilization(self, since: str = None, until: str = None,
+                        machine_name: str = None, tool_name: str = None,
+                        archived: bool = False) -> Dict:
+        """Tool body time and utilization between two dates
+        
+        ``since`` defaults to the first installation date and ``until``
+        to today. Each installation counts the days it overlaps the
+        period; open installations (no removal date) count up to
+        ``until``. Everything is aggregated by SQLite in one pass over
+        the installations' integer day columns, whatever the fleet size.
+        ``archived`` also counts the installations moved to the archive,
+        for periods reaching back before the archive cutoff.
+        
+        Returns ``since``, ``until``, ``days`` (the period's length) and
+        ``fleet``, ``machines`` and ``tools`` entries. Each entry has
+        ``installations`` (overlapping the period), ``active`` (still
+        installed at ``until``), ``body_days`` and ``utilization``,
+        which is ``body_days`` divided by ``days``: the share of the
+        period a tool was installed, or the average number of tools
+        installed on a machine. Machine entries also have ``machine``
+        and ``tools`` (distinct); tool entries have ``tool``,
+        ``tool_type`` and ``machines`` (distinct). The fleet entry has
+        ``machines`` and ``tools`` counts, and its utilization is the
+        average number of tools installed per machine. Entries are
+        ordered by body days, most first.
+        """
+        for value in (since, until):
+            if value is not None and not validate_date(value):
+                raise ValueError("Invalid date format. Use YYYY-MM-DD")
+        # Padded, as returned and as date.fromisoformat() requires
+        until = day_to_date(date_to_day(until)) if until is not None else date.today().isoformat()
+        tables = ["installations"] + (["installations_archive"] if archived else [])
+        if since is not None:
+            since = day_to_date(date_to_day(since))
+        else:
+            first = self.read_connection.execute("SELECT MIN(day) FROM ({})".format(" UNION ALL ".join(
+                f"SELECT MIN(installed_day) AS day FROM {table}" for table in tables))).fetchone()[0]
+            since = day_to_date(first) if first is not None else until
+        days = (date.fromisoformat(until) - date.fromisoformat(since)).days
+        if days < 0:
+            raise ValueError("'since' must not be after 'until'")
+        
+        where = ["installed_day <= :until", "COALESCE(removal_day, :until) >= :since"]
+        params = {"since": date_to_day(since), "until": date_to_day(until)}
+        if machine_name is not None:
+            where.append("machine_id = (SELECT id FROM machines WHERE name = :machine)")
+            params["machine"] = machine_name
+        if tool_name is not None:
+            where.append("tool_id = (SELECT id FROM tools WHERE name = :tool)")
+            params["tool"] = tool_name
+        # Unfiltered, reading the table in rowid order and sorting beats
+        # walking the (machine, day) index with a lookup per row
+        hint = "" if len(where) > 2 else " NOT INDEXED"
+        source = " UNION ALL ".join(
+            f"SELECT machine_id, tool_id, installed_day, removal_day FROM {table}{hint} "
+            f"WHERE {' AND '.join(where)}" for table in tables)
+        
+        # Aggregate each machine/tool pair once, then roll the pairs up
+        # both ways, so the installations are scanned a single time
+        sql = f"""
+            WITH pairs AS (
+                SELECT machine_id, tool_id, COUNT(*) AS installations,
+                       SUM(removal_day IS NULL OR removal_day > :until) AS active,
+                       SUM(MIN(COALESCE(removal_day, :until), :until)
+                           - MAX(installed_day, :since)) AS body_days
+                FROM ({source})
+                GROUP BY machine_id, tool_id
+            )
+            SELECT 'machine', m.name, NULL, SUM(p.installations), SUM(p.active),
+                   COUNT(*), SUM(p.body_days)
+            FROM pairs p JOIN machines m ON m.id = p.machine_id
+            GROUP BY p.machine_id
+            UNION ALL
+            SELECT 'tool', t.name, t.type, SUM(p.installations), SUM(p.active),
+                   COUNT(*), SUM(p.body_days)
+            FROM pairs p JOIN tools t ON t.id = p.tool_id
+            GROUP BY p.tool_id
+        """
+        machines, tools = [], []
+        for kind, name, tool_type, installations, active, count, body_days in (
+                self.read_connection.execute(sql, params)):
+            entry = {"installations": installations, "active": active,
+                     "body_days": body_days,
+                     "utilization": body_days / days if days else 0.0}
+            if kind == "machine":
+                machines.append({"machine": name, "tools": count, **entry})
+            else:
+                tools.append({"tool": name, "tool_type": tool_type, "machines": count, **entry})
+        machines.sort(key=lambda e: (-e["body_days"], e["machine"]))
+        tools.sort(key=lambda e: (-e["body_days"], e["tool"]))
+        
+        body_days = sum(e["body_days"] for e in machines)
+        fleet = {
+            "installations": sum(e["installations"] for e in machines),
+            "active": sum(e["active"] for e in machines),
+            "machines": len(machines),
+            "tools": len(tools),
+            "body_days": body_days,
+            "utilization": body_days / (days * len(machines)) if days and machines else 0.0
         }
+        return {"since": since, "until": until, "days": days,
+                "fleet": fleet, "machines": machines, "tools": tools}
@@ -0,0 +1,114 @@
+"""Streaming writers for installation extracts (CSV, JSONL and Parquet)"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Sequence, Tuple, Union
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# Rows handed to a writer at a time, and rows per Parquet row group
+EXPORT_BATCH_SIZE = 10000
+# Same default as the gzip command: level 9 is ~4x slower for ~5% smaller files
+GZIP_LEVEL = 6
+
+def detect_format(path: str) -> Tuple[str, bool]:
+    """Guess the extract format, and whether to gzip it, from the file name"""
+    root, extension = os.path.splitext(path.lower())
+    compress = extension == ".gz"
+    if compress:
+        extension = os.path.splitext(root)[1]
+    extension = extension.lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl", compress
+    if extension in ("csv", "parquet"):
+        return extension, compress
+    raise ValueError(f"Cannot detect format of '{path}'. Use one of: {', '.join(FORMATS)}")
+
+def _batches(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def _write_text(stream: BinaryIO, columns: Sequence[str], rows: Iterable[Tuple],
+                fmt: str, compress: bool, batch_size: int) -> int:
+    """Write CSV or JSONL through an optional gzip layer; returns rows written"""
+    raw = stream
+    if compress:
+        raw = gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=GZIP_LEVEL)
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            for batch in _batches(rows, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+        else:
+            encode = json.JSONEncoder(ensure_ascii=False).encode
+            for batch in _batches(rows, batch_size):
+                text.write("".join(encode(dict(zip(columns, row))) + "\n" for row in batch))
+                count += len(batch)
+        text.flush()
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+        if compress:
+            raw.close()
+    return count
+
+def _parquet_writer():
+    """Return the Parquet writer, failing early if pyarrow is missing"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: "
+                          "pip install 'tool-body-tracker[parquet]'") from None
+
+    def write_parquet(stream: BinaryIO, columns: Sequence[str], rows: Iterable[Tuple],
+                      compress: bool, batch_size: int) -> int:
+        """Write a Parquet file one row group per batch; returns rows written"""
+        schema = pa.schema([(name, pa.int64() if name == "id" else pa.string())
+                            for name in columns])
+        codec = "gzip" if compress else "snappy"
+        count = 0
+        with pq.ParquetWriter(stream, schema, compression=codec) as writer:
+            for batch in _batches(rows, batch_size):
+                arrays = [pa.array(values, type=field.type)
+                          for values, field in zip(zip(*batch), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(batch)
+        return count
+
+    return write_parquet
+
+def write_rows(output: Union[str, os.PathLike, BinaryIO], columns: Sequence[str],
+               rows: Iterable[Tuple], fmt: str = "csv", compress: bool = False,
+               batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    """Stream rows to a file path or binary file object in an extract format
+
+    ``rows`` is consumed ``batch_size`` rows at a time, so memory use
+    does not grow with the number of rows. CSV and JSONL are gzipped
+    when ``compress`` is set; Parquet uses gzip instead of snappy as its
+    column codec. Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        write = _parquet_writer()
+    else:
+        def write(stream, columns, rows, compress, batch_size):
+            return _write_text(stream, columns, rows, fmt, compress, batch_size)
+
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as stream:
+            return write(stream, columns, rows, compress, batch_size)
+    return write(output, columns, rows, compress, batch_size)
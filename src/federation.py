@@ -0,0 +1,212 @@
+"""Fleet-wide reads across the tracker databases of several sites"""
+
+import heapq
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from src.database import FETCH_BATCH_SIZE, ToolTrackerDB
+
+# Threads querying sites; each site is always queried from the same one
+FEDERATION_WORKERS = 8
+
+_END = object()
+
+def site_names(paths: Iterable[str]) -> Dict[str, str]:
+    """Name each database path after its file, or its directory if the file names clash
+
+    ``plant-a.db`` and ``plant-b.db`` become ``plant-a`` and ``plant-b``;
+    ``plant-a/tool_tracker.db`` and ``plant-b/tool_tracker.db`` too.
+    """
+    paths = list(dict.fromkeys(paths))
+    for name_of in (lambda p: os.path.splitext(os.path.basename(p))[0],
+                    lambda p: os.path.basename(os.path.dirname(os.path.abspath(p)))):
+        names = [name_of(path) for path in paths]
+        if all(names) and len(set(names)) == len(names):
+            return dict(zip(names, paths))
+    return {path: path for path in paths}
+
+class FederatedTrackerDB:
+    """Read-only fleet view over one tracker database per site
+
+    ``sites`` maps site names to database paths, or is a list of paths
+    named by ``site_names()``. Each call queries every site at once on
+    up to ``workers`` threads and merges the results: listings stream
+    newest first across sites, search results take the best match of
+    each site in turn, and statistics are added up. Records get a
+    ``site`` key. Other keyword arguments are passed to ToolTrackerDB.
+
+    Each site is pinned to one thread, so it keeps a single connection
+    (and page cache) however many sites there are. Sites are opened on
+    first use, which applies any pending schema migrations to them.
+
+    ``timings`` holds, for the last call, the seconds each site took to
+    answer (for listings and searches, to run the query and return its
+    first row) and the rows it returned, counted as the merged stream is
+    read. ``timing_report()`` formats it slowest site first.
+    """
+
+    def __init__(self, sites: Union[Dict[str, str], Iterable[str]],
+                 workers: int = FEDERATION_WORKERS, **options):
+        self.sites = dict(sites) if isinstance(sites, dict) else site_names(sites)
+        if not self.sites:
+            raise ValueError("At least one site database is required")
+        for name, path in self.sites.items():
+            if not os.path.exists(path):
+                raise ValueError(f"Database for site '{name}' not found: {path}")
+        self.options = options
+        self.timings: Dict[str, Dict] = {}
+        self._dbs: Dict[str, ToolTrackerDB] = {}
+        lanes = max(1, min(workers, len(self.sites)))
+        self._lanes = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tool-tracker-site-{n}")
+                       for n in range(lanes)]
+        names = list(self.sites)
+        self._lane_sites = [names[n::lanes] for n in range(lanes)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the threads and close every site's connections"""
+        for lane in self._lanes:
+            lane.shutdown(wait=True)
+        for db in self._dbs.values():
+            db.close()
+
+    def _db(self, site: str) -> ToolTrackerDB:
+        db = self._dbs.get(site)
+        if db is None:
+            db = self._dbs[site] = ToolTrackerDB(self.sites[site], **self.options)
+        return db
+
+    def _fan_out(self, call: Callable[[ToolTrackerDB], object]) -> Dict[str, object]:
+        """Run ``call`` against every site concurrently, timing each site"""
+        self.timings = {site: {"seconds": 0.0, "rows": 0} for site in self.sites}
+
+        def run(sites):
+            results = {}
+            for site in sites:
+                start = time.perf_counter()
+                try:
+                    results[site] = call(self._db(site))
+                finally:
+                    self.timings[site]["seconds"] += time.perf_counter() - start
+            return results
+
+        # One task per thread for all of its sites, to keep hand-offs few
+        futures = [lane.submit(run, sites) for lane, sites in zip(self._lanes, self._lane_sites)]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return {site: results[site] for site in self.sites}
+
+    def _streams(self, call: Callable[[ToolTrackerDB], Iterator]) -> List[Iterator]:
+        """Start ``call``'s query on every site and return a stream per site
+
+        The query and its first row run on the site's thread; the rest
+        of each stream is read as the merge consumes it.
+        """
+        def start(db):
+            rows = call(db)
+            return next(rows, _END), rows
+        started = self._fan_out(start)
+        return [self._stream(site, *started[site]) for site in self.sites]
+
+    def _stream(self, site: str, first, rows: Iterator) -> Iterator[Dict]:
+        if first is _END:
+            return
+        timing = self.timings[site]
+        first["site"] = site
+        timing["rows"] += 1
+        yield first
+        for record in rows:
+            record["site"] = site
+            timing["rows"] += 1
+            yield record
+
+    def iter_installations(self, machine_name: str = None, tool_name: str = None,
+                           limit: int = None, offset: int = None, active: bool = False,
+                           since: str = None, until: str = None, archived: bool = False,
+                           batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict]:
+        """Stream installation records of every site, newest first
+
+        Filters are as for ``ToolTrackerDB.iter_installations``. With a
+        ``limit``, each site returns at most ``limit + offset`` records.
+        """
+        per_site = None if limit is None else limit + (offset or 0)
+        streams = self._streams(lambda db: db.iter_installations(
+            machine_name=machine_name, tool_name=tool_name, limit=per_site, active=active,
+            since=since, until=until, archived=archived, batch_size=batch_size))
+        merged = heapq.merge(*streams, key=lambda r: (r["installed_date"], r["id"]), reverse=True)
+        if limit is None and not offset:
+            return merged
+        return islice(merged, offset or 0, None if limit is None else (offset or 0) + limit)
+
+    def iter_search(self, query: str, limit: int = None,
+                    batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict]:
+        """Stream records matching a search on every site
+
+        Ranks are not comparable between databases, so the results take
+        each site's best remaining match in turn.
+        """
+        streams = self._streams(lambda db: db.iter_search(query, limit=limit,
+                                                          batch_size=batch_size))
+        merged = heapq.merge(*(enumerate(stream) for stream in streams), key=lambda pair: pair[0])
+        return islice((record for _, record in merged), limit)
+
+    def get_installations(self, machine_name: str = None, tool_name: str = None,
+                          since: str = None, until: str = None,
+                          archived: bool = False) -> List[Dict]:
+        """Installation records of every site as a list, newest first"""
+        return list(self.iter_installations(machine_name=machine_name, tool_name=tool_name,
+                                            since=since, until=until, archived=archived))
+
+    def search_installations(self, query: str) -> List[Dict]:
+        """Records matching a search on every site, as a list"""
+        return list(self.iter_search(query))
+
+    def get_statistics(self) -> Dict:
+        """Statistics of the whole fleet
+
+        Counts are added up over the sites, so a tool used at two sites
+        counts twice in ``total_tools``. ``tools_per_machine`` is keyed
+        by ``site/machine``; ``sites`` has each site's own statistics.
+        """
+        per_site = self._fan_out(lambda db: db.get_statistics())
+        totals = {key: 0 for key in ("total_records", "active_installations",
+                                     "total_machines", "total_tools")}
+        machines: List[Tuple[str, int]] = []
+        tool_types: Dict = {}
+        for site, stats in per_site.items():
+            self.timings[site]["rows"] = 1
+            for key in totals:
+                totals[key] += stats[key]
+            machines.extend((f"{site}/{machine}", count)
+                            for machine, count in stats["tools_per_machine"].items())
+            for tool_type, count in stats["installations_per_tool_type"].items():
+                tool_types[tool_type] = tool_types.get(tool_type, 0) + count
+        machines.sort(key=lambda item: (-item[1], item[0]))
+        return {
+            **totals,
+            "tools_per_machine": dict(machines),
+            "installations_per_tool_type": dict(sorted(
+                tool_types.items(), key=lambda item: (-item[1], item[0] or ""))),
+            "sites": per_site,
+        }
+
+    def timing_report(self) -> str:
+        """The last call's per-site timings as text, slowest site first"""
+        if not self.timings:
+            return "No sites queried yet"
+        ordered = sorted(self.timings.items(), key=lambda item: -item[1]["seconds"])
+        width = max(len(site) for site in self.timings)
+        lines = [f"Site timings ({len(ordered)} sites, slowest first):"]
+        for site, timing in ordered:
+            lines.append(f"  {site:<{width}}  {timing['seconds'] * 1000:9.1f} ms"
+                         f"  {timing['rows']:>8} rows")
+        return "\n".join(lines)
@@ -0,0 +1,77 @@
+"""Streaming readers for bulk installation feeds (CSV and JSONL)"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterator, Optional
+
+FORMATS = ("csv", "jsonl")
+
+# Accepted column names for each record field
+FIELD_ALIASES = {
+    "machine": ("machine", "machine_name"),
+    "tool": ("tool", "tool_name"),
+    "installed_date": ("installed_date", "date"),
+    "installation_time": ("installation_time", "time"),
+    "tool_type": ("tool_type", "type"),
+    "notes": ("notes",),
+    "removal_date": ("removal_date", "removed"),
+}
+
+def detect_format(path: str) -> str:
+    """Guess the feed format from the file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    raise ValueError(f"Cannot detect format of '{path}'. Use one of: {', '.join(FORMATS)}")
+
+def normalize_record(raw: Dict) -> Dict:
+    """Map a raw feed row onto the field names used by ToolTrackerDB"""
+    record = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = raw.get(alias)
+            if value is not None:
+                record[field] = value.strip() if isinstance(value, str) else value
+                break
+    return record
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Yield installation records from a CSV or JSONL file one at a time"""
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            # Resolve column aliases once from the header instead of per row
+            positions = {name: index for index, name in reversed(list(enumerate(header)))}
+            columns = []
+            for field, aliases in FIELD_ALIASES.items():
+                for alias in aliases:
+                    if alias in positions:
+                        columns.append((field, positions[alias]))
+                        break
+            width = len(header)
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                yield {field: row[index].strip() for field, index in columns}
+        else:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})")
+                yield normalize_record(raw)
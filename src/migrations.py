@@ -0,0 +1,661 @@
+"""Versioned schema migrations for the tool tracker database
+
+The schema version is stored in ``PRAGMA user_version``. Each entry in
+``MIGRATIONS`` upgrades the schema by one version; ``migrate()`` applies
+the ones a database has not seen yet, in order.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Callable, List
+
+def _create_base_tables(conn: sqlite3.Connection):
+    """Version 1: machines, tools and installations tables"""
+    # Create machines table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS machines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create tools table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tools (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            type TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create installation records table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS installations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            machine_id INTEGER NOT NULL,
+            tool_id INTEGER NOT NULL,
+            installed_date DATE NOT NULL,
+            installation_time TIME,
+            removal_date DATE,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (machine_id) REFERENCES machines(id),
+            FOREIGN KEY (tool_id) REFERENCES tools(id),
+            UNIQUE(machine_id, tool_id, installed_date)
+        )
+    """)
+
+def _add_query_indexes(conn: sqlite3.Connection):
+    """Version 2: indexes for the listing, filter, sort and stats queries"""
+    # ORDER BY installed_date for the full listing
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_installed_date
+        ON installations (installed_date)
+    """)
+    # Filter by machine / tool, already sorted by date
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_machine_date
+        ON installations (machine_id, installed_date)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_tool_date
+        ON installations (tool_id, installed_date)
+    """)
+    # Active vs removed installations
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_removal_date
+        ON installations (removal_date)
+    """)
+
+def _reorder_unique_key(conn: sqlite3.Connection):
+    """Version 3: lead the installations unique key with (machine_id, installed_date)
+    
+    UNIQUE(machine_id, installed_date, tool_id) enforces the same rule as
+    the original key but also serves machine listings in date order, so
+    the separate machine/date index can go. One index fewer makes inserts
+    noticeably cheaper. SQLite cannot alter a table constraint, so the
+    table is rebuilt.
+    """
+    conn.execute("""
+        CREATE TABLE installations_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            machine_id INTEGER NOT NULL,
+            tool_id INTEGER NOT NULL,
+            installed_date DATE NOT NULL,
+            installation_time TIME,
+            removal_date DATE,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (machine_id) REFERENCES machines(id),
+            FOREIGN KEY (tool_id) REFERENCES tools(id),
+            UNIQUE(machine_id, installed_date, tool_id)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO installations_new
+        (id, machine_id, tool_id, installed_date, installation_time,
+         removal_date, notes, created_at)
+        SELECT id, machine_id, tool_id, installed_date, installation_time,
+               removal_date, notes, created_at
+        FROM installations
+        ORDER BY machine_id, installed_date, tool_id
+    """)
+    conn.execute("DROP TABLE installations")
+    conn.execute("ALTER TABLE installations_new RENAME TO installations")
+    
+    conn.execute("""
+        CREATE INDEX idx_installations_installed_date
+        ON installations (installed_date)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_installations_tool_date
+        ON installations (tool_id, installed_date)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_installations_removal_date
+        ON installations (removal_date)
+    """)
+
+def _add_search_index(conn: sqlite3.Connection):
+    """Version 4: FTS5 index over machine, tool, tool type and notes
+    
+    The index uses the ``installations_search`` view as external content,
+    so only the index itself is stored, and is kept in sync with triggers.
+    Skipped when SQLite is built without FTS5, in which case searches fall
+    back to LIKE.
+    
+    Bulk loads drop the insert trigger for the duration of each chunk's
+    transaction and maintain the index set-based instead, which is
+    several times faster than per-row trigger inserts.
+    """
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS installations_search AS
+        SELECT i.id AS id, m.name AS machine, t.name AS tool,
+               t.type AS tool_type, i.notes AS notes
+        FROM installations i
+        JOIN machines m ON i.machine_id = m.id
+        JOIN tools t ON i.tool_id = t.id
+    """)
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS installations_fts
+            USING fts5(machine, tool, tool_type, notes,
+                       content='installations_search', content_rowid='id')
+        """)
+    except sqlite3.OperationalError:
+        return
+    
+    # External content: removing a row from the index needs its old values
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS installations_fts_insert
+        AFTER INSERT ON installations
+        BEGIN
+            INSERT INTO installations_fts (rowid, machine, tool, tool_type, notes)
+            SELECT NEW.id, m.name, t.name, t.type, NEW.notes
+            FROM machines m, tools t
+            WHERE m.id = NEW.machine_id AND t.id = NEW.tool_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS installations_fts_delete
+        AFTER DELETE ON installations
+        BEGIN
+            INSERT INTO installations_fts
+            (installations_fts, rowid, machine, tool, tool_type, notes)
+            SELECT 'delete', OLD.id, m.name, t.name, t.type, OLD.notes
+            FROM machines m, tools t
+            WHERE m.id = OLD.machine_id AND t.id = OLD.tool_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS installations_fts_update
+        AFTER UPDATE OF machine_id, tool_id, notes ON installations
+        BEGIN
+            INSERT INTO installations_fts
+            (installations_fts, rowid, machine, tool, tool_type, notes)
+            SELECT 'delete', OLD.id, m.name, t.name, t.type, OLD.notes
+            FROM machines m, tools t
+            WHERE m.id = OLD.machine_id AND t.id = OLD.tool_id;
+            INSERT INTO installations_fts (rowid, machine, tool, tool_type, notes)
+            SELECT NEW.id, m.name, t.name, t.type, NEW.notes
+            FROM machines m, tools t
+            WHERE m.id = NEW.machine_id AND t.id = NEW.tool_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS machines_fts_update
+        AFTER UPDATE OF name ON machines
+        BEGIN
+            INSERT INTO installations_fts
+            (installations_fts, rowid, machine, tool, tool_type, notes)
+            SELECT 'delete', i.id, OLD.name, t.name, t.type, i.notes
+            FROM installations i JOIN tools t ON i.tool_id = t.id
+            WHERE i.machine_id = OLD.id;
+            INSERT INTO installations_fts (rowid, machine, tool, tool_type, notes)
+            SELECT i.id, NEW.name, t.name, t.type, i.notes
+            FROM installations i JOIN tools t ON i.tool_id = t.id
+            WHERE i.machine_id = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tools_fts_update
+        AFTER UPDATE OF name, type ON tools
+        BEGIN
+            INSERT INTO installations_fts
+            (installations_fts, rowid, machine, tool, tool_type, notes)
+            SELECT 'delete', i.id, m.name, OLD.name, OLD.type, i.notes
+            FROM installations i JOIN machines m ON i.machine_id = m.id
+            WHERE i.tool_id = OLD.id;
+            INSERT INTO installations_fts (rowid, machine, tool, tool_type, notes)
+            SELECT i.id, m.name, NEW.name, NEW.type, i.notes
+            FROM installations i JOIN machines m ON i.machine_id = m.id
+            WHERE i.tool_id = NEW.id;
+        END
+    """)
+    
+    # Index the records that already exist
+    conn.execute("INSERT INTO installations_fts (installations_fts) VALUES ('rebuild')")
+
+# Recompute every rollup table from the installations table
+ROLLUP_REBUILD = [
+    "DELETE FROM machine_stats",
+    "DELETE FROM tool_stats",
+    "DELETE FROM tool_type_stats",
+    "DELETE FROM stats_totals",
+    """
+    INSERT INTO machine_stats (machine_id, installations, active)
+    SELECT machine_id, COUNT(*), SUM(removal_date IS NULL)
+    FROM installations
+    GROUP BY machine_id
+    """,
+    """
+    INSERT INTO tool_stats (tool_id, installations, active)
+    SELECT tool_id, COUNT(*), SUM(removal_date IS NULL)
+    FROM installations
+    GROUP BY tool_id
+    """,
+    """
+    INSERT INTO tool_type_stats (tool_type, installations, active)
+    SELECT COALESCE(t.type, ''), SUM(s.installations), SUM(s.active)
+    FROM tool_stats s JOIN tools t ON t.id = s.tool_id
+    GROUP BY COALESCE(t.type, '')
+    """,
+    """
+    INSERT INTO stats_totals (id, installations, active, machines, tools)
+    SELECT 1, COALESCE(SUM(installations), 0), COALESCE(SUM(active), 0),
+           (SELECT COUNT(*) FROM machines), (SELECT COUNT(*) FROM tools)
+    FROM machine_stats
+    """,
+]
+
+def _rollup_changes(row: str, sign: str) -> str:
+    """Trigger statements adding (``+``) or subtracting (``-``) ``row``
+    (``NEW`` or ``OLD``) from every rollup table
+    """
+    active = f"({row}.removal_date IS NULL)"
+    upsert = """
+        ON CONFLICT ({key}) DO UPDATE SET
+            installations = installations + excluded.installations,
+            active = active + excluded.active;"""
+    return f"""
+        INSERT INTO machine_stats (machine_id, installations, active)
+        VALUES ({row}.machine_id, {sign}1, {sign}{active})
+        {upsert.format(key="machine_id")}
+        INSERT INTO tool_stats (tool_id, installations, active)
+        VALUES ({row}.tool_id, {sign}1, {sign}{active})
+        {upsert.format(key="tool_id")}
+        INSERT INTO tool_type_stats (tool_type, installations, active)
+        SELECT COALESCE(type, ''), {sign}1, {sign}{active} FROM tools WHERE id = {row}.tool_id
+        {upsert.format(key="tool_type")}
+        UPDATE stats_totals SET installations = installations {sign} 1,
+                                active = active {sign} {active};
+    """
+
+def _add_rollups(conn: sqlite3.Connection):
+    """Version 5: rollup tables behind get_statistics
+    
+    Installation and active counts per machine, tool and tool type, plus
+    overall totals, kept up to date by triggers so statistics never scan
+    ``installations``. Untyped tools are counted under the tool type ``''``.
+    
+    Bulk loads drop the insert trigger for each chunk's transaction and
+    apply the chunk's counts set-based.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS machine_stats (
+            machine_id INTEGER PRIMARY KEY,
+            installations INTEGER NOT NULL,
+            active INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tool_stats (
+            tool_id INTEGER PRIMARY KEY,
+            installations INTEGER NOT NULL,
+            active INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tool_type_stats (
+            tool_type TEXT PRIMARY KEY,
+            installations INTEGER NOT NULL,
+            active INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            installations INTEGER NOT NULL,
+            active INTEGER NOT NULL,
+            machines INTEGER NOT NULL,
+            tools INTEGER NOT NULL
+        )
+    """)
+    for statement in ROLLUP_REBUILD:
+        conn.execute(statement)
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS installations_rollup_insert
+        AFTER INSERT ON installations
+        BEGIN
+            {_rollup_changes("NEW", "+")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS installations_rollup_delete
+        AFTER DELETE ON installations
+        BEGIN
+            {_rollup_changes("OLD", "-")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS installations_rollup_update
+        AFTER UPDATE OF machine_id, tool_id, removal_date ON installations
+        BEGIN
+            {_rollup_changes("OLD", "-")}
+            {_rollup_changes("NEW", "+")}
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tools_rollup_type
+        AFTER UPDATE OF type ON tools
+        WHEN COALESCE(OLD.type, '') <> COALESCE(NEW.type, '')
+        BEGIN
+            INSERT INTO tool_type_stats (tool_type, installations, active)
+            SELECT COALESCE(OLD.type, ''), -installations, -active
+            FROM tool_stats WHERE tool_id = OLD.id
+            ON CONFLICT (tool_type) DO UPDATE SET
+                installations = installations + excluded.installations,
+                active = active + excluded.active;
+            INSERT INTO tool_type_stats (tool_type, installations, active)
+            SELECT COALESCE(NEW.type, ''), installations, active
+            FROM tool_stats WHERE tool_id = NEW.id
+            ON CONFLICT (tool_type) DO UPDATE SET
+                installations = installations + excluded.installations,
+                active = active + excluded.active;
+        END
+    """)
+    for table in ("machines", "tools"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_rollup_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                UPDATE stats_totals SET {table} = {table} + 1;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_rollup_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                UPDATE stats_totals SET {table} = {table} - 1;
+            END
+        """)
+
+def _add_active_index(conn: sqlite3.Connection):
+    """Version 6: index only the open installations
+    
+    Partial indexes over rows without a removal date replace the index
+    on every removal date, so removals, close-outs and "what is installed
+    now" listings stay fast however much closed history accumulates. The
+    second one is in listing order, so active pages need no sort.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_installations_removal_date")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_active
+        ON installations (machine_id, tool_id, installed_date)
+        WHERE removal_date IS NULL
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_active_date
+        ON installations (installed_date)
+        WHERE removal_date IS NULL
+    """)
+
+# Day number (proleptic Gregorian ordinal, as date.toordinal()) of a
+# YYYY-MM-DD column; NULL for NULL or malformed dates
+DAY_NUMBER = "CAST(julianday({column}) - 1721424.5 AS INTEGER)"
+
+def _padded_date(value):
+    """A date as stored before input was normalized, as YYYY-MM-DD"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except (TypeError, ValueError):
+        return value
+
+def _pad_dates(conn: sqlite3.Connection):
+    """Rewrite installation dates stored unpadded (``2025-3-7``) as ``2025-03-07``
+    
+    Dates used to be stored as given once ``strptime`` accepted them;
+    SQLite's date functions, and so the day columns, only read the
+    padded form. A row that padding turns into a copy of another (same
+    machine, tool and installation day) is deleted and the earlier
+    entered one kept, as the unique key requires. Triggers still in
+    place keep the rollups and search index right.
+    """
+    unpadded = "(length({0}) <> 10 OR julianday({0}) IS NULL)"
+    rows = conn.execute(f"""
+        SELECT id, machine_id, tool_id, installed_date, removal_date FROM installations
+        WHERE {unpadded.format("installed_date")}
+           OR (removal_date IS NOT NULL AND {unpadded.format("removal_date")})
+        ORDER BY id
+    """).fetchall()
+    for row_id, machine_id, tool_id, installed_date, removal_date in rows:
+        installed_date = _padded_date(installed_date)
+        key = (machine_id, tool_id, installed_date)
+        if conn.execute("""
+            SELECT 1 FROM installations
+            WHERE machine_id = ? AND tool_id = ? AND installed_date = ? AND id < ?
+        """, key + (row_id,)).fetchone():
+            conn.execute("DELETE FROM installations WHERE id = ?", (row_id,))
+            continue
+        conn.execute("""
+            DELETE FROM installations
+            WHERE machine_id = ? AND tool_id = ? AND installed_date = ? AND id > ?
+        """, key + (row_id,))
+        conn.execute("UPDATE installations SET installed_date = ?, removal_date = ? WHERE id = ?",
+                     (installed_date, _padded_date(removal_date), row_id))
+
+def _add_day_columns(conn: sqlite3.Connection):
+    """Version 7: integer day columns and an archive for closed history
+    
+    ``installed_day`` and ``removal_day`` are virtual generated columns,
+    so every writer (including bulk loads and other programs) keeps them
+    right for free, and the date-keyed indexes move onto them: integer
+    keys are smaller than the date strings, and date arithmetic needs no
+    parsing. The unique key becomes (machine_id, installed_day, tool_id),
+    which still serves machine listings and now machine date ranges.
+    SQLite cannot alter a table constraint, so the table is rebuilt; its
+    other indexes and triggers are recreated as they were. Needs SQLite
+    3.31 or later.
+    
+    ``installations_archive`` holds closed installations moved out of
+    ``installations`` by ``archive_installations()``, with the same
+    columns and date indexes, so old history no longer weighs on the
+    live table's indexes, triggers and scans.
+    
+    Dates stored unpadded are padded first, or their day numbers would
+    be NULL.
+    """
+    _pad_dates(conn)
+    replaced = ("idx_installations_installed_date", "idx_installations_tool_date",
+                "idx_installations_active_date")
+    # Indexes, triggers and views on or over installations, in creation
+    # order: dropped so the rebuilt table can be renamed, then recreated
+    schema = conn.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE sql IS NOT NULL AND (
+            (type = 'index' AND tbl_name = 'installations')
+            OR (type IN ('trigger', 'view') AND sql LIKE '%installations%'))
+        ORDER BY rowid
+    """).fetchall()
+    for kind, name, _ in schema:
+        if kind != "index":
+            conn.execute(f"DROP {kind.upper()} {name}")
+    conn.execute(f"""
+        CREATE TABLE installations_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            machine_id INTEGER NOT NULL,
+            tool_id INTEGER NOT NULL,
+            installed_date DATE NOT NULL,
+            installation_time TIME,
+            removal_date DATE,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            installed_day INTEGER
+                GENERATED ALWAYS AS ({DAY_NUMBER.format(column="installed_date")}) VIRTUAL,
+            removal_day INTEGER
+                GENERATED ALWAYS AS ({DAY_NUMBER.format(column="removal_date")}) VIRTUAL,
+            FOREIGN KEY (machine_id) REFERENCES machines(id),
+            FOREIGN KEY (tool_id) REFERENCES tools(id),
+            UNIQUE(machine_id, installed_day, tool_id)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO installations_new
+        (id, machine_id, tool_id, installed_date, installation_time,
+         removal_date, notes, created_at)
+        SELECT id, machine_id, tool_id, installed_date, installation_time,
+               removal_date, notes, created_at
+        FROM installations
+        ORDER BY machine_id, installed_date, tool_id
+    """)
+    conn.execute("DROP TABLE installations")
+    conn.execute("ALTER TABLE installations_new RENAME TO installations")
+    for _, name, sql in schema:
+        if name not in replaced:
+            conn.execute(sql)
+    conn.execute("""
+        CREATE INDEX idx_installations_day
+        ON installations (installed_day)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_installations_tool_day
+        ON installations (tool_id, installed_day)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_installations_active_day
+        ON installations (installed_day)
+        WHERE removal_date IS NULL
+    """)
+    
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS installations_archive (
+            id INTEGER PRIMARY KEY,
+            machine_id INTEGER NOT NULL,
+            tool_id INTEGER NOT NULL,
+            installed_date DATE NOT NULL,
+            installation_time TIME,
+            removal_date DATE NOT NULL,
+            notes TEXT,
+            created_at TIMESTAMP,
+            installed_day INTEGER
+                GENERATED ALWAYS AS ({DAY_NUMBER.format(column="installed_date")}) VIRTUAL,
+            removal_day INTEGER
+                GENERATED ALWAYS AS ({DAY_NUMBER.format(column="removal_date")}) VIRTUAL,
+            FOREIGN KEY (machine_id) REFERENCES machines(id),
+            FOREIGN KEY (tool_id) REFERENCES tools(id)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_archive_day
+        ON installations_archive (installed_day)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_archive_machine_day
+        ON installations_archive (machine_id, installed_day)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_installations_archive_tool_day
+        ON installations_archive (tool_id, installed_day)
+    """)
+
+# Tables whose changes are recorded in change_log, in dependency order
+LOGGED_TABLES = ("machines", "tools", "installations", "installations_archive")
+
+def _add_change_log(conn: sqlite3.Connection):
+    """Version 8: append-only change log for incremental sync
+    
+    Every insert, update and delete on the logged tables appends the
+    table, row ID and operation to ``change_log`` under a sequence number
+    that only ever grows (AUTOINCREMENT never reuses one). A replica
+    pulls the rows changed after the last sequence it applied, so a sync
+    costs the number of changes, not the size of the database. The rows
+    that already exist are logged as inserts, so syncing from 0 copies
+    the whole database.
+    
+    Bulk loads drop the installation insert trigger for each chunk's
+    transaction and log the chunk set-based.
+    
+    ``meta`` holds a random ``database_id`` naming this database as a
+    sync source, and ``sync_state`` the last sequence applied from each
+    source this database replicates.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO meta (key, value)
+        VALUES ('database_id', lower(hex(randomblob(16))))
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            source TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    for table in LOGGED_TABLES:
+        conn.execute(f"""
+            INSERT INTO change_log (table_name, row_id, op)
+            SELECT '{table}', id, 'insert' FROM {table} ORDER BY id
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', NEW.id, 'insert');
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_update
+            AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', NEW.id, 'update');
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', OLD.id, 'delete');
+            END
+        """)
+
+# Position in the list + 1 is the schema version the migration produces
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _create_base_tables,
+    _add_query_indexes,
+    _reorder_unique_key,
+    _add_search_index,
+    _add_rollups,
+    _add_active_index,
+    _add_day_columns,
+    _add_change_log,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """Schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    """Whether a table (or virtual table) exists in the main schema"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version
+    
+    Must be called inside a write transaction so that concurrent
+    processes do not run the same migration twice.
+    """
+    version = get_version(conn)
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+    return max(version, SCHEMA_VERSION)
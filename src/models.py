@@ -1,8 +1,8 @@
 """Data models for tool tracking"""
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 
 @dataclass
 class Machine:
@@ -19,14 +19,105 @@ class Tool:
     tool_type: Optional[str]
     created_at: datetime
 
-@dataclass
+# Fields of an installation record, in query column order
+INSTALLATION_FIELDS = ("id", "machine", "tool", "tool_type", "installed_date",
+                       "installation_time", "removal_date", "notes", "created_at")
+
 class Installation:
-    """Represents a tool installation record"""
-    id: int
-    machine_name: str
-    tool_name: str
-    installed_date: str
-    installation_time: Optional[str]
-    removal_date: Optional[str]
-    notes: Optional[str]
-    created_at: datetime
+    """Represents a tool installation record
+    
+    A compact record built straight from a query row: it has slots
+    instead of a per-instance dict, and keeps dates as the stored
+    ``YYYY-MM-DD`` strings, parsing them only when ``installed_on`` or
+    ``removed_on`` is read.
+    """
+    __slots__ = INSTALLATION_FIELDS
+    
+    def __init__(self, id: int, machine: str, tool: str, tool_type: Optional[str],
+                 installed_date: str, installation_time: Optional[str],
+                 removal_date: Optional[str], notes: Optional[str], created_at: str):
+        self.id = id
+        self.machine = machine
+        self.tool = tool
+        self.tool_type = tool_type
+        self.installed_date = installed_date
+        self.installation_time = installation_time
+        self.removal_date = removal_date
+        self.notes = notes
+        self.created_at = created_at
+    
+    @property
+    def installed_on(self) -> date:
+        """Installation date as a ``date``"""
+        return date.fromisoformat(self.installed_date)
+    
+    @property
+    def removed_on(self) -> Optional[date]:
+        """Removal date as a ``date``, or None while still installed"""
+        return date.fromisoformat(self.removal_date) if self.removal_date else None
+    
+    def to_dict(self) -> dict:
+        """The record as a dict, as returned by the default readers"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __eq__(self, other):
+        if not isinstance(other, Installation):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Installation({fields})"
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk installation import"""
+    inserted: int = 0
+    # (record number, machine, tool, installed_date) of rows already present
+    duplicates: List[Tuple[int, str, str, str]] = field(default_factory=list)
+    # (record number, error message) of rows that could not be imported
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+@dataclass
+class RemovalResult:
+    """Outcome of a bulk removal"""
+    removed: int = 0
+    # (record number, error message) of removals that could not be applied
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+@dataclass
+class SyncResult:
+    """Outcome of a sync from another tracker database"""
+    # Rows inserted, updated or deleted here
+    applied: int = 0
+    # Batches of changes pulled from the source
+    batches: int = 0
+    # Last change log sequence of the source applied here
+    seq: int = 0
+
+@dataclass
+class BackupResult:
+    """Outcome of an online backup"""
+    # Pages copied and pages in the database
+    pages: int = 0
+    total_pages: int = 0
+    seconds: float = 0.0
+    # Times the copy started over because another connection wrote to the database
+    restarts: int = 0
+    # False if the time budget ran out first; no backup file is left then
+    complete: bool = False
+
+@dataclass
+class MaintenanceResult:
+    """Outcome of a maintenance run"""
+    # Free pages given back to the file system, and free pages left
+    pages_freed: int = 0
+    free_pages: int = 0
+    # Whether query planner statistics were refreshed
+    analyzed: bool = False
+    tables_checked: int = 0
+    # Problems reported by the integrity check
+    problems: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    # False if the time budget ran out before every step was done
+    complete: bool = False
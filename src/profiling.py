@@ -0,0 +1,368 @@
+"""Opt-in query profiling for ToolTrackerDB
+
+A Profiler collects latency histograms per ToolTrackerDB method and per
+SQL statement, rows returned, connections opened and cache counters.
+ToolTrackerDB only routes calls through it while profiling is enabled:
+connections are then wrapped in ProfiledConnection, and otherwise left
+untouched, so a disabled profiler costs nothing.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Statements at least as slow as the threshold are logged here at WARNING
+slow_query_log = logging.getLogger("tool_tracker.slow_queries")
+
+# Slow queries kept for Profiler.summary()
+SLOW_QUERY_HISTORY = 100
+# Power-of-two microsecond buckets: the last one holds everything over ~35 minutes
+HISTOGRAM_BUCKETS = 32
+
+class LatencyHistogram:
+    """Count, total, min/max and log2-bucketed distribution of durations
+
+    Percentiles are estimated as the upper bound of the bucket they fall
+    in, so they are within a factor of two of the true value.
+    """
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds: float):
+        """Record one duration"""
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[min(bucket, HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimated duration below which ``fraction`` of the samples fall"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(self.max, (2 ** bucket) / 1e6)
+        return self.max
+
+    def summary(self) -> Dict:
+        """Counters and percentiles, durations in milliseconds"""
+        ms = 1000
+        return {
+            "calls": self.count,
+            "total_ms": self.total * ms,
+            "mean_ms": self.total / self.count * ms if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * ms,
+            "p50_ms": self.percentile(0.50) * ms,
+            "p95_ms": self.percentile(0.95) * ms,
+            "p99_ms": self.percentile(0.99) * ms,
+            "max_ms": self.max * ms,
+        }
+
+# Runs of placeholders, as in IN (?, ?, ?) lists and multi-row VALUES
+PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+VALUES_LIST = re.compile(r"(\((?:\?, \.\.\.|\?)\))(?:\s*,\s*\1)+")
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Statement text used to group executions: whitespace and placeholder lists collapsed"""
+    sql = " ".join(sql.split())
+    sql = PLACEHOLDER_LIST.sub("?, ...", sql)
+    return VALUES_LIST.sub(r"\1, ...", sql)
+
+class Profiler:
+    """Thread-safe collector of ToolTrackerDB timings
+
+    ``slow_query_ms`` logs every statement taking at least that long to
+    the ``tool_tracker.slow_queries`` logger and keeps the most recent
+    ones for ``summary()``.
+    """
+
+    def __init__(self, slow_query_ms: float = None):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._caches = {}
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.methods = {}
+            self.statements = {}
+            self.connections = Counter()
+            self.slow_queries = deque(maxlen=SLOW_QUERY_HISTORY)
+            self._cache_baseline = {name: (cache.hits, cache.misses)
+                                    for name, cache in self._caches.items()}
+
+    def add_cache(self, name: str, cache):
+        """Report a cache's hits and misses (counted from now) in summaries"""
+        with self._lock:
+            self._caches[name] = cache
+            self._cache_baseline[name] = (cache.hits, cache.misses)
+
+    def record_method(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.methods.get(name)
+            if histogram is None:
+                histogram = self.methods[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def record_statement(self, sql: str, seconds: float, rows: int):
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                entry = self.statements[key] = [LatencyHistogram(), 0]
+            entry[0].add(seconds)
+            entry[1] += rows
+        if self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+            self.slow_queries.append({"sql": key, "ms": seconds * 1000, "rows": rows})
+            slow_query_log.warning("slow query (%.1f ms, %d rows): %s", seconds * 1000, rows, key)
+
+    def wrap_connection(self, conn, kind: str) -> "ProfiledConnection":
+        """Count a newly opened connection and return it instrumented"""
+        with self._lock:
+            self.connections[kind] += 1
+        return ProfiledConnection(conn, self)
+
+    def wrap_method(self, name: str, method: Callable) -> Callable:
+        """Time every call of ``method``, including consuming a returned iterator"""
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                self.record_method(name, time.perf_counter() - start)
+                raise
+            elapsed = time.perf_counter() - start
+            if isinstance(result, Iterator):
+                return self._timed_iterator(name, elapsed, result)
+            self.record_method(name, elapsed)
+            return result
+        return timed
+
+    def _timed_iterator(self, name: str, elapsed: float, iterator: Iterator) -> Iterator:
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.record_method(name, elapsed)
+
+    def summary(self) -> Dict:
+        """Everything recorded, as plain data
+
+        ``methods`` and ``statements`` map names (normalized SQL for
+        statements) to histogram summaries; statements also have
+        ``rows`` returned or changed. ``connections`` counts connections
+        opened by kind, ``caches`` the hits and misses since profiling
+        started or was reset, and ``slow_queries`` lists recent slow
+        statements.
+        """
+        with self._lock:
+            caches = {}
+            for name, cache in self._caches.items():
+                base_hits, base_misses = self._cache_baseline.get(name, (0, 0))
+                hits, misses = cache.hits - base_hits, cache.misses - base_misses
+                caches[name] = {"hits": hits, "misses": misses,
+                                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0}
+            statements = {}
+            for sql, (histogram, rows) in self.statements.items():
+                statements[sql] = dict(histogram.summary(), rows=rows)
+            return {
+                "methods": {name: h.summary() for name, h in self.methods.items()},
+                "statements": statements,
+                "connections": dict(self.connections),
+                "caches": caches,
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def report(self, top: int = 10) -> str:
+        """Human-readable summary: methods and the ``top`` statements by total time"""
+        summary = self.summary()
+        lines = ["PROFILE", "=" * 50]
+        columns = f"{'calls':>7} {'total ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+
+        def row(label, entry, extra=""):
+            return (f"  {label:<30.30} {entry['calls']:>7} {entry['total_ms']:>10.2f} "
+                    f"{entry['p50_ms']:>8.2f} {entry['p99_ms']:>8.2f} {entry['max_ms']:>8.2f}{extra}")
+
+        lines.append(f"{'Methods':<32} {columns}")
+        for name, entry in _by_total(summary["methods"]):
+            lines.append(row(name, entry))
+        if not summary["methods"]:
+            lines.append("  (none)")
+
+        lines.append("")
+        lines.append(f"{'Statements':<32} {columns} {'rows':>9}")
+        for number, (sql, entry) in enumerate(_by_total(summary["statements"])[:top], start=1):
+            lines.append(row(f"#{number}", entry, f" {entry['rows']:>9}"))
+            lines.append(f"      {_shorten(sql)}")
+        if len(summary["statements"]) > top:
+            lines.append(f"  ... and {len(summary['statements']) - top} more")
+
+        lines.append("")
+        opened = ", ".join(f"{kind} {count}" for kind, count in sorted(summary["connections"].items()))
+        lines.append(f"Connections opened: {opened or 'none'}")
+        for name, cache in summary["caches"].items():
+            lines.append(f"Cache {name}: {cache['hits']} hits, {cache['misses']} misses "
+                         f"({cache['hit_ratio']:.0%} hit ratio)")
+        if self.slow_query_ms is not None:
+            lines.append("")
+            lines.append(f"Slow queries (>= {self.slow_query_ms:g} ms): {len(summary['slow_queries'])}")
+            for query in summary["slow_queries"][-top:]:
+                lines.append(f"  {query['ms']:10.2f} ms {query['rows']:>9} rows  {_shorten(query['sql'])}")
+        return "\n".join(lines)
+
+def _shorten(sql: str, width: int = 120) -> str:
+    """Keep both ends of long statements: the table and the filters"""
+    if len(sql) <= width:
+        return sql
+    half = (width - 5) // 2
+    return f"{sql[:half]} ... {sql[-half:]}"
+
+def _by_total(entries: Dict[str, Dict]) -> List:
+    return sorted(entries.items(), key=lambda item: -item[1]["total_ms"])
+
+class ProfiledCursor:
+    """sqlite3 cursor wrapper timing each statement until its rows are consumed
+
+    A statement's time is the time spent inside SQLite executing it and
+    fetching its rows; it is recorded once the rows run out, or when the
+    cursor is reused, closed or discarded.
+    """
+    __slots__ = ("_cursor", "_profiler", "_sql", "_elapsed", "_rows")
+
+    def __init__(self, cursor, profiler: Profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._sql = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    @property
+    def row_factory(self):
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory):
+        self._cursor.row_factory = factory
+
+    def _finish(self):
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            self._profiler.record_statement(sql, self._elapsed, self._rows)
+
+    def _run(self, method, sql: str, params) -> "ProfiledCursor":
+        self._finish()
+        start = time.perf_counter()
+        try:
+            method(sql, params)
+        except BaseException:
+            self._profiler.record_statement(sql, time.perf_counter() - start, 0)
+            raise
+        self._sql = sql
+        self._elapsed = time.perf_counter() - start
+        self._rows = 0
+        if self._cursor.description is None:
+            # Not a query: record it now, with the rows it changed
+            self._rows = max(self._cursor.rowcount, 0)
+            self._finish()
+        return self
+
+    def execute(self, sql: str, params: Iterable = ()) -> "ProfiledCursor":
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql: str, params: Iterable) -> "ProfiledCursor":
+        return self._run(self._cursor.executemany, sql, params)
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        rows = fetch(*args)
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - start
+        return rows
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._sql is not None:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List:
+        size = self._cursor.arraysize if size is None else size
+        rows = self._fetch(self._cursor.fetchmany, size)
+        if self._sql is not None:
+            self._rows += len(rows)
+            if len(rows) < size:
+                self._finish()
+        return rows
+
+    def fetchall(self) -> List:
+        rows = self._fetch(self._cursor.fetchall)
+        if self._sql is not None:
+            self._rows += len(rows)
+            self._finish()
+        return rows
+
+    def __iter__(self) -> "ProfiledCursor":
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        self._finish()
+
+class ProfiledConnection:
+    """sqlite3 connection wrapper whose cursors are ProfiledCursors"""
+    __slots__ = ("_conn", "_profiler")
+
+    def __init__(self, conn, profiler: Profiler):
+        self._conn = conn
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def cursor(self) -> ProfiledCursor:
+        return ProfiledCursor(self._conn.cursor(), self._profiler)
+
+    def execute(self, sql: str, params: Iterable = ()) -> ProfiledCursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, params: Iterable) -> ProfiledCursor:
+        return self.cursor().executemany(sql, params)
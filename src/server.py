@@ -0,0 +1,251 @@
+"""Read-only HTTP/JSON service over a tracker database"""
+
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+from src.cache import LRUCache
+from src.database import ToolTrackerDB
+
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8080
+# Threads running queries, each with its own long-lived read connection
+SERVE_READERS = 4
+# Records per page when the request gives no limit, and the most it may ask for
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Encoded responses kept for repeated requests, keyed by URL and change sequence
+RESPONSE_CACHE_SIZE = 256
+# Smaller bodies are sent as they are: gzip would barely shrink them
+GZIP_MIN_BYTES = 1024
+# JSON pages shrink ~12x at level 1; level 6 is ~3x slower for ~15% less
+GZIP_LEVEL = 1
+# Seconds an idle keep-alive connection is held open
+IDLE_TIMEOUT = 30
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+def _flag(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("1", "true", "yes", "")
+
+def _count(params: Dict[str, str], name: str, default: int, maximum: int = None) -> int:
+    """Non-negative integer query parameter, capped at ``maximum``"""
+    value = params.get(name)
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError(f"'{name}' must be a non-negative integer")
+    return int(value) if maximum is None else min(int(value), maximum)
+
+class TrackerService:
+    """Answers the read requests of the HTTP service from a ToolTrackerDB
+
+    Routes (GET, JSON responses):
+
+    - ``/installations``: installation records, newest first, filtered
+      by ``machine``, ``tool``, ``since``, ``until``, ``active`` and
+      ``archived``, a page of ``limit`` records at a time
+    - ``/machines/<name>/installations``, ``/tools/<name>/installations``:
+      the same for one machine or tool
+    - ``/search?q=...``: records matching a search, best matches first
+    - ``/stats``: ``get_statistics()``
+    - ``/machines``, ``/tools``: the machine and tool summaries
+
+    Listings return ``{"installations": [...], "next": url}``, where
+    ``next`` is the URL of the following page, or null on the last one.
+    Installation listings page by keyset, so deep pages cost the same
+    as the first.
+
+    Every response carries an ETag made of the database's ID and its
+    change sequence (``ToolTrackerDB.change_seq()``), which moves with
+    any committed write. A request whose ``If-None-Match`` still matches
+    gets 304 Not Modified without running its query. Encoded responses
+    are kept in an LRU cache of ``cache_size`` entries under the same
+    sequence, so repeated requests between writes cost one lookup.
+    """
+
+    def __init__(self, db: ToolTrackerDB, cache_size: int = RESPONSE_CACHE_SIZE):
+        self.db = db
+        self._cache = LRUCache(cache_size)
+        self._routes: Dict[str, Callable[[Dict[str, str]], Dict]] = {
+            "installations": self._installations,
+            "search": self._search,
+            "stats": lambda params: self.db.get_statistics(),
+            "machines": lambda params: self.db.get_machine_summary(),
+            "tools": lambda params: self.db.get_tool_summary(),
+        }
+
+    def etag(self) -> str:
+        """Entity tag of every resource while the data is unchanged"""
+        return f'W/"{self.db.database_id}-{self.db.change_seq()}"'
+
+    def cache_info(self) -> Dict:
+        """Hit/miss counters and size of the response cache"""
+        return self._cache.info()
+
+    def respond(self, target: str, if_none_match: str = None,
+                accept_gzip: bool = False) -> Response:
+        """Status, headers and body answering a GET of ``target`` (path and query)"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        if len(parts) == 3 and parts[0] in ("machines", "tools") and parts[2] == "installations":
+            params["machine" if parts[0] == "machines" else "tool"] = parts[1]
+            route = self._installations
+        elif len(parts) == 1 and parts[0] in self._routes:
+            route = self._routes[parts[0]]
+        else:
+            return self._error(404, f"Not found: {url.path}")
+
+        # Read before the query: a write landing in between only makes the
+        # next poll fetch again, never keeps a client on stale data
+        tag = self.etag()
+        headers = {"ETag": tag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if if_none_match and self._matches(if_none_match, tag):
+            return 304, headers, b""
+        key = (target, tag, accept_gzip)
+        cached = self._cache.get(key)
+        if cached is None:
+            try:
+                body = json.dumps(route(params), separators=(",", ":")).encode()
+            except ValueError as e:
+                return self._error(400, str(e))
+            encoding = None
+            if accept_gzip and len(body) >= GZIP_MIN_BYTES:
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+                encoding = "gzip"
+            cached = (body, encoding)
+            self._cache.put(key, cached)
+        body, encoding = cached
+        headers["Content-Type"] = "application/json"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return 200, headers, body
+
+    @staticmethod
+    def _matches(if_none_match: str, tag: str) -> bool:
+        """Weak comparison of ``If-None-Match`` with ``tag``, as HTTP specifies for it"""
+        def opaque(value):
+            return value[2:] if value.startswith("W/") else value
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or opaque(tag) in map(opaque, candidates)
+
+    @staticmethod
+    def _error(status: int, message: str) -> Response:
+        body = json.dumps({"error": message}).encode()
+        return status, {"Content-Type": "application/json"}, body
+
+    def _installations(self, params: Dict[str, str]) -> Dict:
+        limit = max(1, _count(params, "limit", PAGE_SIZE, MAX_PAGE_SIZE))
+        after = None
+        if params.get("after"):
+            installed_date, _, last_id = params["after"].rpartition(",")
+            if not last_id.isdigit():
+                raise ValueError("'after' must be the installed_date,id of the last record")
+            after = (installed_date, int(last_id))
+        # One extra record tells whether there is a next page
+        records = list(self.db.iter_installations(
+            machine_name=params.get("machine"), tool_name=params.get("tool"),
+            limit=limit + 1, offset=_count(params, "offset", 0), after=after,
+            active=_flag(params.get("active")), since=params.get("since"),
+            until=params.get("until"), archived=_flag(params.get("archived"))))
+        following = None
+        if len(records) > limit:
+            del records[limit:]
+            last = records[-1]
+            following = dict(params, after=f"{last['installed_date']},{last['id']}")
+            following.pop("offset", None)
+        return self._page("/installations", records, following)
+
+    def _search(self, params: Dict[str, str]) -> Dict:
+        query = params.get("q", "").strip()
+        if not query:
+            raise ValueError("Missing search query 'q'")
+        limit = max(1, _count(params, "limit", PAGE_SIZE, MAX_PAGE_SIZE))
+        offset = _count(params, "offset", 0)
+        records = list(self.db.iter_search(query, limit=limit + 1, offset=offset))
+        following = None
+        if len(records) > limit:
+            del records[limit:]
+            following = dict(params, offset=str(offset + limit))
+        return self._page("/search", records, following)
+
+    @staticmethod
+    def _page(path: str, records, following: Optional[Dict[str, str]]) -> Dict:
+        if following is not None:
+            # Machine and tool routes continue as filtered listings
+            following = path + "?" + urlencode(following, quote_via=quote)
+        return {"installations": records, "next": following}
+
+class _Handler(BaseHTTPRequestHandler):
+    """Hands each request to the server's reader pool and writes the response"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "tool-tracker"
+    timeout = IDLE_TIMEOUT
+    # Headers and body are written separately; with Nagle's algorithm the
+    # body then waits ~40 ms for the client's delayed ACK of the headers
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        future = server.readers.submit(server.service.respond, self.path,
+                                       self.headers.get("If-None-Match"),
+                                       "gzip" in self.headers.get("Accept-Encoding", ""))
+        try:
+            status, headers, body = future.result()
+        except Exception as e:
+            status, headers, body = TrackerService._error(500, str(e))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.log_requests:
+            super().log_message(format, *args)
+
+class TrackerHTTPServer(ThreadingHTTPServer):
+    """Local HTTP server for the read APIs of a ToolTrackerDB
+
+    Serves ``TrackerService`` routes on ``host``:``port`` (port 0 picks a
+    free one; see ``url``). Connections are kept alive between requests
+    and each gets a thread, which only parses HTTP: queries run on a
+    pool of ``readers`` threads, so the database is read through that
+    many connections however many clients there are. Open the database
+    with ``journal_mode="wal"`` so the service never holds up writers.
+
+    Call ``serve_forever()``, and ``shutdown()`` from another thread to
+    stop it; ``server_close()`` then releases the socket and threads.
+    Requests are logged to stderr with ``log_requests``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, db: ToolTrackerDB, host: str = SERVE_HOST, port: int = SERVE_PORT,
+                 readers: int = SERVE_READERS, cache_size: int = RESPONSE_CACHE_SIZE,
+                 log_requests: bool = False):
+        self.service = TrackerService(db, cache_size)
+        self.readers = ThreadPoolExecutor(max_workers=readers,
+                                          thread_name_prefix="tool-tracker-server")
+        self.log_requests = log_requests
+        try:
+            super().__init__((host, port), _Handler)
+        except OSError:
+            self.readers.shutdown()
+            raise
+
+    @property
+    def url(self) -> str:
+        """Base URL the server listens on"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        self.readers.shutdown(wait=True)
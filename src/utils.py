@@ -1,6 +1,6 @@
 """Utility functions for tool tracking"""
 
-from datetime import datetime
+from datetime import date, datetime
 import re
 
 def validate_date(date_string: str) -> bool:
@@ -19,6 +19,14 @@ def validate_time(time_string: str) -> bool:
     except ValueError:
         return False
 
+def date_to_day(date_string: str) -> int:
+    """Day number stored for a YYYY-MM-DD date (its proleptic Gregorian ordinal)"""
+    return datetime.strptime(date_string, "%Y-%m-%d").toordinal()
+
+def day_to_date(day: int) -> str:
+    """YYYY-MM-DD date of a stored day number"""
+    return date.fromordinal(day).isoformat()
+
 def format_record(record: dict) -> dict:
     """Format record for display"""
     formatted = record.copy()
@@ -0,0 +1,144 @@
+"""Batch validation and normalization of date and time columns
+
+Feeds repeat the same few thousand dates and times across millions of
+rows, so a column is checked by looking each distinct value up once in
+a cache; new values are checked with a precompiled pattern and range
+checks instead of building a ``datetime`` with ``strptime``. Accepted
+values are normalized to the zero-padded ``YYYY-MM-DD`` and
+``HH:MM:SS`` forms the database stores and indexes. Dates stored
+unpadded before input was normalized are padded by schema migration 7
+(see ``src.migrations``).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DATE_PATTERN = re.compile(r"([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})")
+TIME_PATTERN = re.compile(r"([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2})")
+
+DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Distinct values remembered by a BatchValidator before its caches are reset
+VALIDATION_CACHE_SIZE = 100_000
+
+def normalize_date(value) -> Optional[str]:
+    """``value`` as a zero-padded YYYY-MM-DD date, or None if it is not a valid date
+
+    Accepts the dates ``validate_date`` accepts (bar space-padded days),
+    e.g. ``2025-3-7`` becomes ``2025-03-07``.
+    """
+    if not isinstance(value, str):
+        return None
+    match = DATE_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day = map(int, match.groups())
+    if not year or not 1 <= month <= 12 or not 1 <= day <= DAYS_IN_MONTH[month]:
+        return None
+    if month == 2 and day == 29 and (year % 4 or (year % 100 == 0 and year % 400)):
+        return None
+    if len(value) == 10:
+        return value
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+def normalize_time(value) -> Optional[str]:
+    """``value`` as a zero-padded HH:MM:SS time, or None if it is not a valid time"""
+    if not isinstance(value, str):
+        return None
+    match = TIME_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    hour, minute, second = map(int, match.groups())
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    if len(value) == 8:
+        return value
+    return f"{hour:02d}:{minute:02d}:{second:02d}"
+
+def _required_message(fields: Sequence[str]) -> str:
+    if len(fields) == 1:
+        return f"{fields[0]} is required"
+    return f"{', '.join(fields[:-1])} and {fields[-1]} are required"
+
+class BatchValidator:
+    """Checks and normalizes the date and time columns of record batches
+
+    One validator is meant to be kept for a whole import, so values
+    seen in earlier chunks are not checked again. It never raises for
+    bad input; rejected rows are reported with their record numbers.
+    """
+
+    def __init__(self, cache_size: int = VALIDATION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._dates: Dict[str, Optional[str]] = {}
+        self._times: Dict[str, Optional[str]] = {}
+
+    def normalize_dates(self, values: Sequence) -> List[Optional[str]]:
+        """Normalized date (or None if invalid) for each of ``values``"""
+        return self._normalize(values, self._dates, normalize_date)
+
+    def normalize_times(self, values: Sequence) -> List[Optional[str]]:
+        """Normalized time (or None if invalid) for each of ``values``"""
+        return self._normalize(values, self._times, normalize_time)
+
+    def _normalize(self, values: Sequence, cache: Dict, normalize) -> List[Optional[str]]:
+        try:
+            new = set(values).difference(cache)
+        except TypeError:
+            # Unhashable values, e.g. lists from a JSON feed, are never valid
+            return [normalize(value) for value in values]
+        if new:
+            if len(cache) + len(new) > self.cache_size:
+                cache.clear()
+                new = set(values)
+            for value in new:
+                cache[value] = normalize(value)
+        return list(map(cache.__getitem__, values))
+
+    def validate(self, chunk: Iterable[Tuple[int, Dict]], required: Sequence[str] = (),
+                 dates: Sequence[str] = (), times: Sequence[str] = ()
+                 ) -> Tuple[List[Tuple[int, Dict]], List[Tuple[int, str]]]:
+        """Split numbered records into valid ones and per-row errors
+
+        Every field in ``required`` must be non-empty. Fields in
+        ``dates`` and ``times`` may be empty unless also required, and
+        are replaced by their normalized values; records that change are
+        copied, so the input records are left alone. Each rejected record
+        gets one ``(record number, message)`` error, in record order.
+        """
+        chunk = list(chunk)
+        records = [record for _, record in chunk]
+        columns = []
+        for names, normalize, message in ((dates, self.normalize_dates,
+                                           "Invalid date '{}'. Use YYYY-MM-DD"),
+                                          (times, self.normalize_times,
+                                           "Invalid time '{}'. Use HH:MM:SS")):
+            for name in names:
+                values = [record.get(name) or None for record in records]
+                normalized = normalize(values)
+                # A column already valid and normalized needs no per-row check
+                if normalized != values:
+                    columns.append((name, normalized, message))
+        missing = _required_message(required) if required else None
+
+        valid = []
+        errors = []
+        for index, (number, record) in enumerate(chunk):
+            if required and not all(map(record.get, required)):
+                errors.append((number, missing))
+                continue
+            if not columns:
+                valid.append((number, record))
+                continue
+            normalized = {}
+            for name, values, message in columns:
+                value = record.get(name)
+                if value:
+                    if values[index] is None:
+                        errors.append((number, message.format(value)))
+                        break
+                    if values[index] != value:
+                        normalized[name] = values[index]
+            else:
+                valid.append((number, {**record, **normalized} if normalized else record))
+        return valid, errors
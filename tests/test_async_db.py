@@ -0,0 +1,98 @@
+"""Tests for the asyncio database interface"""
+
+import unittest
+import asyncio
+import io
+import os
+import sqlite3
+import tempfile
+
+from src.async_db import AsyncToolTrackerDB
+
+class TestAsyncToolTrackerDB(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncToolTrackerDB"""
+
+    async def asyncSetUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = AsyncToolTrackerDB(self.test_db.name, journal_mode="wal")
+
+    async def asyncTearDown(self):
+        """Clean up test database"""
+        await self.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.remove(self.test_db.name + suffix)
+
+    async def test_add_and_query(self):
+        """Test writes are visible to reads once awaited"""
+        record_id = await self.db.add_installation("Machine1", "Tool1", "2025-01-01",
+                                                   notes="coolant leak")
+        self.assertIsNotNone(record_id)
+        self.assertIsNotNone(await self.db.get_machine_id("Machine1"))
+        records = await self.db.get_installations_by_machine("Machine1")
+        self.assertEqual([r["id"] for r in records], [record_id])
+        self.assertEqual(len(await self.db.search_installations("coolant")), 1)
+        stats = await self.db.get_statistics()
+        self.assertEqual(stats["total_records"], 1)
+        report = await self.db.get_utilization("2025-01-01", "2025-01-31")
+        self.assertEqual(report["fleet"]["body_days"], 30)
+        self.assertEqual(await self.db.remove_installation("Machine1", "Tool1", "2025-01-11"), 1)
+        self.assertEqual([row async for row in self.db.iter_installations(active=True)], [])
+
+    async def test_concurrent_writes_are_batched(self):
+        """Test writes queued while the writer waits commit as one batch"""
+        blocker = sqlite3.connect(self.test_db.name, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        tasks = [asyncio.ensure_future(
+                     self.db.add_installation(f"Machine{i % 5}", f"Tool{i}", "2025-01-01"))
+                 for i in range(200)]
+        await asyncio.sleep(0.2)
+        blocker.execute("COMMIT")
+        blocker.close()
+
+        ids = await asyncio.gather(*tasks)
+        self.assertEqual(len(set(ids)), 200)
+        self.assertLessEqual(self.db.batches, 2)
+        self.assertEqual((await self.db.get_statistics())["total_records"], 200)
+
+    async def test_failed_write_does_not_abort_batch(self):
+        """Test one failing write in a batch leaves the others committed"""
+        await self.db.add_installation("Machine1", "Tool1", "2025-01-01")
+        results = await asyncio.gather(
+            self.db.add_installation("Machine1", "Tool2", "2025-01-01"),
+            self.db.add_installation("Machine1", "Tool1", "2025-01-01"),
+            self.db.add_installation("Machine1", "Tool3", "2025-01-01"),
+            return_exceptions=True
+        )
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(len(await self.db.get_all_installations()), 3)
+
+    async def test_bulk_and_stream(self):
+        """Test bulk imports and async iteration over many rows"""
+        records = [{"machine": "M1", "tool": f"T{i}", "installed_date": "2025-01-01"}
+                   for i in range(1200)]
+        result = await self.db.bulk_add_installations(records)
+        self.assertEqual(result.inserted, 1200)
+        rows = [row async for row in self.db.iter_installations()]
+        self.assertEqual(len(rows), 1200)
+        rows = [row async for row in self.db.iter_installations(limit=10)]
+        self.assertEqual(len(rows), 10)
+        rows = [row async for row in self.db.iter_installations(row_type="tuple")]
+        self.assertEqual(len(rows), 1200)
+        self.assertIsInstance(rows[0], tuple)
+        stream = io.BytesIO()
+        self.assertEqual(await self.db.export_installations(stream, "jsonl"), 1200)
+
+    async def test_closed(self):
+        """Test calls after close are rejected and pending writes were flushed"""
+        task = asyncio.ensure_future(self.db.add_machine("Machine1"))
+        await asyncio.sleep(0)
+        await self.db.close()
+        self.assertIsNotNone(await task)
+        with self.assertRaises(RuntimeError):
+            await self.db.get_statistics()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for batch mode"""
+
+import unittest
+import json
+import os
+import tempfile
+
+from click.testing import CliRunner
+
+from src import cli as cli_module
+from src.batch import parse_operation, run_batch
+from src.database import ToolTrackerDB
+
+class TestBatch(unittest.TestCase):
+    """Test cases for running operations in batches"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+
+    def test_parse_operation(self):
+        """Test JSON and command syntax parse to the same operation"""
+        expected = ("add", {"machine": "M 1", "tool": "T1", "installed_date": "2025-01-01"})
+        self.assertEqual(parse_operation(
+            'add --machine "M 1" --tool T1 --installed-date 2025-01-01'), expected)
+        self.assertEqual(parse_operation(json.dumps(
+            {"op": "add", "machine_name": "M 1", "tool": "T1",
+             "installed_date": "2025-01-01"})), expected)
+        for line in ('add --machine M1', 'add --machine', 'frobnicate', '{"op": "add"',
+                     'stats --verbose yes', '[1, 2]'):
+            with self.assertRaises(ValueError):
+                parse_operation(line)
+
+    def test_run_batch(self):
+        """Test results come back in input order, one per operation"""
+        lines = [
+            "add --machine M1 --tool T1 --installed-date 2025-01-01",
+            "",
+            "# comment",
+            '{"op": "add", "machine": "M1", "tool": "T2", "installed_date": "2025-01-02"}',
+            "add --machine M1 --tool T1 --installed-date 2025-01-01",
+            "add --machine M1 --tool T3 --installed-date 2025-13-01",
+            "list --machine M1",
+            "search --query T2",
+            "stats",
+        ]
+        results = list(run_batch(self.db, lines))
+        self.assertEqual([r["line"] for r in results], [1, 4, 5, 6, 7, 8, 9])
+        self.assertEqual([r["ok"] for r in results],
+                         [True, True, False, False, True, True, True])
+        self.assertIn("already exists", results[2]["error"])
+        self.assertEqual(len(results[4]["result"]), 2)
+        self.assertEqual(results[5]["result"][0]["tool"], "T2")
+        self.assertEqual(results[6]["result"]["total_records"], 2)
+
+    def test_remove(self):
+        """Test removing one tool, closing out a machine and listing what is left"""
+        lines = [
+            "add --machine M1 --tool T1 --installed-date 2025-01-01",
+            "add --machine M1 --tool T2 --installed-date 2025-01-01",
+            "add --machine M2 --tool T1 --installed-date 2025-01-01",
+            "remove --machine M2 --tool T1 --removal-date 2025-02-01",
+            '{"op": "remove", "machine": "M2", "tool": "T1", "removal_date": "2025-02-02"}',
+            '{"op": "list", "active": true}',
+            "remove --machine M1 --removal-date 2025-03-01",
+            "list --active true",
+            "remove --machine M1 --removal-date 03/01/2025",
+        ]
+        results = list(run_batch(self.db, lines))
+        self.assertEqual([r["ok"] for r in results],
+                         [True, True, True, True, False, True, True, True, False])
+        self.assertEqual(results[3]["result"], 1)
+        self.assertIn("not installed", results[4]["error"])
+        self.assertEqual([r["tool"] for r in results[5]["result"]], ["T2", "T1"])
+        self.assertEqual(results[6]["result"], 2)
+        self.assertEqual(results[7]["result"], [])
+
+    def test_writes_grouped(self):
+        """Test writes are committed in groups, not one transaction each"""
+        lines = [f"add --machine M1 --tool T{i} --installed-date 2025-01-01"
+                 for i in range(25)]
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        results = list(run_batch(self.db, lines, group_size=10))
+        self.db.connection.set_trace_callback(None)
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(statements.count("COMMIT"), 3)
+        self.assertEqual(self.db.get_statistics()["total_records"], 25)
+
+    def test_cli(self):
+        """Test the batch command streams JSON lines"""
+        cli_module.db = self.db
+        try:
+            result = CliRunner().invoke(cli_module.cli, ["--db", self.db.db_path, "batch"],
+                                        input="add --machine M1 --tool T1 "
+                                              "--installed-date 2025-01-01\nstats\n")
+        finally:
+            cli_module.db = None
+        self.assertEqual(result.exit_code, 0)
+        outcomes = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual([o["line"] for o in outcomes], [1, 2])
+        self.assertEqual(outcomes[1]["result"]["total_records"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
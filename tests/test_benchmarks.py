@@ -0,0 +1,84 @@
+"""Tests for the benchmark suite and data generator"""
+
+import unittest
+import inspect
+import os
+import tempfile
+from datetime import date, timedelta
+
+from benchmarks import datagen, run
+from src.database import ToolTrackerDB
+
+class TestDatagen(unittest.TestCase):
+    """Test cases for the synthetic data generator"""
+
+    def test_seeded(self):
+        """Test the same seed always generates the same records"""
+        first = list(datagen.generate_records(500, machines=5, tools=20, seed=7))
+        second = list(datagen.generate_records(500, machines=5, tools=20, seed=7))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(datagen.generate_records(500, machines=5, tools=20,
+                                                                 seed=8)))
+
+    def test_unique_keys(self):
+        """Test generated records never collide on the unique key"""
+        records = list(datagen.generate_records(2000, machines=3, tools=10))
+        keys = {(r["machine"], r["tool"], r["installed_date"]) for r in records}
+        self.assertEqual(len(keys), 2000)
+        self.assertEqual({r["machine"] for r in records}, {f"Machine-{i}" for i in range(3)})
+
+    def test_removals(self):
+        """Test the requested share of records is closed before the pair's next cycle"""
+        records = list(datagen.generate_records(2000, machines=5, tools=100, removed=0.65))
+        closed = [r for r in records if r["removal_date"]]
+        self.assertAlmostEqual(len(closed) / len(records), 0.65, delta=0.05)
+        for number, record in enumerate(records):
+            if record["removal_date"]:
+                next_cycle = datagen.START_DATE + timedelta(days=7 * (number // 500 + 1))
+                installed = date.fromisoformat(record["installed_date"])
+                removed = date.fromisoformat(record["removal_date"])
+                self.assertTrue(installed < removed <= next_cycle)
+        records = datagen.generate_records(100, machines=5, tools=100, removed=0)
+        self.assertFalse(any(r["removal_date"] for r in records))
+
+    def test_populate(self):
+        """Test populated databases hold the generated removals"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with ToolTrackerDB(os.path.join(tmpdir, "bench.db")) as db:
+                self.assertEqual(datagen.populate(db, 1000, machines=5, tools=20), 1000)
+                closed = sum(1 for r in datagen.generate_records(1000, machines=5, tools=20)
+                             if r["removal_date"])
+                active = sum(row["active"] for row in db.get_machine_summary())
+                self.assertEqual(active, 1000 - closed)
+                self.assertEqual(datagen.populate(db, 1000, machines=5, tools=20), 0)
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for the benchmark runner"""
+
+    def test_covers_public_methods(self):
+        """Test every public ToolTrackerDB method has a benchmark case"""
+        methods = {name for name, member in inspect.getmembers(ToolTrackerDB)
+                   if not name.startswith("_") and inspect.isfunction(member)}
+        timed = {name.split("[")[0] for name, _ in run.CASES}
+        self.assertEqual(methods - timed, set())
+
+    def test_run(self):
+        """Test a small run times every case against the generated data"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cwd = os.getcwd()
+            os.chdir(tmpdir)
+            try:
+                report = run.run(rows=3000, machines=5, tools=1000, repeat=1,
+                                 log=lambda _: None)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(tmpdir), [])
+        self.assertEqual(report["meta"]["rows"], 3000)
+        self.assertEqual(list(report["results"]), [name for name, _ in run.CASES])
+        self.assertEqual(report["results"]["get_all_installations"]["size"], 3000)
+
+        regressions = run.compare(report, report, log=lambda _: None)
+        self.assertEqual(regressions, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""Tests for the command-line interface"""
+
+import unittest
+import gzip
+import json
+import os
+import tempfile
+from unittest import mock
+
+from click.testing import CliRunner
+
+from src import cli as cli_module
+from src.database import ToolTrackerDB
+from benchmarks import bench_startup
+
+class TestCLI(unittest.TestCase):
+    """Test cases for CLI commands"""
+
+    def setUp(self):
+        """Point the CLI at a fresh database path"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "cli.db")
+        self.runner = CliRunner()
+        cli_module.db = None
+
+    def tearDown(self):
+        """Close the CLI's database and clean up"""
+        if cli_module.db is not None:
+            cli_module.db.close()
+        cli_module.db = None
+        self.tmpdir.cleanup()
+
+    def invoke(self, *args, **kwargs):
+        return self.runner.invoke(cli_module.cli, ["--db", self.db_path] + list(args),
+                                  **kwargs)
+
+    def test_help_does_not_open_database(self):
+        """Test --help and invalid input never create the database"""
+        result = self.invoke("--help")
+        self.assertEqual(result.exit_code, 0)
+        result = self.invoke("list", "--help")
+        self.assertEqual(result.exit_code, 0)
+        result = self.invoke("add", "--machine", "M1", "--tool", "T1",
+                             "--installed-date", "not-a-date")
+        self.assertIn("Invalid date format", result.output)
+        self.assertIsNone(cli_module.db)
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_add_and_list(self):
+        """Test commands use the database given by --db"""
+        result = self.invoke("add", "--machine", "M1", "--tool", "T1",
+                             "--installed-date", "2025-01-01")
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(os.path.exists(self.db_path))
+        result = self.invoke("list")
+        self.assertIn("T1", result.output)
+        self.assertIn("Total records: 1", result.output)
+
+    def test_db_changes_between_invocations(self):
+        """Test a later invocation with another --db opens that database"""
+        self.invoke("add", "--machine", "M1", "--tool", "T1", "--installed-date", "2025-01-01")
+        first = cli_module.db
+        other = os.path.join(self.tmpdir.name, "other.db")
+        result = self.runner.invoke(cli_module.cli, ["--db", other, "stats"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(cli_module.db.db_path, other)
+        self.assertIsNot(cli_module.db, first)
+        self.assertEqual(cli_module.db.get_statistics()["total_records"], 0)
+        result = self.invoke("list")
+        self.assertIn("Total records: 1", result.output)
+
+    def test_env_var(self):
+        """Test the database path can come from the environment"""
+        result = self.runner.invoke(cli_module.cli, ["stats"],
+                                    env={cli_module.DB_ENV_VAR: self.db_path})
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(cli_module.db.db_path, self.db_path)
+
+    def test_current_schema_not_migrated(self):
+        """Test opening an up-to-date database skips schema setup"""
+        ToolTrackerDB(self.db_path).close()
+        with mock.patch("src.database.migrate") as migrate:
+            result = self.invoke("stats")
+        self.assertEqual(result.exit_code, 0)
+        migrate.assert_not_called()
+
+    def test_remove(self):
+        """Test removing one tool, closing out a machine and bulk removal from a file"""
+        for tool in ("T1", "T2", "T3"):
+            self.invoke("add", "--machine", "M1", "--tool", tool, "--installed-date", "2025-01-01")
+        result = self.invoke("remove", "--machine", "M1", "--tool", "T1",
+                             "--removal-date", "2025-02-01")
+        self.assertIn("Removed T1 from M1", result.output)
+        result = self.invoke("remove", "--machine", "M1", "--tool", "T1")
+        self.assertIn("Error:", result.output)
+        result = self.invoke("remove", "--machine", "M1")
+        self.assertIn("either --tool or --all", result.output)
+        result = self.invoke("list", "--active")
+        self.assertIn("Total records: 2", result.output)
+
+        removals = os.path.join(self.tmpdir.name, "removals.csv")
+        with open(removals, "w", encoding="utf-8") as f:
+            f.write("machine,tool,removal_date\nM1,T2,2025-02-01\nM1,T9,2025-02-01\n")
+        result = self.invoke("remove", "--file", removals)
+        self.assertIn("Closed 1 installation(s)", result.output)
+        self.assertIn("record 2", result.output)
+        result = self.invoke("remove", "--file", removals, "--chunk-size", "0")
+        self.assertEqual(result.exit_code, 2)
+        result = self.invoke("remove", "--machine", "M1", "--all", "--removal-date", "2025-03-01")
+        self.assertIn("Removed 1 tool installation(s) from M1", result.output)
+        result = self.invoke("list", "--active")
+        self.assertIn("No records found", result.output)
+
+    def test_history(self):
+        """Test list date ranges and archiving"""
+        self.invoke("add", "--machine", "M1", "--tool", "T1", "--installed-date", "2024-01-01")
+        self.invoke("add", "--machine", "M1", "--tool", "T2", "--installed-date", "2025-01-06")
+        self.invoke("remove", "--machine", "M1", "--tool", "T1", "--removal-date", "2024-02-01")
+        result = self.invoke("list", "--since", "2025-01-01")
+        self.assertIn("Total records: 1", result.output)
+        result = self.invoke("list", "--until", "Jan")
+        self.assertIn("Invalid date format", result.output)
+        result = self.invoke("archive", "--before", "2025-01-01")
+        self.assertIn("Archived 1 installation(s)", result.output)
+        result = self.invoke("list")
+        self.assertIn("Total records: 1", result.output)
+        result = self.invoke("list", "--archived")
+        self.assertIn("Total records: 2", result.output)
+
+    def test_fleet(self):
+        """Test listing, searching and statistics over several site files"""
+        paths = []
+        for site in ("east", "west"):
+            paths.append(os.path.join(self.tmpdir.name, f"{site}.db"))
+            with ToolTrackerDB(paths[-1]) as db:
+                db.add_installation("M1", f"{site}-drill", "2025-01-01", notes="worn")
+        result = self.invoke("fleet", "list", *paths)
+        self.assertIn("east-drill", result.output)
+        self.assertIn("Total records: 2", result.output)
+        result = self.invoke("fleet", "search", "--query", "worn", "--timings", *paths)
+        self.assertIn("Found 2 matching record(s)", result.output)
+        self.assertIn("Site timings (2 sites", result.output)
+        result = self.invoke("fleet", "stats", "--workers", "1", *paths)
+        self.assertIn("Total Installation Records: 2", result.output)
+        self.assertIn("west/M1: 1 tool(s)", result.output)
+        result = self.invoke("fleet", "list", "--since", "Jan", *paths)
+        self.assertIn("Invalid date format", result.output)
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_export(self):
+        """Test exporting to stdout and to a gzipped file with filters"""
+        self.invoke("add", "--machine", "M1", "--tool", "T1", "--installed-date", "2025-01-01")
+        self.invoke("add", "--machine", "M2", "--tool", "T1", "--installed-date", "2025-01-06")
+        result = self.invoke("export")
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(result.output.startswith("id,machine,tool,"))
+        self.assertIn("Exported 2 installation record(s) to stdout", result.output)
+
+        path = os.path.join(self.tmpdir.name, "extract.jsonl.gz")
+        result = self.invoke("export", "-o", path, "--machine", "M2", "--since", "2025-01-02")
+        self.assertIn("Exported 1 installation record(s)", result.output)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["machine"], "M2")
+        result = self.invoke("export", "--until", "January")
+        self.assertIn("Error:", result.output)
+
+    def test_profile(self):
+        """Test --profile prints timings after the command and leaves profiling off"""
+        self.invoke("add", "--machine", "M1", "--tool", "T1", "--installed-date", "2025-01-01")
+        result = self.invoke("--profile", "list")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Total records: 1", result.output)
+        self.assertIn("PROFILE", result.output)
+        self.assertIn("iter_installations", result.output)
+        self.assertIsNone(cli_module.db.profiler)
+        result = self.invoke("list")
+        self.assertNotIn("PROFILE", result.output)
+
+    def test_report_utilization(self):
+        """Test the utilization report by tool, by machine and as JSON"""
+        self.invoke("add", "--machine", "M1", "--tool", "T1", "--installed-date", "2025-01-01")
+        self.invoke("add", "--machine", "M2", "--tool", "T1", "--installed-date", "2025-01-06")
+        period = ["--since", "2025-01-01", "--until", "2025-01-11"]
+        result = self.invoke("report", "utilization", *period)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("(10 days)", result.output)
+        self.assertIn("Body time: 15 days", result.output)
+        self.assertIn("1.50", result.output)
+        result = self.invoke("report", "utilization", "--by", "machine", *period)
+        self.assertIn("M2", result.output)
+        result = self.invoke("report", "utilization", "--json", *period)
+        self.assertEqual(json.loads(result.output)["fleet"]["body_days"], 15)
+        result = self.invoke("report", "utilization", "--since", "2025-02-01", "--until",
+                             "2025-01-01")
+        self.assertIn("Error:", result.output)
+
+class TestStartup(unittest.TestCase):
+    """Test the CLI's import cost stays within budget"""
+
+    def test_import_budget(self):
+        """Test importing src.cli is fast and leaves heavy modules unloaded"""
+        profile = bench_startup.import_profile()
+        for module in bench_startup.DEFERRED_MODULES:
+            self.assertNotIn(module, profile)
+        self.assertLess(bench_startup.import_time_ms(), bench_startup.IMPORT_BUDGET_MS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for concurrent access to one database file"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from src.database import ToolTrackerDB
+from benchmarks import stress_concurrency
+
+class TestConcurrencyMode(unittest.TestCase):
+    """Test cases for journal mode, busy handling and read connections"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+
+    def tearDown(self):
+        """Clean up test database and WAL files"""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.remove(self.test_db.name + suffix)
+
+    def test_invalid_journal_mode(self):
+        """Test unknown journal modes and synchronous levels are rejected"""
+        with self.assertRaises(ValueError):
+            ToolTrackerDB(self.test_db.name, journal_mode="fast")
+        with self.assertRaises(ValueError):
+            ToolTrackerDB(self.test_db.name, synchronous="sometimes")
+
+    def test_wal_mode(self):
+        """Test WAL mode is applied and queries use a read-only connection"""
+        with ToolTrackerDB(self.test_db.name, journal_mode="wal",
+                           synchronous="normal") as db:
+            mode = db.connection.execute("PRAGMA journal_mode").fetchone()[0]
+            self.assertEqual(mode, "wal")
+            self.assertIsNot(db.read_connection, db.connection)
+            with self.assertRaises(sqlite3.OperationalError):
+                db.read_connection.execute("INSERT INTO machines (name) VALUES ('x')")
+
+            db.add_installation("Machine1", "Tool1", "2025-01-01")
+            self.assertEqual(len(db.get_all_installations()), 1)
+            with db.transaction():
+                self.assertIs(db.read_connection, db.connection)
+
+    def test_default_mode_shares_connection(self):
+        """Test queries use the write connection outside WAL mode"""
+        with ToolTrackerDB(self.test_db.name) as db:
+            self.assertIs(db.read_connection, db.connection)
+
+    def test_retry_on_busy(self):
+        """Test a write blocked by another process's lock is retried"""
+        with ToolTrackerDB(self.test_db.name, busy_timeout=0, max_retries=50) as db:
+            blocker = sqlite3.connect(self.test_db.name, isolation_level=None)
+            blocker.execute("BEGIN IMMEDIATE")
+            calls = []
+
+            def release(delay):
+                calls.append(delay)
+                if len(calls) == 2:
+                    blocker.execute("COMMIT")
+
+            with mock.patch("src.database.time.sleep", side_effect=release):
+                db.add_installation("Machine1", "Tool1", "2025-01-01")
+            blocker.close()
+            self.assertEqual(db.busy_retries, 2)
+            self.assertEqual(len(db.get_all_installations()), 1)
+
+    def test_retries_exhausted(self):
+        """Test the lock error is raised once the retries are used up"""
+        with ToolTrackerDB(self.test_db.name, busy_timeout=0, max_retries=2) as db:
+            blocker = sqlite3.connect(self.test_db.name, isolation_level=None)
+            blocker.execute("BEGIN IMMEDIATE")
+            try:
+                with mock.patch("src.database.time.sleep"):
+                    with self.assertRaises(sqlite3.OperationalError):
+                        db.add_installation("Machine1", "Tool1", "2025-01-01")
+            finally:
+                blocker.execute("ROLLBACK")
+                blocker.close()
+            self.assertEqual(db.busy_retries, 2)
+            self.assertEqual(db.get_all_installations(), [])
+
+    def test_stress_wal(self):
+        """Test writer and reader processes run together without lock errors"""
+        totals = stress_concurrency.run(self.test_db.name, writers=2, readers=2,
+                                        seconds=1.0, journal_mode="wal",
+                                        synchronous="normal")
+        self.assertEqual(totals["writer"]["lock_errors"], 0)
+        self.assertEqual(totals["reader"]["lock_errors"], 0)
+        self.assertGreater(totals["reader"]["ops"], 0)
+        with ToolTrackerDB(self.test_db.name) as db:
+            stats = db.get_statistics()
+        self.assertEqual(stats["total_records"], totals["writer"]["ops"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,11 @@
 import unittest
 import os
 import tempfile
+import threading
+import sqlite3
+from datetime import date
 from src.database import ToolTrackerDB
+from src.models import Installation
 
 class TestToolTrackerDB(unittest.TestCase):
     """Test cases for ToolTrackerDB"""
@@ -16,6 +20,7 @@ class TestToolTrackerDB(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test database"""
+        self.db.close()
         if os.path.exists(self.test_db.name):
             os.remove(self.test_db.name)
     
@@ -72,6 +77,295 @@ class TestToolTrackerDB(unittest.TestCase):
         
         records = self.db.search_installations("Machine1")
         self.assertEqual(len(records), 1)
+    
+    def test_connection_reused(self):
+        """Test a thread reuses its connection across calls"""
+        conn = self.db.connection
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.get_statistics()
+        self.assertIs(self.db.connection, conn)
+    
+    def test_connection_per_thread(self):
+        """Test each thread gets its own connection"""
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.db.connection))
+        thread.start()
+        thread.join()
+        self.assertIsNot(connections[0], self.db.connection)
+    
+    def test_context_manager_closes(self):
+        """Test leaving the context manager closes connections"""
+        with ToolTrackerDB(self.test_db.name) as db:
+            conn = db.connection
+            db.add_machine("Machine1")
+        with self.assertRaises(Exception):
+            conn.execute("SELECT 1")
+        # The instance reopens on demand after close
+        self.assertIsNotNone(db.get_machine_id("Machine1"))
+        db.close()
+    
+    def test_transaction_rollback(self):
+        """Test a failed transaction leaves no partial writes"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+                raise RuntimeError("abort")
+        self.assertIsNone(self.db.get_machine_id("Machine1"))
+        self.assertEqual(self.db.get_all_installations(), [])
+    
+    def test_duplicate_installation_keeps_outer_transaction(self):
+        """Test a duplicate insert inside a transaction only undoes itself"""
+        with self.db.transaction():
+            self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+            with self.assertRaises(ValueError):
+                self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+            self.db.add_installation("Machine1", "Tool2", "2025-12-05")
+        self.assertEqual(len(self.db.get_all_installations()), 2)
+    
+    def test_bulk_add_installations(self):
+        """Test bulk insert across several chunks"""
+        records = [
+            {"machine": f"Machine{i % 3}", "tool": f"Tool{i}", "installed_date": "2025-12-05",
+             "tool_type": "End-Mill"}
+            for i in range(25)
+        ]
+        result = self.db.bulk_add_installations(records, chunk_size=10)
+        self.assertEqual(result.inserted, 25)
+        self.assertEqual(result.duplicates, [])
+        self.assertEqual(len(self.db.get_all_installations()), 25)
+        self.assertEqual(len(self.db.get_installations_by_machine("Machine1")), 8)
+        with self.assertRaises(ValueError):
+            self.db.bulk_add_installations(records, chunk_size=0)
+    
+    def test_bulk_add_reports_duplicates(self):
+        """Test duplicates are reported without stopping the import"""
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        records = [
+            {"machine": "Machine1", "tool": "Tool1", "installed_date": "2025-12-05"},
+            {"machine": "Machine1", "tool": "Tool2", "installed_date": "2025-12-05"},
+            {"machine": "Machine1", "tool": "Tool2", "installed_date": "2025-12-05"},
+            {"machine": "Machine2", "tool": "Tool1", "installed_date": "2025-12-06"},
+        ]
+        result = self.db.bulk_add_installations(records)
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(result.duplicates, [
+            (1, "Machine1", "Tool1", "2025-12-05"),
+            (3, "Machine1", "Tool2", "2025-12-05"),
+        ])
+        self.assertEqual(len(self.db.get_all_installations()), 3)
+    
+    def test_bulk_add_restores_triggers(self):
+        """Test bulk loads keep search, rollups and change log whole and restore the triggers"""
+        conn = self.db.connection
+        schema = "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+        triggers = conn.execute(schema).fetchall()
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        records = [
+            {"machine": "Machine1", "tool": "Tool1", "installed_date": "2025-12-05"},
+            {"machine": "Machine2", "tool": "Tool1", "installed_date": "2025-12-06",
+             "notes": "coolant"},
+        ]
+        self.assertEqual(self.db.bulk_add_installations(records).inserted, 1)
+        self.assertEqual(conn.execute(schema).fetchall(), triggers)
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], cache_size)
+        self.db.add_installation("Machine2", "Tool2", "2025-12-07")
+        self.assertEqual(self.db.get_statistics()["total_records"], 3)
+        self.assertEqual(len(self.db.search_installations("coolant")), 1)
+        self.assertEqual(len(self.db.search_installations("Tool2")), 1)
+        self.assertEqual(conn.execute(
+            "SELECT row_id FROM change_log WHERE table_name = 'installations' ORDER BY seq"
+        ).fetchall(), [(1,), (2,), (3,)])
+    
+    def test_bulk_add_initial_load(self):
+        """Test a first import is one transaction that leaves the schema as it was"""
+        conn = self.db.connection
+        schema = ("SELECT name, sql FROM sqlite_master WHERE tbl_name = 'installations' "
+                  "ORDER BY name")
+        before = conn.execute(schema).fetchall()
+        records = [
+            {"machine": f"Machine{i % 3}", "tool": f"Tool{i % 4}", "installed_date": "2025-12-05",
+             "notes": "coolant" if i == 7 else ""}
+            for i in range(14)
+        ]
+        
+        def failing():
+            yield from records
+            raise OSError("feed truncated")
+        
+        with self.assertRaises(OSError):
+            self.db.bulk_add_installations(failing(), chunk_size=5)
+        self.assertEqual(self.db.get_all_installations(), [])
+        self.assertEqual(conn.execute(schema).fetchall(), before)
+        
+        result = self.db.bulk_add_installations(records, chunk_size=5)
+        self.assertEqual(result.inserted, 12)
+        self.assertEqual([number for number, *_ in result.duplicates], [13, 14])
+        self.assertEqual(conn.execute(schema).fetchall(), before)
+        stats = self.db.get_statistics()
+        self.assertEqual((stats["total_records"], stats["active_installations"]), (12, 12))
+        self.assertEqual(len(self.db.search_installations("coolant")), 1)
+        self.assertEqual(conn.execute(
+            "SELECT COUNT(*) FROM change_log WHERE table_name = 'installations'"
+        ).fetchone()[0], 12)
+        self.assertEqual(len(self.db.get_installations_by_machine("Machine1")), 4)
+    
+    def test_bulk_add_reports_invalid_records(self):
+        """Test invalid records are rejected individually"""
+        records = [
+            {"machine": "Machine1", "tool": "Tool1", "installed_date": "12/05/2025"},
+            {"machine": "Machine1", "installed_date": "2025-12-05"},
+            {"machine": "Machine1", "tool": "Tool1", "installed_date": "2025-12-05"},
+        ]
+        result = self.db.bulk_add_installations(records)
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual([number for number, _ in result.errors], [1, 2])
+    
+    def test_id_cache_hits(self):
+        """Test repeated lookups are served from the ID cache"""
+        machine_id = self.db.add_machine("Machine1")
+        before = self.db.id_cache_info()
+        for _ in range(3):
+            self.assertEqual(self.db.get_machine_id("Machine1"), machine_id)
+        after = self.db.id_cache_info()
+        self.assertEqual(after["hits"] - before["hits"], 3)
+        self.assertEqual(after["misses"], before["misses"])
+    
+    def test_id_cache_lru_eviction(self):
+        """Test the ID cache stays within its size bound"""
+        db = ToolTrackerDB(self.test_db.name, id_cache_size=2)
+        for name in ("Machine1", "Machine2", "Machine3"):
+            db.add_machine(name)
+        self.assertEqual(db.id_cache_info()["currsize"], 2)
+        # Machine1 was evicted and has to be read from the database again
+        misses = db.id_cache_info()["misses"]
+        self.assertIsNotNone(db.get_machine_id("Machine1"))
+        self.assertEqual(db.id_cache_info()["misses"], misses + 1)
+        db.close()
+    
+    def test_id_cache_invalidated_by_other_connection(self):
+        """Test external writes to the database file drop stale IDs"""
+        machine_id = self.db.add_machine("Machine1")
+        self.assertEqual(self.db.get_machine_id("Machine1"), machine_id)
+        
+        other = sqlite3.connect(self.test_db.name)
+        other.execute("DELETE FROM machines WHERE name = 'Machine1'")
+        other.execute("INSERT INTO machines (id, name) VALUES (?, 'Machine1')", (machine_id + 100,))
+        other.commit()
+        other.close()
+        
+        self.assertEqual(self.db.get_machine_id("Machine1"), machine_id + 100)
+    
+    def test_id_cache_cleared_on_rollback(self):
+        """Test IDs created in a rolled back transaction are not served"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_machine("Machine1")
+                raise RuntimeError("abort")
+        self.assertIsNone(self.db.get_machine_id("Machine1"))
+    
+    def test_iter_installations_limit_offset(self):
+        """Test limit and offset are applied in SQL, newest first"""
+        for day in range(1, 6):
+            self.db.add_installation("Machine1", "Tool1", f"2025-12-0{day}")
+        records = list(self.db.iter_installations(limit=2, offset=1))
+        self.assertEqual([r['installed_date'] for r in records], ["2025-12-04", "2025-12-03"])
+        self.assertEqual(len(list(self.db.iter_installations(offset=3))), 2)
+    
+    def test_iter_installations_keyset(self):
+        """Test keyset pagination visits every record once, even with equal dates"""
+        for tool in range(7):
+            self.db.add_installation("Machine1", f"Tool{tool}", "2025-12-05")
+            self.db.add_installation("Machine2", f"Tool{tool}", "2025-12-06")
+        seen = []
+        after = None
+        while True:
+            page = list(self.db.iter_installations(limit=3, after=after))
+            if not page:
+                break
+            seen.extend(r['id'] for r in page)
+            after = (page[-1]['installed_date'], page[-1]['id'])
+        self.assertEqual(len(seen), 14)
+        self.assertEqual(len(set(seen)), 14)
+    
+    def test_iter_installations_is_lazy(self):
+        """Test records are produced incrementally from the cursor"""
+        for day in range(1, 6):
+            self.db.add_installation("Machine1", "Tool1", f"2025-12-0{day}")
+        records = self.db.iter_installations(batch_size=2)
+        self.assertEqual(next(records)['installed_date'], "2025-12-05")
+        self.assertEqual(len(list(records)), 4)
+    
+    def test_iter_installations_filters(self):
+        """Test machine and tool filters combine"""
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.add_installation("Machine1", "Tool2", "2025-12-05")
+        self.db.add_installation("Machine2", "Tool1", "2025-12-05")
+        records = list(self.db.iter_installations(machine_name="Machine1", tool_name="Tool1"))
+        self.assertEqual(len(records), 1)
+    
+    def test_iter_installations_row_types(self):
+        """Test tuple and Installation records match the dict records"""
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05", notes="coolant")
+        self.db.add_installation("Machine2", "Tool1", "2025-12-06")
+        self.db.remove_installation("Machine1", "Tool1", "2025-12-20")
+        dicts = list(self.db.iter_installations())
+        tuples = list(self.db.iter_installations(row_type="tuple"))
+        records = list(self.db.iter_installations(row_type="installation"))
+        self.assertEqual(tuples, [tuple(d.values()) for d in dicts])
+        self.assertEqual([r.to_dict() for r in records], dicts)
+        self.assertTrue(all(isinstance(r, Installation) for r in records))
+        self.assertEqual(records[0].machine, "Machine2")
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        
+        search = next(self.db.iter_search("coolant", row_type="installation"))
+        self.assertEqual(search.machine, "Machine1")
+        with self.assertRaises(ValueError):
+            self.db.iter_installations(row_type="namedtuple")
+    
+    def test_installation_dates_parse_lazily(self):
+        """Test Installation keeps date strings and parses them on access"""
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.add_installation("Machine1", "Tool2", "2025-12-01")
+        self.db.remove_installation("Machine1", "Tool2", "2025-12-10")
+        current, removed = self.db.iter_installations(row_type="installation")
+        self.assertEqual(current.installed_date, "2025-12-05")
+        self.assertEqual(current.installed_on, date(2025, 12, 5))
+        self.assertIsNone(current.removed_on)
+        self.assertEqual(removed.removed_on, date(2025, 12, 10))
+    
+    def test_iter_search_limit(self):
+        """Test search results can be limited"""
+        for day in range(1, 4):
+            self.db.add_installation("Machine1", "Tool1", f"2025-12-0{day}")
+        self.assertEqual(len(list(self.db.iter_search("Machine", limit=2))), 2)
+    
+    def test_machine_summary(self):
+        """Test per-machine aggregate counts"""
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.add_installation("Machine1", "Tool1", "2025-12-06")
+        self.db.add_installation("Machine1", "Tool2", "2025-12-06")
+        self.db.add_installation("Machine2", "Tool1", "2025-12-07")
+        summary = self.db.get_machine_summary()
+        self.assertEqual([e['machine'] for e in summary], ["Machine1", "Machine2"])
+        self.assertEqual(summary[0]['installations'], 3)
+        self.assertEqual(summary[0]['tools'], 2)
+        self.assertEqual(summary[0]['active'], 3)
+        self.assertEqual(summary[0]['removed'], 0)
+        self.assertEqual(len(self.db.get_machine_summary("Machine2")), 1)
+        self.assertEqual(self.db.get_machine_summary("Unknown"), [])
+    
+    def test_tool_summary(self):
+        """Test per-tool aggregate counts use distinct machines"""
+        self.db.add_tool("Tool1", "End-Mill")
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.add_installation("Machine1", "Tool1", "2025-12-06")
+        self.db.add_installation("Machine2", "Tool1", "2025-12-07")
+        summary = self.db.get_tool_summary("Tool1")
+        self.assertEqual(summary, [{
+            "tool": "Tool1", "tool_type": "End-Mill", "installations": 3,
+            "machines": 2, "active": 3, "removed": 0,
+        }])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+"""Tests for streaming installation exports"""
+
+import unittest
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+
+from src.database import ToolTrackerDB
+from src.exporter import detect_format
+from src.importer import read_records
+from src.models import INSTALLATION_FIELDS
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+class TestExport(unittest.TestCase):
+    """Test cases for export_installations"""
+
+    def setUp(self):
+        """Set up a test database with a few installations"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "export.db"))
+        self.db.add_installation("Machine1", "Tool1", "2025-01-05", notes='say "hi", then')
+        self.db.add_installation("Machine1", "Tool2", "2025-01-01", "08:00:00")
+        self.db.add_installation("Machine2", "Tool1", "2025-02-01")
+        self.db.remove_installation("Machine1", "Tool1", "2025-01-20")
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_csv_round_trip(self):
+        """Test a CSV extract lists every record oldest first and can be imported"""
+        path = self.path("extract.csv")
+        self.assertEqual(self.db.export_installations(path), 3)
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(tuple(rows[0]), INSTALLATION_FIELDS)
+        self.assertEqual([r["installed_date"] for r in rows],
+                         ["2025-01-01", "2025-01-05", "2025-02-01"])
+        self.assertEqual(rows[1]["notes"], 'say "hi", then')
+        self.assertEqual(rows[1]["removal_date"], "2025-01-20")
+
+        with ToolTrackerDB(self.path("copy.db")) as copy:
+            self.assertEqual(copy.bulk_add_installations(read_records(path)).inserted, 3)
+
+    def test_jsonl_gzip(self):
+        """Test a .jsonl.gz path gives gzipped JSON lines with nulls kept"""
+        path = self.path("extract.jsonl.gz")
+        self.assertEqual(self.db.export_installations(path), 3)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        expected = sorted(self.db.iter_installations(),
+                          key=lambda r: (r["installed_date"], r["id"]))
+        self.assertEqual(records, expected)
+        self.assertIsNone(records[0]["removal_date"])
+
+    def test_filters(self):
+        """Test machine, tool and installation date filters"""
+        def ids(**filters):
+            stream = io.BytesIO()
+            self.db.export_installations(stream, fmt="jsonl", **filters)
+            return [json.loads(line)["installed_date"] for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(ids(machine_name="Machine1"), ["2025-01-01", "2025-01-05"])
+        self.assertEqual(ids(tool_name="Tool1"), ["2025-01-05", "2025-02-01"])
+        self.assertEqual(ids(since="2025-01-05"), ["2025-01-05", "2025-02-01"])
+        self.assertEqual(ids(since="2025-01-02", until="2025-01-31"), ["2025-01-05"])
+        self.assertEqual(ids(machine_name="Missing"), [])
+        with self.assertRaises(ValueError):
+            self.db.export_installations(io.BytesIO(), since="01/05/2025")
+
+    def test_formats(self):
+        """Test format detection from file names"""
+        self.assertEqual(detect_format("a.CSV"), ("csv", False))
+        self.assertEqual(detect_format("a.ndjson.gz"), ("jsonl", True))
+        self.assertEqual(detect_format("a.parquet"), ("parquet", False))
+        with self.assertRaises(ValueError):
+            detect_format("a.txt")
+        with self.assertRaises(ValueError):
+            self.db.export_installations(io.BytesIO(), fmt="xml")
+
+    def test_memory_is_bounded(self):
+        """Test exporting streams in batches instead of loading every record"""
+        self.db.bulk_add_installations(
+            {"machine": f"M{i % 50}", "tool": f"T{i // 50}", "installed_date": "2025-03-01",
+             "notes": "x" * 100}
+            for i in range(20000))
+        stream = io.BytesIO()
+        tracemalloc.start()
+        try:
+            # Discard output as it is written so only the export itself is traced
+            stream.write = len
+            count = self.db.export_installations(stream, fmt="csv", batch_size=500)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 20003)
+        # Holding every record would take several MB
+        self.assertLess(peak, 1024 * 1024)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet(self):
+        """Test a Parquet extract has every record"""
+        path = self.path("extract.parquet")
+        self.assertEqual(self.db.export_installations(path, batch_size=2), 3)
+        table = pq.read_table(path)
+        self.assertEqual(table.column_names, list(INSTALLATION_FIELDS))
+        self.assertEqual(table.column("tool").to_pylist(), ["Tool2", "Tool1", "Tool1"])
+
+    @unittest.skipIf(pq is not None, "pyarrow is installed")
+    def test_parquet_needs_pyarrow(self):
+        """Test Parquet export without pyarrow fails before creating the file"""
+        path = self.path("extract.parquet")
+        with self.assertRaisesRegex(ImportError, "pyarrow"):
+            self.db.export_installations(path)
+        self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
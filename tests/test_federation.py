@@ -0,0 +1,93 @@
+"""Tests for fleet-wide reads across several site databases"""
+
+import unittest
+import os
+import tempfile
+
+from src.database import ToolTrackerDB
+from src.federation import FederatedTrackerDB, site_names
+
+class TestFederation(unittest.TestCase):
+    """Test cases for FederatedTrackerDB"""
+
+    def setUp(self):
+        """Set up three site databases with overlapping dates"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for site, dates in (("plant-a", ["2025-01-01", "2025-01-04"]),
+                            ("plant-b", ["2025-01-02", "2025-01-03", "2025-01-05"]),
+                            ("plant-c", [])):
+            os.mkdir(os.path.join(self.tmpdir.name, site))
+            path = os.path.join(self.tmpdir.name, site, "tool_tracker.db")
+            with ToolTrackerDB(path) as db:
+                for n, installed in enumerate(dates):
+                    db.add_installation("Mill", f"Drill-{n}", installed,
+                                        notes="coolant leak" if n == 0 else None)
+                db.add_tool("Spare", tool_type="Drill")
+            self.paths.append(path)
+        self.fleet = FederatedTrackerDB(self.paths, workers=2)
+
+    def tearDown(self):
+        """Close the fleet and clean up"""
+        self.fleet.close()
+        self.tmpdir.cleanup()
+
+    def test_site_names(self):
+        """Test sites are named after their files, or directories when files clash"""
+        self.assertEqual(list(self.fleet.sites), ["plant-a", "plant-b", "plant-c"])
+        self.assertEqual(list(site_names(["x/a.db", "y/b.db"])), ["a", "b"])
+        self.assertEqual(list(site_names(["x/a.db", "y/a.db"])), ["x", "y"])
+        self.assertEqual(list(site_names(["x/a.db", "y/x/a.db"])), ["x/a.db", "y/x/a.db"])
+        with self.assertRaises(ValueError):
+            FederatedTrackerDB([os.path.join(self.tmpdir.name, "missing.db")])
+
+    def test_listing_is_merged_newest_first(self):
+        """Test listings from every site stream in one date order"""
+        records = list(self.fleet.iter_installations())
+        self.assertEqual([(r["site"], r["installed_date"]) for r in records], [
+            ("plant-b", "2025-01-05"), ("plant-a", "2025-01-04"), ("plant-b", "2025-01-03"),
+            ("plant-b", "2025-01-02"), ("plant-a", "2025-01-01")])
+        page = list(self.fleet.iter_installations(limit=2, offset=1))
+        self.assertEqual([r["installed_date"] for r in page], ["2025-01-04", "2025-01-03"])
+        self.assertEqual(len(self.fleet.get_installations(tool_name="Drill-0",
+                                                          since="2025-01-02")), 1)
+        self.assertEqual(self.fleet.timings["plant-b"]["rows"], 1)
+        with self.assertRaises(ValueError):
+            list(self.fleet.iter_installations(since="Jan"))
+
+    def test_search(self):
+        """Test searches take each site's best match in turn"""
+        records = self.fleet.search_installations("coolant")
+        self.assertEqual([r["site"] for r in records], ["plant-a", "plant-b"])
+        self.assertEqual(len(list(self.fleet.iter_search("drill", limit=3))), 3)
+
+    def test_statistics(self):
+        """Test statistics are added up over the sites"""
+        stats = self.fleet.get_statistics()
+        self.assertEqual(stats["total_records"], 5)
+        self.assertEqual(stats["active_installations"], 5)
+        self.assertEqual(stats["total_machines"], 2)
+        self.assertEqual(stats["total_tools"], 8)
+        self.assertEqual(stats["tools_per_machine"], {"plant-b/Mill": 3, "plant-a/Mill": 2})
+        self.assertEqual(stats["sites"]["plant-c"]["total_records"], 0)
+
+    def test_timings(self):
+        """Test each call reports the time and rows of every site"""
+        list(self.fleet.iter_installations())
+        self.assertEqual({site: t["rows"] for site, t in self.fleet.timings.items()},
+                         {"plant-a": 2, "plant-b": 3, "plant-c": 0})
+        self.assertTrue(all(t["seconds"] > 0 for t in self.fleet.timings.values()))
+        report = self.fleet.timing_report()
+        self.assertIn("3 sites", report)
+        self.assertIn("plant-c", report)
+
+    def test_many_sites(self):
+        """Test more sites than threads are all queried"""
+        paths = {f"site-{n}": self.paths[n % 2] for n in range(60)}
+        with FederatedTrackerDB(paths, workers=4) as fleet:
+            self.assertEqual(fleet.get_statistics()["total_records"], 150)
+            self.assertEqual(len(list(fleet.iter_installations(limit=100))), 100)
+            self.assertEqual(len(fleet.timings), 60)
+
+if __name__ == '__main__':
+    unittest.main()
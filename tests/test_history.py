@@ -0,0 +1,125 @@
+"""Tests for date-range queries and the installation archive"""
+
+import unittest
+import io
+import json
+import os
+import tempfile
+from datetime import date
+
+from src.database import ToolTrackerDB
+from src.utils import date_to_day, day_to_date
+
+class TestHistory(unittest.TestCase):
+    """Test cases for since/until filters and archive_installations"""
+
+    def setUp(self):
+        """Set up a test database with closed and open installations"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "history.db"))
+        self.db.add_installation("Machine1", "Tool1", "2024-01-10", notes="old spindle")
+        self.db.add_installation("Machine1", "Tool2", "2024-03-01")
+        self.db.add_installation("Machine2", "Tool1", "2024-03-15")
+        self.db.add_installation("Machine2", "Tool2", "2025-03-01")
+        self.db.add_installation("Machine1", "Tool3", "2025-03-31")
+        self.db.remove_installation("Machine1", "Tool1", "2024-02-01")
+        self.db.remove_installation("Machine2", "Tool1", "2024-06-30")
+        self.db.remove_installation("Machine1", "Tool2", "2025-04-01")
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def dates(self, records):
+        return [r["installed_date"] for r in records]
+
+    def test_day_numbers(self):
+        """Test stored day numbers are date ordinals"""
+        self.assertEqual(date_to_day("2025-03-01"), date(2025, 3, 1).toordinal())
+        self.assertEqual(day_to_date(date_to_day("2024-02-29")), "2024-02-29")
+        days = self.db.connection.execute(
+            "SELECT installed_day, removal_day FROM installations WHERE id = 1").fetchone()
+        self.assertEqual(days, (date_to_day("2024-01-10"), date_to_day("2024-02-01")))
+
+    def test_date_range(self):
+        """Test since and until are inclusive bounds on the installation date"""
+        march = dict(since="2025-03-01", until="2025-03-31")
+        self.assertEqual(self.dates(self.db.iter_installations(**march)),
+                         ["2025-03-31", "2025-03-01"])
+        self.assertEqual(self.dates(self.db.get_installations_by_machine("Machine1", **march)),
+                         ["2025-03-31"])
+        self.assertEqual(self.dates(self.db.get_installations_by_tool("Tool1", since="2024-03-01")),
+                         ["2024-03-15"])
+        self.assertEqual(self.dates(self.db.get_all_installations(until="2024-03-01")),
+                         ["2024-03-01", "2024-01-10"])
+        self.assertEqual(self.dates(self.db.iter_installations(since="2024-03-01", limit=2)),
+                         ["2025-03-31", "2025-03-01"])
+        with self.assertRaises(ValueError):
+            self.db.iter_installations(since="March")
+        with self.assertRaises(ValueError):
+            self.db.iter_installations(since="2025-04-01", until="2025-03-01")
+        # Unpadded bounds are ordered as dates, not strings
+        self.assertEqual(self.dates(self.db.iter_installations(since="2025-3-1",
+                                                               until="2025-10-31")),
+                         ["2025-03-31", "2025-03-01"])
+
+    def test_archive(self):
+        """Test only installations removed before the cutoff are moved"""
+        everything = self.db.get_all_installations()
+        self.assertEqual(self.db.archive_installations("2024-07-01", chunk_size=2), 2)
+        self.assertEqual(self.dates(self.db.get_all_installations()),
+                         ["2025-03-31", "2025-03-01", "2024-03-01"])
+        self.assertEqual(self.db.connection.execute(
+            "SELECT id, removal_date FROM installations_archive ORDER BY id").fetchall(),
+            [(1, "2024-02-01"), (3, "2024-06-30")])
+        # Nothing left to move
+        self.assertEqual(self.db.archive_installations("2024-07-01"), 0)
+
+        stats = self.db.get_statistics()
+        self.assertEqual((stats["total_records"], stats["active_installations"]), (3, 2))
+        self.assertEqual(self.db.search_installations("spindle"), [])
+        with self.assertRaises(ValueError):
+            self.db.archive_installations("soon")
+
+        self.assertEqual(self.db.get_all_installations(archived=True), everything)
+
+    def test_queries_across_archive(self):
+        """Test archived=True merges both tables in order with every filter"""
+        before = {
+            "machine": self.db.get_installations_by_machine("Machine1"),
+            "tool": self.db.get_installations_by_tool("Tool1", since="2024-03-01"),
+            "page": list(self.db.iter_installations(limit=2, offset=2, row_type="tuple")),
+            "keyset": list(self.db.iter_installations(after=("2024-03-15", 3))),
+            "utilization": self.db.get_utilization("2024-01-01", "2025-06-30"),
+        }
+        self.db.archive_installations("2025-01-01")
+        self.assertNotEqual(self.db.get_installations_by_machine("Machine1"), before["machine"])
+
+        self.assertEqual(self.db.get_installations_by_machine("Machine1", archived=True),
+                         before["machine"])
+        self.assertEqual(self.db.get_installations_by_tool("Tool1", since="2024-03-01",
+                                                           archived=True), before["tool"])
+        self.assertEqual(list(self.db.iter_installations(limit=2, offset=2, row_type="tuple",
+                                                         archived=True)), before["page"])
+        self.assertEqual(list(self.db.iter_installations(after=("2024-03-15", 3),
+                                                         archived=True)), before["keyset"])
+        self.assertEqual(self.db.get_utilization("2024-01-01", "2025-06-30", archived=True),
+                         before["utilization"])
+        # Archived installations are closed, so never active
+        self.assertEqual(len(list(self.db.iter_installations(active=True, archived=True))), 2)
+
+        stream = io.BytesIO()
+        self.assertEqual(self.db.export_installations(stream, fmt="jsonl", archived=True), 5)
+        exported = [json.loads(line)["id"] for line in stream.getvalue().splitlines()]
+        self.assertEqual(exported, [1, 2, 3, 4, 5])
+
+    def test_utilization_default_period(self):
+        """Test the default period starts at the first installation, archived or not"""
+        self.db.archive_installations("2025-01-01")
+        self.assertEqual(self.db.get_utilization(until="2025-12-31")["since"], "2024-03-01")
+        self.assertEqual(self.db.get_utilization(until="2025-12-31", archived=True)["since"],
+                         "2024-01-10")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Unit tests for the bulk feed readers"""
+
+import unittest
+import os
+import tempfile
+from src.importer import read_records, detect_format
+
+class TestImporter(unittest.TestCase):
+    """Test cases for CSV and JSONL feed readers"""
+    
+    def setUp(self):
+        """Create a scratch directory for feed files"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Remove feed files"""
+        self.tmpdir.cleanup()
+    
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+    
+    def test_read_csv(self):
+        """Test reading a CSV feed with aliased column names"""
+        path = self.write("feed.csv",
+                          "machine_name,tool_name,installed_date,notes\n"
+                          "Machine1, Tool1 ,2025-12-05,\n")
+        records = list(read_records(path))
+        self.assertEqual(records, [{
+            "machine": "Machine1", "tool": "Tool1",
+            "installed_date": "2025-12-05", "notes": "",
+        }])
+    
+    def test_read_jsonl(self):
+        """Test reading a JSONL feed, skipping blank lines"""
+        path = self.write("feed.jsonl",
+                          '{"machine": "Machine1", "tool": "Tool1", "installed_date": "2025-12-05"}\n'
+                          '\n'
+                          '{"machine": "Machine2", "tool": "Tool1", "installed_date": "2025-12-06"}\n')
+        records = list(read_records(path))
+        self.assertEqual([r["machine"] for r in records], ["Machine1", "Machine2"])
+    
+    def test_invalid_jsonl_line(self):
+        """Test a malformed JSONL line reports its line number"""
+        path = self.write("feed.jsonl", '{"machine": "Machine1"}\n{oops\n')
+        with self.assertRaisesRegex(ValueError, "Line 2"):
+            list(read_records(path))
+    
+    def test_detect_format(self):
+        """Test format detection from the file extension"""
+        self.assertEqual(detect_format("feed.CSV"), "csv")
+        self.assertEqual(detect_format("feed.ndjson"), "jsonl")
+        with self.assertRaises(ValueError):
+            detect_format("feed.xlsx")
+
+if __name__ == '__main__':
+    unittest.main()
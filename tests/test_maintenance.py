@@ -0,0 +1,186 @@
+"""Tests for online backups and database maintenance"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from click.testing import CliRunner
+
+from benchmarks import bench_backup, datagen
+from src import cli as cli_module
+from src.database import ToolTrackerDB
+
+class TestBackup(unittest.TestCase):
+    """Test cases for backup()"""
+
+    def setUp(self):
+        """Set up a database with some history"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "tracker.db"))
+        datagen.populate(self.db, 2000)
+        self.target = os.path.join(self.tmpdir.name, "backup.db")
+
+    def tearDown(self):
+        """Close the database and clean up"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_backup(self):
+        """Test the copy holds the same data and progress is reported step by step"""
+        steps = []
+        result = self.db.backup(self.target, step_pages=50,
+                                progress=lambda copied, total: steps.append((copied, total)))
+        self.assertTrue(result.complete)
+        self.assertEqual(result.restarts, 0)
+        self.assertEqual(steps[-1], (result.total_pages, result.total_pages))
+        self.assertEqual(len(steps), -(-result.total_pages // 50))
+        with ToolTrackerDB(self.target) as copy:
+            self.assertEqual(copy.get_statistics(), self.db.get_statistics())
+            self.assertEqual(copy.database_id, self.db.database_id)
+        self.assertFalse(os.path.exists(self.target + ".partial"))
+
+    def test_time_budget(self):
+        """Test a backup out of time leaves the previous backup as it was"""
+        self.db.backup(self.target)
+        self.db.add_installation("Late", "Tool", "2040-01-01")
+        result = self.db.backup(self.target, step_pages=1, pause=0.01, time_budget=0.05)
+        self.assertFalse(result.complete)
+        self.assertLess(result.pages, result.total_pages)
+        self.assertFalse(os.path.exists(self.target + ".partial"))
+        with ToolTrackerDB(self.target) as copy:
+            self.assertIsNone(copy.get_machine_id("Late"))
+
+    def test_errors(self):
+        """Test backing up onto the database itself is refused"""
+        with self.assertRaises(ValueError):
+            self.db.backup(self.db.db_path)
+        with self.assertRaises(ValueError):
+            self.db.backup(self.target, step_pages=0)
+
+    def test_under_writes(self):
+        """Test backup throughput and write latency with a writer running"""
+        for journal_mode in ("wal", "delete"):
+            report = bench_backup.run(os.path.join(self.tmpdir.name, f"{journal_mode}.db"),
+                                      rows=3000, journal_mode=journal_mode, step_pages=20,
+                                      seconds=0.3, log=lambda message: None)
+            backup = report["backup"]
+            self.assertTrue(backup["complete"], journal_mode)
+            self.assertGreater(backup["mb_per_sec"], 0)
+            latency = report["write_latency"]["backup"]
+            self.assertGreater(latency["writes"], 0, journal_mode)
+            # Writers wait at most for a step or a snapshot copy, never the busy timeout
+            self.assertLess(latency["max_ms"], 1000, journal_mode)
+            if journal_mode == "wal":
+                # Copying from one snapshot, other writers never restart it
+                self.assertEqual(backup["restarts"], 0)
+            self.assertTrue(report["maintain"]["complete"])
+
+class TestMaintain(unittest.TestCase):
+    """Test cases for maintain()"""
+
+    def setUp(self):
+        """Set up a database file"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tracker.db")
+
+    def tearDown(self):
+        """Clean up"""
+        self.tmpdir.cleanup()
+
+    def fill_and_empty(self, db):
+        """Load and then delete enough rows to leave free pages behind"""
+        datagen.populate(db, 3000)
+        db.connection.execute("DELETE FROM installations WHERE id <= 2000")
+
+    def test_maintain(self):
+        """Test free pages are given back, statistics gathered and tables checked"""
+        with ToolTrackerDB(self.path) as db:
+            self.fill_and_empty(db)
+            free = db.connection.execute("PRAGMA freelist_count").fetchone()[0]
+            self.assertGreater(free, 0)
+            size = os.path.getsize(self.path)
+            steps = []
+            result = db.maintain(step_pages=2, progress=lambda *step: steps.append(step))
+            self.assertTrue(result.complete)
+            self.assertEqual((result.pages_freed, result.free_pages), (free, 0))
+            self.assertLess(os.path.getsize(self.path), size)
+            self.assertTrue(result.analyzed)
+            self.assertTrue(db.connection.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0])
+            self.assertEqual(result.problems, [])
+            self.assertGreater(result.tables_checked, 10)
+            self.assertEqual({step for step, _, _ in steps}, {"vacuum", "analyze", "check"})
+            self.assertEqual(steps[-1], ("check", result.tables_checked, result.tables_checked))
+            self.assertEqual(db.get_statistics()["total_records"], 1000)
+
+    def test_time_budget(self):
+        """Test a run out of time stops early and leaves the database usable"""
+        with ToolTrackerDB(self.path) as db:
+            datagen.populate(db, 3000)
+            result = db.maintain(time_budget=1e-6)
+            self.assertFalse(result.complete)
+            self.assertFalse(result.analyzed)
+            self.assertEqual(db.add_installation("M", "T", "2040-01-01"), 3001)
+            self.assertTrue(db.maintain(vacuum=False, analyze=False).complete)
+
+    def test_full_vacuum(self):
+        """Test a database made before incremental vacuum is converted on request"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE machines (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "name TEXT UNIQUE NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.close()
+        with ToolTrackerDB(self.path) as db:
+            self.fill_and_empty(db)
+            self.assertEqual(db.connection.execute("PRAGMA auto_vacuum").fetchone()[0], 0)
+            result = db.maintain(analyze=False, check=False)
+            self.assertEqual(result.pages_freed, 0)
+            self.assertGreater(result.free_pages, 0)
+            result = db.maintain(analyze=False, check=False, full_vacuum=True)
+            self.assertEqual(result.free_pages, 0)
+            self.assertEqual(db.connection.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+
+class TestMaintenanceCommands(unittest.TestCase):
+    """Test cases for the backup and maintain commands"""
+
+    def setUp(self):
+        """Set up a small database"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "tracker.db"))
+        self.db.add_installation("Mill", "Drill", "2025-01-01")
+        self.runner = CliRunner()
+
+    def tearDown(self):
+        """Close the database and clean up"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def invoke(self, *args):
+        with mock.patch.object(cli_module, "db", self.db):
+            return self.runner.invoke(cli_module.cli, ["--db", self.db.db_path] + list(args))
+
+    def test_backup(self):
+        """Test the backup command reports progress and throughput"""
+        target = os.path.join(self.tmpdir.name, "backup.db")
+        result = self.invoke("backup", target, "--step-pages", "10")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Backed up", result.stdout)
+        self.assertIn("backup: 10/", result.stderr)
+        self.assertIn("(100%)", result.stderr)
+        self.assertTrue(os.path.exists(target))
+        result = self.invoke("backup", self.db.db_path)
+        self.assertIn("Error", result.stderr)
+
+    def test_maintain(self):
+        """Test the maintain command reports each step"""
+        result = self.invoke("maintain")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Refreshed query planner statistics", result.stdout)
+        self.assertIn("0 problem(s) found", result.stdout)
+        self.assertIn("check: ", result.stderr)
+        result = self.invoke("maintain", "--no-vacuum", "--no-analyze")
+        self.assertNotIn("Refreshed", result.stdout)
+        self.assertNotIn("Freed", result.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Unit tests for schema migrations"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+from datetime import date
+from src.database import ToolTrackerDB
+from src.migrations import SCHEMA_VERSION, get_version
+
+class TestMigrations(unittest.TestCase):
+    """Test cases for the versioned schema"""
+    
+    def setUp(self):
+        """Create an empty database file"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+    
+    def tearDown(self):
+        """Clean up test database"""
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+    
+    def test_new_database_is_current(self):
+        """Test a new database is created at the latest version"""
+        with ToolTrackerDB(self.test_db.name) as db:
+            self.assertEqual(get_version(db.connection), SCHEMA_VERSION)
+    
+    def test_upgrade_unversioned_database(self):
+        """Test a database created before migrations keeps its data"""
+        conn = sqlite3.connect(self.test_db.name)
+        conn.executescript("""
+            CREATE TABLE machines (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE tools (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                                type TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE installations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, machine_id INTEGER NOT NULL,
+                tool_id INTEGER NOT NULL, installed_date DATE NOT NULL, installation_time TIME,
+                removal_date DATE, notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(machine_id, tool_id, installed_date));
+            INSERT INTO machines (name) VALUES ('Machine1');
+            INSERT INTO tools (name) VALUES ('Tool1');
+            INSERT INTO installations (machine_id, tool_id, installed_date) VALUES (1, 1, '2025-12-05');
+        """)
+        conn.close()
+        
+        with ToolTrackerDB(self.test_db.name) as db:
+            self.assertEqual(get_version(db.connection), SCHEMA_VERSION)
+            self.assertEqual(len(db.get_all_installations()), 1)
+            indexes = {row[0] for row in db.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+            # Date-keyed indexes are on the integer day columns
+            self.assertIn("idx_installations_tool_day", indexes)
+            self.assertNotIn("idx_installations_tool_date", indexes)
+            # Open installations are indexed on their own
+            self.assertIn("idx_installations_active", indexes)
+            self.assertIn("idx_installations_active_day", indexes)
+            self.assertNotIn("idx_installations_active_date", indexes)
+            self.assertNotIn("idx_installations_removal_date", indexes)
+            # The rebuilt table keeps its AUTOINCREMENT sequence and unique key
+            self.assertEqual(db.add_installation("Machine1", "Tool1", "2025-12-06"), 2)
+            with self.assertRaises(ValueError):
+                db.add_installation("Machine1", "Tool1", "2025-12-05")
+            # Rollups are filled from the existing rows
+            stats = db.get_statistics()
+            self.assertEqual(stats["total_records"], 2)
+            self.assertEqual(stats["total_machines"], 1)
+            self.assertEqual(stats["tools_per_machine"], {"Machine1": 2})
+            # Day columns are computed for existing rows too
+            self.assertEqual(
+                db.connection.execute("SELECT MIN(installed_day) FROM installations").fetchone()[0],
+                date(2025, 12, 5).toordinal())
+            # Existing rows are in the change log, so a replica can copy them
+            self.assertEqual([(c["table"], c["id"]) for c in db.get_changes()], [
+                ("machines", 1), ("tools", 1), ("installations", 1), ("installations", 2)])
+    
+    def test_unpadded_dates_are_padded(self):
+        """Test dates stored unpadded before input was normalized get day numbers"""
+        conn = sqlite3.connect(self.test_db.name)
+        conn.executescript("""
+            CREATE TABLE machines (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE tools (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                                type TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE installations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, machine_id INTEGER NOT NULL,
+                tool_id INTEGER NOT NULL, installed_date DATE NOT NULL, installation_time TIME,
+                removal_date DATE, notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(machine_id, tool_id, installed_date));
+            INSERT INTO machines (name) VALUES ('Machine1');
+            INSERT INTO tools (name) VALUES ('Tool1'), ('Tool2');
+            INSERT INTO installations (machine_id, tool_id, installed_date, removal_date)
+            VALUES (1, 1, '2025-3-7', '2025-4-1'), (1, 2, '2025-03-08', NULL),
+                   (1, 2, '2025-3-8', NULL), (1, 1, '2025-03- 9', NULL);
+        """)
+        conn.close()
+        
+        with ToolTrackerDB(self.test_db.name) as db:
+            self.assertEqual(db.connection.execute(
+                "SELECT COUNT(*) FROM installations WHERE installed_day IS NULL").fetchone()[0], 0)
+            records = db.get_all_installations(since="2025-03-01", until="2025-03-31")
+            # The later copy of the same installation is dropped
+            self.assertEqual([(r["id"], r["installed_date"], r["removal_date"]) for r in records],
+                             [(4, "2025-03-09", None), (2, "2025-03-08", None),
+                              (1, "2025-03-07", "2025-04-01")])
+            stats = db.get_statistics()
+            self.assertEqual((stats["total_records"], stats["active_installations"]), (3, 2))
+            self.assertEqual(db.get_utilization(since="2025-03-01",
+                                                until="2025-03-31")["fleet"]["installations"], 3)
+    
+    def test_reopen_skips_migrations(self):
+        """Test opening a current database runs no schema statements"""
+        ToolTrackerDB(self.test_db.name).close()
+        statements = []
+        with ToolTrackerDB(self.test_db.name) as db:
+            db.connection.set_trace_callback(statements.append)
+            db.init_database()
+        self.assertFalse([s for s in statements if "CREATE" in s.upper()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Tests for query profiling and instrumentation"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+
+from src.database import ToolTrackerDB
+from src.profiling import LatencyHistogram, normalize_sql
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for ToolTrackerDB profiling"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "profile.db")
+        self.db = ToolTrackerDB(self.path)
+        for day in range(1, 6):
+            self.db.add_installation("Machine1", f"Tool{day}", f"2025-01-0{day}")
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_disabled_by_default(self):
+        """Test nothing is wrapped unless profiling is enabled"""
+        self.assertIsNone(self.db.profiler)
+        self.assertIs(type(self.db.connection), sqlite3.Connection)
+        self.assertEqual([name for name in vars(self.db) if callable(getattr(self.db, name))], [])
+
+    def test_methods_and_statements(self):
+        """Test method calls, statements, rows and cache hits are recorded"""
+        profiler = self.db.enable_profiling()
+        records = self.db.iter_installations(batch_size=2)
+        self.assertEqual(len(list(records)), 5)
+        self.db.get_machine_id("Machine1")
+        self.db.get_machine_id("Machine1")
+        self.db.add_installation("Machine2", "Tool1", "2025-02-01")
+
+        summary = profiler.summary()
+        self.assertEqual(summary["methods"]["iter_installations"]["calls"], 1)
+        self.assertEqual(summary["methods"]["get_machine_id"]["calls"], 3)
+        self.assertEqual(summary["methods"]["add_installation"]["calls"], 1)
+        listing = [entry for sql, entry in summary["statements"].items()
+                   if sql.startswith("SELECT i.id") and "ORDER BY i.installed_day DESC" in sql]
+        self.assertEqual([entry["rows"] for entry in listing], [5])
+        inserts = [entry for sql, entry in summary["statements"].items()
+                   if sql.startswith("INSERT INTO installations")]
+        self.assertEqual(inserts[0]["rows"], 1)
+        self.assertEqual(summary["connections"], {"write": 1})
+        # The cache is emptied when profiling reopens the connection
+        self.assertEqual(summary["caches"]["id"]["hits"], 1)
+        self.assertIn("iter_installations", profiler.report())
+
+        profiler.reset()
+        self.assertEqual(profiler.summary()["methods"], {})
+        self.assertEqual(profiler.summary()["caches"]["id"]["hits"], 0)
+
+    def test_failed_calls_are_recorded(self):
+        """Test calls that raise are still timed and errors pass through"""
+        profiler = self.db.enable_profiling()
+        with self.assertRaises(ValueError):
+            self.db.add_installation("Machine1", "Tool1", "2025-01-01")
+        self.assertEqual(profiler.summary()["methods"]["add_installation"]["calls"], 1)
+        self.assertEqual(self.db.get_statistics()["total_records"], 5)
+
+    def test_slow_query_log(self):
+        """Test statements over the threshold are logged and kept"""
+        profiler = self.db.enable_profiling(slow_query_ms=1e-6)
+        with self.assertLogs("tool_tracker.slow_queries", level="WARNING") as logs:
+            self.db.get_statistics()
+        self.assertIn("slow query", logs.output[0])
+        self.assertTrue(profiler.summary()["slow_queries"])
+        self.assertIn("Slow queries", profiler.report())
+
+    def test_disable(self):
+        """Test disabling restores plain connections and methods"""
+        with ToolTrackerDB(self.path, profile=True) as db:
+            self.assertIn("init_database", db.profiler.summary()["methods"])
+            profiler = db.disable_profiling()
+            db.get_statistics()
+            self.assertNotIn("get_statistics", profiler.summary()["methods"])
+            self.assertIsNone(db.profiler)
+            self.assertIs(type(db.connection), sqlite3.Connection)
+            self.assertIsNone(db.disable_profiling())
+
+    def test_read_connections(self):
+        """Test WAL read-only connections are counted and instrumented"""
+        with ToolTrackerDB(self.path, journal_mode="wal", profile=True) as db:
+            self.assertEqual(len(list(db.iter_installations())), 5)
+            self.assertEqual(db.profiler.summary()["connections"], {"write": 1, "read": 1})
+
+    def test_histogram(self):
+        """Test percentiles are bucket upper bounds within a factor of two"""
+        histogram = LatencyHistogram()
+        for ms in [1] * 90 + [100] * 10:
+            histogram.add(ms / 1000)
+        summary = histogram.summary()
+        self.assertEqual(summary["calls"], 100)
+        self.assertTrue(1 <= summary["p50_ms"] <= 2)
+        self.assertTrue(50 <= summary["p99_ms"] <= 100)
+        self.assertEqual(summary["max_ms"], 100)
+
+    def test_normalize_sql(self):
+        """Test placeholder lists of any length group under one statement"""
+        self.assertEqual(normalize_sql("SELECT id FROM machines WHERE name IN (?, ?, ?)"),
+                         normalize_sql("SELECT id FROM machines\n WHERE name IN (?,?)"))
+        self.assertEqual(normalize_sql("INSERT INTO t VALUES (?, ?), (?, ?), (?, ?)"),
+                         "INSERT INTO t VALUES (?, ...), ...")
+
+if __name__ == '__main__':
+    unittest.main()
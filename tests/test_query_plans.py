@@ -0,0 +1,131 @@
+"""EXPLAIN QUERY PLAN checks for the hot query paths"""
+
+import unittest
+import os
+import re
+import tempfile
+from benchmarks import datagen
+from src.database import ToolTrackerDB
+
+# A plan step that reads the installations table without any index
+TABLE_SCAN = re.compile(r"^SCAN (i|installations)\b(?!.*USING (COVERING )?INDEX)")
+# Any plan step that reads the installations table
+INSTALLATIONS_STEP = re.compile(r"^(SCAN|SEARCH) (i|installations)\b")
+
+class TestQueryPlans(unittest.TestCase):
+    """Hot queries must be served by indexes, not table scans"""
+    
+    def setUp(self):
+        """Set up a small test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+        self.db.add_installation("Machine1", "Tool1", "2025-12-05")
+        self.db.add_installation("Machine2", "Tool2", "2025-12-06")
+    
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+    
+    def plans(self, call):
+        """Run ``call`` and return the query plan of every SELECT or UPDATE it executes"""
+        conn = self.db.connection
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        
+        plans = {}
+        for sql in statements:
+            if sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE")):
+                plans[sql] = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        self.assertTrue(plans, "no queries captured")
+        return plans
+    
+    def assert_no_table_scan(self, call, sorted_output=False):
+        for sql, steps in self.plans(call).items():
+            for step in steps:
+                self.assertIsNone(TABLE_SCAN.search(step), f"table scan in:\n{sql}\n{steps}")
+                if sorted_output:
+                    self.assertNotIn("TEMP B-TREE FOR ORDER BY", step, f"sort in:\n{sql}\n{steps}")
+    
+    def test_all_installations(self):
+        """Test the full listing walks the date index without sorting"""
+        self.assert_no_table_scan(self.db.get_all_installations, sorted_output=True)
+    
+    def test_installations_by_machine(self):
+        """Test filtering by machine uses the machine/date index"""
+        self.assert_no_table_scan(lambda: self.db.get_installations_by_machine("Machine1"),
+                                  sorted_output=True)
+    
+    def test_installations_by_tool(self):
+        """Test filtering by tool uses the tool/date index"""
+        self.assert_no_table_scan(lambda: self.db.get_installations_by_tool("Tool1"),
+                                  sorted_output=True)
+    
+    def test_keyset_page(self):
+        """Test a keyset page seeks into the date index"""
+        self.assert_no_table_scan(
+            lambda: list(self.db.iter_installations(limit=10, after=("2025-12-06", 2))),
+            sorted_output=True)
+    
+    def test_date_range(self):
+        """Test date ranges seek into the day indexes"""
+        for call in (lambda: list(self.db.iter_installations(since="2025-12-06")),
+                     lambda: self.db.get_installations_by_machine("Machine1", until="2025-12-05"),
+                     lambda: self.db.get_installations_by_tool("Tool1", since="2025-12-01")):
+            self.assert_no_table_scan(call, sorted_output=True)
+    
+    def test_archived(self):
+        """Test live and archived rows are merged from their indexes without sorting"""
+        self.db.remove_installation("Machine1", "Tool1", "2025-12-07")
+        self.db.archive_installations("2025-12-08")
+        self.assert_no_table_scan(
+            lambda: list(self.db.iter_installations(limit=10, archived=True)), sorted_output=True)
+        self.assert_no_table_scan(
+            lambda: list(self.db.iter_installations(machine_name="Machine1", since="2025-12-01",
+                                                    archived=True)), sorted_output=True)
+    
+    def test_active_installations(self):
+        """Test listings and removals of open installations use the partial indexes"""
+        listings = (lambda: list(self.db.iter_installations(active=True)),
+                    lambda: list(self.db.iter_installations(machine_name="Machine1",
+                                                            active=True)))
+        for call in listings:
+            self.assert_no_table_scan(call, sorted_output=True)
+        removals = (lambda: self.db.remove_installation("Machine1", "Tool1", "2025-12-31"),
+                    lambda: self.db.close_out_machine("Machine2", "2025-12-31"))
+        for call in listings + removals:
+            steps = [step for steps in self.plans(call).values() for step in steps
+                     if INSTALLATIONS_STEP.search(step)]
+            self.assertTrue(steps)
+            for step in steps:
+                self.assertIn("idx_installations_active", step)
+    
+    def test_summaries(self):
+        """Test machine and tool summaries group along an index"""
+        self.assert_no_table_scan(self.db.get_machine_summary)
+        self.assert_no_table_scan(self.db.get_tool_summary)
+        self.assert_no_table_scan(lambda: self.db.get_tool_summary("Tool1"))
+    
+    def test_statistics(self):
+        """Test statistics are computed from indexes"""
+        self.assert_no_table_scan(self.db.get_statistics)
+
+class TestAnalyzedQueryPlans(TestQueryPlans):
+    """The same plans once maintain() has given the planner statistics"""
+    
+    def setUp(self):
+        """Set up a larger database, with some history archived, and analyze it"""
+        super().setUp()
+        datagen.populate(self.db, 5000)
+        self.db.close_out_machine(datagen.machine_name(3), "2030-01-01")
+        self.db.archive_installations("2031-01-01")
+        self.assertTrue(self.db.maintain(vacuum=False, check=False).analyzed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for removing tools and closing out machines"""
+
+import unittest
+import os
+import tempfile
+
+from src.database import ToolTrackerDB
+
+class TestRemovals(unittest.TestCase):
+    """Test cases for the installation lifecycle"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+        self.db.add_installation("Machine1", "Tool1", "2025-01-01")
+        self.db.add_installation("Machine1", "Tool2", "2025-01-05")
+        self.db.add_installation("Machine1", "Tool3", "2025-02-01")
+        self.db.add_installation("Machine2", "Tool1", "2025-01-03")
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+
+    def removal_dates(self):
+        return {(r["machine"], r["tool"]): r["removal_date"]
+                for r in self.db.iter_installations()}
+
+    def test_remove_installation(self):
+        """Test removing a tool closes only its open installation"""
+        self.assertEqual(self.db.remove_installation("Machine1", "Tool1", "2025-01-10"), 1)
+        dates = self.removal_dates()
+        self.assertEqual(dates[("Machine1", "Tool1")], "2025-01-10")
+        self.assertIsNone(dates[("Machine2", "Tool1")])
+        self.assertEqual(self.db.get_statistics()["active_installations"], 3)
+
+        with self.assertRaises(ValueError):
+            # Already removed
+            self.db.remove_installation("Machine1", "Tool1", "2025-01-11")
+
+    def test_remove_errors(self):
+        """Test removals that cannot apply raise ValueError and change nothing"""
+        for args in [("Missing", "Tool1", "2025-03-01"),
+                     ("Machine1", "Missing", "2025-03-01"),
+                     ("Machine2", "Tool2", "2025-03-01"),
+                     ("Machine1", "Tool3", "2025-01-15"),
+                     ("Machine1", "Tool1", "03/01/2025")]:
+            with self.assertRaises(ValueError, msg=args):
+                self.db.remove_installation(*args)
+        with self.assertRaisesRegex(ValueError, "after 2025-01-15"):
+            self.db.remove_installation("Machine1", "Tool3", "2025-01-15")
+        self.assertEqual(self.db.get_statistics()["active_installations"], 4)
+
+    def test_close_out_machine(self):
+        """Test a close-out removes every tool installed by the date in one UPDATE"""
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        closed = self.db.close_out_machine("Machine1", "2025-01-20")
+        self.db.connection.set_trace_callback(None)
+
+        self.assertEqual(closed, 2)
+        # Trigger steps are traced under their statement, so count distinct texts
+        self.assertEqual(len({s for s in statements if "UPDATE installations" in s}), 1)
+        dates = self.removal_dates()
+        self.assertEqual(dates[("Machine1", "Tool1")], "2025-01-20")
+        self.assertEqual(dates[("Machine1", "Tool2")], "2025-01-20")
+        # Installed after the close-out date, and on another machine
+        self.assertIsNone(dates[("Machine1", "Tool3")])
+        self.assertIsNone(dates[("Machine2", "Tool1")])
+
+        self.assertEqual(self.db.close_out_machine("Machine1", "2025-01-20"), 0)
+        with self.assertRaises(ValueError):
+            self.db.close_out_machine("Missing", "2025-01-20")
+
+    def test_bulk_remove(self):
+        """Test bulk removals apply the good rows and report the bad ones"""
+        result = self.db.bulk_remove([
+            {"machine": "Machine1", "tool": "Tool1", "removal_date": "2025-03-01"},
+            {"machine": "Machine1", "tool": "Missing", "removal_date": "2025-03-01"},
+            {"machine": "Machine2", "removal_date": "2025-03-01"},
+            {"machine": "Machine1", "tool": "Tool2"},
+        ], chunk_size=2)
+        self.assertEqual(result.removed, 2)
+        self.assertEqual([number for number, _ in result.errors], [2, 4])
+        dates = self.removal_dates()
+        self.assertEqual(dates[("Machine1", "Tool1")], "2025-03-01")
+        self.assertEqual(dates[("Machine2", "Tool1")], "2025-03-01")
+        self.assertIsNone(dates[("Machine1", "Tool2")])
+        with self.assertRaises(ValueError):
+            self.db.bulk_remove([], chunk_size=0)
+
+    def test_active_listing(self):
+        """Test listing only the tools still installed"""
+        self.db.remove_installation("Machine1", "Tool2", "2025-01-10")
+        active = list(self.db.iter_installations(active=True))
+        self.assertEqual([(r["machine"], r["tool"]) for r in active],
+                         [("Machine1", "Tool3"), ("Machine2", "Tool1"), ("Machine1", "Tool1")])
+        active = list(self.db.iter_installations(machine_name="Machine1", active=True, limit=1))
+        self.assertEqual([r["tool"] for r in active], ["Tool3"])
+
+    def test_rollups_follow_removals(self):
+        """Test removals keep the statistics rollups exact"""
+        self.db.remove_installation("Machine1", "Tool1", "2025-01-10")
+        self.db.close_out_machine("Machine1", "2025-03-01")
+        summary = {s["machine"]: s for s in self.db.get_machine_summary()}
+        self.assertEqual(summary["Machine1"]["active"], 0)
+        stats = self.db.get_statistics()
+        self.assertEqual(stats["active_installations"], 1)
+        self.db.rebuild_statistics()
+        self.assertEqual(self.db.get_statistics(), stats)
+
+if __name__ == '__main__':
+    unittest.main()
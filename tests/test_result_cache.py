@@ -0,0 +1,115 @@
+"""Tests for the read-through query result cache"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.cache import ResultCache
+from src.database import ToolTrackerDB
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for ToolTrackerDB result caching"""
+
+    def setUp(self):
+        """Set up a test database with the result cache enabled"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.db")
+        self.db = ToolTrackerDB(self.path, result_cache_size=8)
+        self.db.add_installation("Machine1", "Tool1", "2025-01-01")
+        self.db.add_installation("Machine1", "Tool2", "2025-01-02")
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_disabled_by_default(self):
+        """Test reads are not cached unless a size is given"""
+        with ToolTrackerDB(self.path) as db:
+            db.get_statistics()
+            db.get_statistics()
+            self.assertEqual(db.result_cache_info()["hits"], 0)
+            self.assertEqual(db.result_cache_info()["currsize"], 0)
+
+    def test_hits_return_copies(self):
+        """Test repeated reads hit and callers cannot alter cached results"""
+        first = self.db.get_installations_by_machine("Machine1")
+        first[0]["notes"] = "changed"
+        first.clear()
+        second = self.db.get_installations_by_machine("Machine1")
+        self.assertEqual(len(second), 2)
+        self.assertIsNone(second[0]["notes"])
+        stats = self.db.get_statistics()
+        stats["tools_per_machine"].clear()
+        self.assertEqual(self.db.get_statistics()["tools_per_machine"], {"Machine1": 2})
+
+        info = self.db.result_cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (2, 2))
+        self.assertEqual(info["hit_ratio"], 0.5)
+
+    def test_arguments_are_part_of_the_key(self):
+        """Test different arguments are cached separately"""
+        self.assertEqual(len(self.db.get_installations_by_tool("Tool1")), 1)
+        self.assertEqual(len(self.db.get_installations_by_tool("Tool2")), 1)
+        self.assertEqual(len(self.db.get_machine_summary()), 1)
+        self.assertEqual(len(self.db.get_machine_summary(machine_name="Machine1")), 1)
+        self.assertEqual(self.db.result_cache_info()["hits"], 0)
+
+    def test_invalidated_by_own_writes(self):
+        """Test a write through the same instance invalidates results"""
+        self.assertEqual(self.db.get_statistics()["total_records"], 2)
+        self.db.add_installation("Machine2", "Tool1", "2025-01-03")
+        self.assertEqual(self.db.get_statistics()["total_records"], 3)
+        self.db.remove_installation("Machine2", "Tool1", "2025-01-04")
+        self.assertEqual(self.db.get_statistics()["active_installations"], 2)
+
+    def test_invalidated_by_other_connection(self):
+        """Test a commit from another process's connection is noticed"""
+        self.assertEqual(len(self.db.get_all_installations()), 2)
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.execute("DELETE FROM installations")
+        conn.close()
+        self.assertEqual(self.db.get_all_installations(), [])
+
+    def test_bypassed_inside_transaction(self):
+        """Test reads inside a transaction see its uncommitted writes"""
+        self.db.get_statistics()
+        with self.db.transaction():
+            self.db.add_installation("Machine2", "Tool1", "2025-01-03")
+            self.assertEqual(self.db.get_statistics()["total_records"], 3)
+        self.assertEqual(self.db.get_statistics()["total_records"], 3)
+
+    def test_ttl(self):
+        """Test entries older than the TTL are read again"""
+        with ToolTrackerDB(self.path, result_cache_size=8, result_cache_ttl=0.05) as db:
+            db.get_statistics()
+            db.get_statistics()
+            time.sleep(0.1)
+            db.get_statistics()
+            info = db.result_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["expired"]), (1, 2, 1))
+
+    def test_size_bound(self):
+        """Test the least recently used results are evicted"""
+        with ToolTrackerDB(self.path, result_cache_size=2) as db:
+            for name in ("Tool1", "Tool2", "Tool3"):
+                db.get_installations_by_tool(name)
+            self.assertEqual(db.result_cache_info()["currsize"], 2)
+            db.get_installations_by_tool("Tool1")
+            self.assertEqual(db.result_cache_info()["hits"], 0)
+
+    def test_generation_guard(self):
+        """Test a result computed across a clear is not stored"""
+        cache = ResultCache(maxsize=4)
+        generation = cache.generation
+        cache.clear()
+        cache.put("key", "stale", generation)
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", "fresh", cache.generation)
+        self.assertEqual(cache.get("key"), "fresh")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Tests for the incrementally maintained statistics rollups"""
+
+import unittest
+import os
+import random
+import sqlite3
+import tempfile
+
+from src.database import ToolTrackerDB
+
+ROLLUP_TABLES = {
+    "machine_stats": "machine_id",
+    "tool_stats": "tool_id",
+    "tool_type_stats": "tool_type",
+    "stats_totals": "id",
+}
+
+class TestRollups(unittest.TestCase):
+    """Test cases for rollup consistency"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+
+    def snapshot(self):
+        """Contents of every rollup table, without rows counted down to zero"""
+        conn = self.db.connection
+        tables = {}
+        for table, key in ROLLUP_TABLES.items():
+            cursor = conn.execute(f"SELECT * FROM {table} ORDER BY {key}")
+            columns = [description[0] for description in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor]
+            if table != "stats_totals":
+                # Incremental updates leave emptied rows behind; a recompute drops them
+                counters = columns[len(key.split(", ")):]
+                for row in rows:
+                    if not row["installations"]:
+                        self.assertEqual([row[c] for c in counters], [0] * len(counters))
+                rows = [row for row in rows if row["installations"]]
+            tables[table] = rows
+        return tables
+
+    def assert_consistent(self):
+        incremental = self.snapshot()
+        self.db.rebuild_statistics()
+        self.assertEqual(incremental, self.snapshot())
+
+    def run_workload(self, seed, steps=300):
+        """Apply a random mix of every kind of write"""
+        rng = random.Random(seed)
+        conn = self.db.connection
+
+        def random_record():
+            return {"machine": f"M{rng.randrange(6)}", "tool": f"T{rng.randrange(15)}",
+                    "tool_type": rng.choice([None, "Drill", "Mill"]),
+                    "installed_date": f"2025-01-{rng.randrange(1, 11):02d}"}
+
+        def random_id():
+            row = conn.execute(
+                "SELECT id FROM installations ORDER BY random() LIMIT 1").fetchone()
+            return row[0] if row else None
+
+        for _ in range(steps):
+            action = rng.randrange(8)
+            if action == 0:
+                record = random_record()
+                try:
+                    self.db.add_installation(record["machine"], record["tool"],
+                                             record["installed_date"])
+                except ValueError:
+                    pass
+            elif action == 1:
+                self.db.bulk_add_installations([random_record() for _ in range(20)],
+                                               chunk_size=rng.choice([5, 50]))
+            elif action == 2 and random_id():
+                with self.db.transaction():
+                    conn.execute("DELETE FROM installations WHERE id = ?", (random_id(),))
+            elif action in (3, 4) and random_id():
+                removal = rng.choice([None, "2025-02-01"])
+                with self.db.transaction():
+                    conn.execute("UPDATE installations SET removal_date = ? WHERE id = ?",
+                                 (removal, random_id()))
+            elif action == 5 and random_id():
+                try:
+                    with self.db.transaction():
+                        conn.execute("UPDATE installations SET machine_id = ?, tool_id = ? "
+                                     "WHERE id = ?", (self.db.get_machine_id("M0"),
+                                                      self.db.get_tool_id("T0"), random_id()))
+                except sqlite3.IntegrityError:
+                    pass
+            elif action == 6:
+                with self.db.transaction():
+                    conn.execute("UPDATE tools SET type = ? WHERE name = ?",
+                                 (rng.choice([None, "Drill", "Tap"]), f"T{rng.randrange(15)}"))
+            else:
+                try:
+                    self.db.add_tool(f"Unused{rng.randrange(1000)}")
+                except ValueError:
+                    pass
+
+    def test_random_workloads(self):
+        """Test rollups match a full recompute after random writes"""
+        for seed in range(5):
+            self.run_workload(seed)
+            self.assert_consistent()
+
+    def test_statistics_from_rollups(self):
+        """Test statistics reflect inserts, removals and deletes"""
+        self.db.add_tool("Drill-1", "Drill")
+        self.db.add_installation("M1", "Drill-1", "2025-01-01")
+        self.db.add_installation("M1", "Drill-1", "2025-01-02")
+        self.db.bulk_add_installations([
+            {"machine": "M2", "tool": "Tap-1", "tool_type": "Tap", "installed_date": "2025-01-01"},
+            {"machine": "M2", "tool": "Drill-1", "installed_date": "2025-01-01"},
+        ])
+        conn = self.db.connection
+        conn.execute("UPDATE installations SET removal_date = '2025-02-01' WHERE id = 1")
+
+        stats = self.db.get_statistics()
+        self.assertEqual(stats["total_records"], 4)
+        self.assertEqual(stats["active_installations"], 3)
+        self.assertEqual(stats["total_machines"], 2)
+        self.assertEqual(stats["total_tools"], 2)
+        self.assertEqual(stats["tools_per_machine"], {"M1": 2, "M2": 2})
+        self.assertEqual(stats["installations_per_tool_type"], {"Drill": 3, "Tap": 1})
+
+        conn.execute("DELETE FROM installations WHERE machine_id = "
+                     "(SELECT id FROM machines WHERE name = 'M1')")
+        stats = self.db.get_statistics()
+        self.assertEqual((stats["total_records"], stats["active_installations"]), (2, 2))
+        self.assertEqual(stats["tools_per_machine"], {"M2": 2})
+        self.assert_consistent()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Unit tests for full-text search"""
+
+import unittest
+import os
+import tempfile
+from src.database import ToolTrackerDB, to_fts_query
+
+class TestSearch(unittest.TestCase):
+    """Test cases for search_installations / iter_search"""
+    
+    def setUp(self):
+        """Set up a test database with a few records"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+        self.db.add_tool("Drill-7", "Twist-Drill")
+        self.db.add_installation("CNC-Machine-01", "Cutting-Tool-A", "2025-12-05",
+                                 notes="High-speed steel tool for aluminum")
+        self.db.add_installation("CNC-Machine-02", "Drill-7", "2025-12-06",
+                                 notes="Coolant through spindle")
+        self.db.add_installation("Lathe-01", "Cutting-Tool-B", "2025-12-07")
+    
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+    
+    def machines(self, query):
+        return sorted(r['machine'] for r in self.db.search_installations(query))
+    
+    def test_fts_enabled(self):
+        """Test the FTS5 index is created on this SQLite build"""
+        self.assertTrue(self.db._has_fts)
+    
+    def test_prefix_search(self):
+        """Test plain words match as prefixes"""
+        self.assertEqual(self.machines("cnc"), ["CNC-Machine-01", "CNC-Machine-02"])
+        self.assertEqual(self.machines("alumin"), ["CNC-Machine-01"])
+    
+    def test_tool_type_search(self):
+        """Test the tool type is searchable"""
+        self.assertEqual(self.machines("twist"), ["CNC-Machine-02"])
+    
+    def test_phrase_and_boolean_search(self):
+        """Test FTS5 phrase and boolean syntax is passed through"""
+        self.assertEqual(self.machines('"Cutting-Tool-B"'), ["Lathe-01"])
+        self.assertEqual(self.machines("cutting NOT lathe"), ["CNC-Machine-01"])
+        self.assertEqual(self.machines("lathe OR coolant"), ["CNC-Machine-02", "Lathe-01"])
+    
+    def test_ranking(self):
+        """Test records matching more often rank first"""
+        self.db.add_installation("Mill-09", "Mill-Tool", "2025-12-08",
+                                 notes="steel steel steel")
+        records = self.db.search_installations("steel")
+        self.assertEqual(records[0]['machine'], "Mill-09")
+    
+    def test_index_follows_updates(self):
+        """Test triggers keep the index in sync with edits and deletes"""
+        conn = self.db.connection
+        conn.execute("UPDATE machines SET name = 'Grinder-01' WHERE name = 'Lathe-01'")
+        self.assertEqual(self.machines("grinder"), ["Grinder-01"])
+        self.assertEqual(self.machines("lathe"), [])
+        conn.execute("UPDATE installations SET notes = 'rebuilt spindle' WHERE id = 1")
+        self.assertEqual(self.machines("spindle"), ["CNC-Machine-01", "CNC-Machine-02"])
+        conn.execute("DELETE FROM installations WHERE id = 2")
+        self.assertEqual(self.machines("drill"), [])
+        conn.execute("INSERT INTO installations_fts (installations_fts) VALUES ('integrity-check')")
+    
+    def test_bulk_load_indexes_records(self):
+        """Test bulk inserts are indexed even though the insert trigger is dropped"""
+        result = self.db.bulk_add_installations([
+            {"machine": "Mill-09", "tool": "Drill-8", "installed_date": "2025-12-08",
+             "notes": "titanium"},
+            {"machine": "CNC-Machine-01", "tool": "Cutting-Tool-A", "installed_date": "2025-12-05"},
+        ])
+        self.assertEqual(len(result.duplicates), 1)
+        self.assertEqual(self.machines("titanium"), ["Mill-09"])
+        self.db.connection.execute(
+            "INSERT INTO installations_fts (installations_fts) VALUES ('integrity-check')")
+    
+    def test_invalid_query(self):
+        """Test malformed FTS5 syntax is searched for as plain words"""
+        self.assertEqual(self.machines('"unterminated'), [])
+        self.assertEqual(self.machines('"coolant'), ["CNC-Machine-02"])
+    
+    def test_punctuated_names(self):
+        """Test tool names and notes full of FTS5 operators are found"""
+        self.db.add_installation("Lathe-02", "C++", "2025-12-08", notes="Changed at 10:30")
+        self.db.add_installation("Lathe-03", "Insert (CCMT^2)", "2025-12-09",
+                                 notes='Bore 1/2" +0.01')
+        self.assertEqual(self.machines("C++"), ["Lathe-02"])
+        self.assertEqual(self.machines("10:30"), ["Lathe-02"])
+        self.assertEqual(self.machines("insert (ccmt"), ["Lathe-03"])
+        self.assertEqual(self.machines('1/2" +0.01'), ["Lathe-03"])
+        self.assertEqual(self.machines("ccmt*"), ["Lathe-03"])
+    
+    def test_like_fallback(self):
+        """Test substring search is used when FTS5 is unavailable"""
+        self.db._has_fts = False
+        self.assertEqual(self.machines("achine-0"), ["CNC-Machine-01", "CNC-Machine-02"])
+    
+    def test_to_fts_query(self):
+        """Test plain input becomes quoted prefix terms"""
+        self.assertEqual(to_fts_query("cnc mill"), '"cnc"* "mill"*')
+        self.assertEqual(to_fts_query('"end mill" OR drill'), '"end mill" OR drill')
+        self.assertEqual(to_fts_query('1/2" C++', literal=True), '"1/2""" "C++"')
+
+if __name__ == '__main__':
+    unittest.main()
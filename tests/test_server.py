@@ -0,0 +1,208 @@
+"""Tests for the read-only HTTP/JSON service"""
+
+import unittest
+import gzip
+import http.client
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from click.testing import CliRunner
+
+from benchmarks import bench_server
+from src import cli as cli_module
+from src.database import ToolTrackerDB
+from src.server import TrackerHTTPServer, TrackerService
+
+class TestTrackerService(unittest.TestCase):
+    """Test cases for TrackerService"""
+
+    def setUp(self):
+        """Set up a database with two machines"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "tracker.db"))
+        for day in range(1, 26):
+            self.db.add_installation("Mill 1" if day % 2 else "Lathe", f"Drill-{day % 3}",
+                                     f"2025-01-{day:02d}", notes="coolant" if day < 5 else None)
+        self.service = TrackerService(self.db)
+
+    def tearDown(self):
+        """Close the database and clean up"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def get(self, target, **kwargs):
+        status, headers, body = self.service.respond(target, **kwargs)
+        if headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return status, headers, json.loads(body) if body else None
+
+    def follow(self, target):
+        """Every record of a listing, following its next links; and the page count"""
+        records, pages = [], 0
+        while target:
+            status, _, page = self.get(target)
+            self.assertEqual(status, 200)
+            records.extend(page["installations"])
+            pages += 1
+            target = page["next"]
+        return records, pages
+
+    def test_pages(self):
+        """Test listings are paged through to the end by their next links"""
+        records, pages = self.follow("/installations?limit=10")
+        self.assertEqual(pages, 3)
+        self.assertEqual(records, self.db.get_all_installations())
+        records, pages = self.follow("/machines/Mill%201/installations?limit=5")
+        self.assertEqual((len(records), pages), (13, 3))
+        self.assertEqual({r["machine"] for r in records}, {"Mill 1"})
+        records, _ = self.follow("/tools/Drill-0/installations?since=2025-01-10")
+        self.assertEqual([r["installed_date"] for r in records],
+                         ["2025-01-24", "2025-01-21", "2025-01-18", "2025-01-15", "2025-01-12"])
+        _, _, page = self.get("/installations?limit=100000")
+        self.assertEqual(len(page["installations"]), 25)
+        self.assertIsNone(page["next"])
+
+    def test_search_and_summaries(self):
+        """Test searches page by offset and statistics match the database"""
+        records, pages = self.follow("/search?q=coolant&limit=3")
+        self.assertEqual((len(records), pages), (4, 2))
+        # JSON keys are strings: tools without a type are counted under "null"
+        self.assertEqual(self.get("/stats")[2], json.loads(json.dumps(self.db.get_statistics())))
+        self.assertEqual(self.get("/machines")[2], self.db.get_machine_summary())
+        self.assertEqual(self.get("/tools")[2], self.db.get_tool_summary())
+
+    def test_errors(self):
+        """Test unknown paths and bad parameters are refused"""
+        self.assertEqual(self.get("/nothing")[0], 404)
+        self.assertEqual(self.get("/machines/Mill/tools")[0], 404)
+        for target in ("/search", "/installations?since=2025-13-01", "/installations?limit=-1",
+                       "/installations?after=2025-01-05"):
+            status, _, body = self.get(target)
+            self.assertEqual(status, 400, target)
+            self.assertIn("error", body)
+
+    def test_etag(self):
+        """Test unchanged data answers If-None-Match with 304, and any write changes the tag"""
+        status, headers, _ = self.get("/stats")
+        tag = headers["ETag"]
+        self.assertTrue(tag.startswith('W/"' + self.db.database_id))
+        self.assertEqual(self.get("/installations", if_none_match=tag)[0], 304)
+        self.assertEqual(self.get("/stats", if_none_match=f'"x", {tag[2:]}')[0], 304)
+        self.assertEqual(self.get("/stats", if_none_match="*")[0], 304)
+        self.assertEqual(self.db.close_out_machine("Lathe", "2025-02-01"), 12)
+        status, headers, stats = self.get("/stats", if_none_match=tag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], tag)
+        self.assertEqual(stats["active_installations"], 13)
+
+    def test_gzip_and_cache(self):
+        """Test large bodies are gzipped when accepted and repeats come from the cache"""
+        status, headers, body = self.service.respond("/installations", accept_gzip=True)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(body))["installations"],
+                         self.db.get_all_installations())
+        self.assertNotIn("Content-Encoding", self.service.respond("/installations")[1])
+        self.assertNotIn("Content-Encoding", self.service.respond("/stats", accept_gzip=True)[1])
+        self.assertEqual(self.service.respond("/installations", accept_gzip=True)[2], body)
+        self.assertEqual(self.service.cache_info()["hits"], 1)
+        self.db.add_installation("Mill 1", "Drill-9", "2025-03-01")
+        self.assertNotEqual(self.service.respond("/installations", accept_gzip=True)[2], body)
+
+class TestTrackerHTTPServer(unittest.TestCase):
+    """Test cases for TrackerHTTPServer"""
+
+    def setUp(self):
+        """Start a server on a free port"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "tracker.db"), journal_mode="wal")
+        for day in range(1, 29):
+            self.db.add_installation("Mill", f"Drill-{day}", f"2025-02-{day:02d}")
+        self.server = TrackerHTTPServer(self.db, port=0, readers=2)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server, close the database and clean up"""
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def connect(self):
+        return http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+
+    def test_keep_alive(self):
+        """Test one connection serves several requests, gzipped and conditional"""
+        conn = self.connect()
+        conn.request("GET", "/installations", headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        page = json.loads(gzip.decompress(response.read()))
+        self.assertEqual(len(page["installations"]), 28)
+        conn.request("GET", "/stats", headers={"If-None-Match": response.getheader("ETag")})
+        response = conn.getresponse()
+        self.assertEqual((response.status, response.read()), (304, b""))
+        conn.request("GET", "/missing")
+        self.assertEqual(conn.getresponse().status, 404)
+        conn.close()
+
+    def test_pooled_connections(self):
+        """Test many clients are answered through the readers' connections only"""
+        opened = len(self.db._connections)
+        clients = [self.connect() for _ in range(8)]
+        for n, conn in enumerate(clients):
+            conn.request("GET", f"/installations?limit={n + 1}")
+        for n, conn in enumerate(clients):
+            response = conn.getresponse()
+            self.assertEqual(len(json.loads(response.read())["installations"]), n + 1)
+            conn.close()
+        # Each reader thread opens one read-only connection in WAL mode
+        self.assertLessEqual(len(self.db._connections) - opened, 2)
+
+    def test_load(self):
+        """Test the load test measures every phase against a loopback server"""
+        report = bench_server.run(os.path.join(self.tmpdir.name, "load.db"), rows=500,
+                                  clients=2, readers=2, seconds=0.2, log=lambda message: None)
+        self.assertEqual(list(report), ["query", "cached", "not-modified"])
+        for phase, figures in report.items():
+            self.assertGreater(figures["requests_per_sec"], 0, phase)
+            self.assertIsNotNone(figures["p99_ms"], phase)
+        self.assertEqual(set(report["query"]["statuses"]), {200})
+        self.assertGreater(report["not-modified"]["statuses"][304], 0)
+
+class TestServeCommand(unittest.TestCase):
+    """Test cases for the serve command"""
+
+    def setUp(self):
+        """Set up a small database"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = ToolTrackerDB(os.path.join(self.tmpdir.name, "tracker.db"))
+        self.runner = CliRunner()
+
+    def tearDown(self):
+        """Close the database and clean up"""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def invoke(self, *args):
+        with mock.patch.object(cli_module, "db", self.db):
+            return self.runner.invoke(cli_module.cli, ["--db", self.db.db_path] + list(args))
+
+    def test_serve(self):
+        """Test the command serves until interrupted and reports a busy port"""
+        with mock.patch.object(TrackerHTTPServer, "serve_forever", side_effect=KeyboardInterrupt):
+            result = self.invoke("serve", "--port", "0", "--readers", "2")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Serving", result.stdout)
+        self.assertIn("http://127.0.0.1:", result.stdout)
+        with TrackerHTTPServer(self.db, port=0) as busy:
+            result = self.invoke("serve", "--port", str(busy.server_address[1]))
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("cannot listen", result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
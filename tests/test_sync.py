@@ -0,0 +1,111 @@
+"""Tests for the change log and incremental sync between databases"""
+
+import unittest
+import os
+import tempfile
+from unittest import mock
+
+from click.testing import CliRunner
+
+from src import cli as cli_module
+from src.database import ToolTrackerDB
+
+class TestSync(unittest.TestCase):
+    """Test cases for get_changes, apply_changes and sync_from"""
+
+    def setUp(self):
+        """Set up a source database and an empty replica"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = ToolTrackerDB(os.path.join(self.tmpdir.name, "source.db"))
+        self.replica = ToolTrackerDB(os.path.join(self.tmpdir.name, "replica.db"))
+        self.source.add_installation("Mill", "Drill", "2025-01-01", notes="coolant leak")
+        self.source.bulk_add_installations(
+            {"machine": "Lathe", "tool": f"Insert-{n}", "installed_date": "2025-01-02"}
+            for n in range(5))
+
+    def tearDown(self):
+        """Close both databases and clean up"""
+        self.source.close()
+        self.replica.close()
+        self.tmpdir.cleanup()
+
+    def assertInSync(self):
+        for archived in (False, True):
+            self.assertEqual(self.replica.get_all_installations(archived=archived),
+                             self.source.get_all_installations(archived=archived))
+        self.assertEqual(self.replica.get_statistics(), self.source.get_statistics())
+        self.assertEqual(self.replica.search_installations("coolant"),
+                         self.source.search_installations("coolant"))
+
+    def test_change_log(self):
+        """Test every write appends to the log, bulk loads included"""
+        changes = self.source.get_changes()
+        self.assertEqual([c["seq"] for c in changes], list(range(1, 15)))
+        self.assertEqual(changes[0], {"seq": 1, "table": "machines", "id": 1, "row": {
+            "id": 1, "name": "Mill", "created_at": changes[0]["row"]["created_at"]}})
+        self.assertEqual([c["table"] for c in changes[-5:]], ["installations"] * 5)
+        self.assertEqual(len(self.source.get_changes(since=12)), 2)
+        self.assertEqual(len(self.source.get_changes(limit=3)), 3)
+
+        self.source.remove_installation("Mill", "Drill", "2025-02-01")
+        self.source.remove_installation("Lathe", "Insert-0", "2025-02-01")
+        self.source.archive_installations("2025-03-01")
+        # Each row comes once, as it is now, at its latest change
+        changes = self.source.get_changes(since=14)
+        self.assertEqual([(c["seq"], c["table"], c["id"]) for c in changes], [
+            (17, "installations_archive", 1), (18, "installations_archive", 2),
+            (19, "installations", 1), (20, "installations", 2)])
+        self.assertEqual(changes[1]["row"]["removal_date"], "2025-02-01")
+        self.assertIsNone(changes[2]["row"])
+
+    def test_sync_from(self):
+        """Test a replica catches up with only the changes it has not seen"""
+        result = self.replica.sync_from(self.source.db_path, batch_size=4)
+        self.assertEqual((result.applied, result.batches, result.seq), (14, 4, 14))
+        self.assertInSync()
+
+        self.source.add_installation("Mill", "Tap", "2025-01-03", notes="coolant")
+        self.source.remove_installation("Lathe", "Insert-1", "2025-02-01")
+        self.source.archive_installations("2025-03-01")
+        result = self.replica.sync_from(self.source)
+        self.assertEqual((result.applied, result.batches, result.seq), (4, 1, 19))
+        self.assertInSync()
+        # Nothing new: nothing pulled
+        result = self.replica.sync_from(self.source)
+        self.assertEqual((result.applied, result.batches, result.seq), (0, 0, 19))
+
+    def test_apply_is_idempotent(self):
+        """Test applying changes again, or older changes, leaves the replica as it is"""
+        self.replica.sync_from(self.source)
+        self.source.remove_installation("Mill", "Drill", "2025-02-01")
+        self.replica.sync_from(self.source)
+        self.assertEqual(self.replica.apply_changes(self.source.get_changes()), 0)
+        result = self.replica.sync_from(self.source, since=0)
+        self.assertEqual((result.applied, result.seq), (0, 15))
+        self.assertInSync()
+        # The replica logs what it applied, so it can be synced from in turn
+        with ToolTrackerDB(os.path.join(self.tmpdir.name, "second.db")) as second:
+            second.sync_from(self.replica)
+            self.assertEqual(second.get_statistics(), self.source.get_statistics())
+
+    def test_errors(self):
+        """Test syncing from itself or from a missing file is refused"""
+        with self.assertRaises(ValueError):
+            self.source.sync_from(self.source)
+        with self.assertRaises(ValueError):
+            self.replica.sync_from(os.path.join(self.tmpdir.name, "missing.db"))
+        self.assertNotEqual(self.source.database_id, self.replica.database_id)
+
+    def test_cli_sync(self):
+        """Test the sync command reports what it applied"""
+        runner = CliRunner()
+        with mock.patch.object(cli_module, "db", self.replica):
+            sync = ["--db", self.replica.db_path, "sync", "--from", self.source.db_path]
+            result = runner.invoke(cli_module.cli, sync)
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("Applied 14 change(s) in 1 batch(es), up to sequence 14", result.output)
+            result = runner.invoke(cli_module.cli, sync + ["--since", "12"])
+            self.assertIn("Applied 0 change(s) in 1 batch(es), up to sequence 14", result.output)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Tests for the body time and utilization report"""
+
+import unittest
+import os
+import random
+import tempfile
+from collections import defaultdict
+from datetime import date, timedelta
+
+from src.database import ToolTrackerDB
+from src.utils import calculate_days_installed
+
+class TestUtilization(unittest.TestCase):
+    """Test cases for get_utilization"""
+
+    def setUp(self):
+        """Set up test database"""
+        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = ToolTrackerDB(self.test_db.name)
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.db.close()
+        if os.path.exists(self.test_db.name):
+            os.remove(self.test_db.name)
+
+    def install(self, machine, tool, installed, removed=None):
+        self.db.add_installation(machine, tool, installed)
+        if removed:
+            with self.db.transaction() as conn:
+                conn.execute("UPDATE installations SET removal_date = ? "
+                             "WHERE id = (SELECT MAX(id) FROM installations)", (removed,))
+
+    def test_clipping_and_open_installations(self):
+        """Test installations count only the days inside the period"""
+        self.install("M1", "T1", "2025-01-01", "2025-01-11")  # 10 days, 5 inside
+        self.install("M1", "T2", "2025-01-08")                 # open: 23 days inside
+        self.install("M2", "T1", "2025-01-20", "2025-02-10")  # 11 days inside
+        self.install("M2", "T3", "2024-12-01", "2025-01-02")  # before the period
+        self.install("M2", "T3", "2025-02-01")                 # after the period
+
+        report = self.db.get_utilization("2025-01-06", "2025-01-31")
+        self.assertEqual(report["days"], 25)
+        self.assertEqual(report["fleet"], {
+            "installations": 3, "active": 2, "machines": 2, "tools": 2,
+            "body_days": 39, "utilization": 39 / 50,
+        })
+        tools = {e["tool"]: e for e in report["tools"]}
+        self.assertEqual(tools["T1"]["body_days"], 16)
+        self.assertEqual(tools["T1"]["machines"], 2)
+        self.assertEqual(tools["T1"]["active"], 1)
+        self.assertEqual(tools["T2"]["body_days"], 23)
+        self.assertEqual(tools["T2"]["utilization"], 23 / 25)
+        self.assertEqual([e["machine"] for e in report["machines"]], ["M1", "M2"])
+        self.assertEqual(report["machines"][0]["body_days"], 28)
+        self.assertEqual(report["machines"][0]["tools"], 2)
+
+    def test_matches_per_record_computation(self):
+        """Test random histories against calculate_days_installed per record"""
+        rng = random.Random(7)
+        first = date(2024, 1, 1)
+        for i in range(300):
+            # Each machine/tool pair is installed once per 20-day cycle
+            installed = first + timedelta(days=i // 20 * 20 + rng.randrange(20))
+            removed = None
+            if rng.random() < 0.6:
+                removed = (installed + timedelta(days=rng.randrange(90))).isoformat()
+            self.install(f"M{i % 5}", f"T{i % 20}", installed.isoformat(), removed)
+
+        since, until = "2024-03-01", "2024-09-30"
+        per_tool = defaultdict(int)
+        per_machine = defaultdict(int)
+        for record in self.db.iter_installations():
+            if record["installed_date"] > until or (record["removal_date"] or until) < since:
+                continue
+            days = calculate_days_installed(max(record["installed_date"], since),
+                                            min(record["removal_date"] or until, until))
+            per_tool[record["tool"]] += days
+            per_machine[record["machine"]] += days
+
+        report = self.db.get_utilization(since, until)
+        self.assertEqual({e["tool"]: e["body_days"] for e in report["tools"]}, dict(per_tool))
+        self.assertEqual({e["machine"]: e["body_days"] for e in report["machines"]},
+                         dict(per_machine))
+        body_days = [e["body_days"] for e in report["tools"]]
+        self.assertEqual(body_days, sorted(body_days, reverse=True))
+
+    def test_filters(self):
+        """Test the report can be limited to one machine or tool"""
+        self.install("M1", "T1", "2025-01-01")
+        self.install("M2", "T1", "2025-01-01")
+        self.install("M2", "T2", "2025-01-01")
+        report = self.db.get_utilization("2025-01-01", "2025-01-11", machine_name="M2")
+        self.assertEqual([e["machine"] for e in report["machines"]], ["M2"])
+        self.assertEqual(report["fleet"]["body_days"], 20)
+        report = self.db.get_utilization("2025-01-01", "2025-01-11", tool_name="T1")
+        self.assertEqual(sorted(e["machine"] for e in report["machines"]), ["M1", "M2"])
+        report = self.db.get_utilization("2025-01-01", "2025-01-11", machine_name="missing")
+        self.assertEqual(report["machines"], [])
+
+    def test_defaults_and_validation(self):
+        """Test default period bounds and invalid dates"""
+        report = self.db.get_utilization()
+        self.assertEqual(report["days"], 0)
+        self.assertEqual(report["fleet"]["utilization"], 0.0)
+
+        self.install("M1", "T1", "2025-01-01")
+        report = self.db.get_utilization()
+        self.assertEqual(report["since"], "2025-01-01")
+        self.assertEqual(report["until"], date.today().isoformat())
+
+        with self.assertRaises(ValueError):
+            self.db.get_utilization("01/01/2025")
+        with self.assertRaises(ValueError):
+            self.db.get_utilization("2025-02-01", "2025-01-01")
+
+    def test_unpadded_dates(self):
+        """Test unpadded bounds are ordered as dates and returned padded"""
+        self.install("M1", "T1", "2025-03-01", "2025-03-11")
+        report = self.db.get_utilization("2025-3-1", "2025-10-31")
+        self.assertEqual((report["since"], report["until"], report["days"]),
+                         ("2025-03-01", "2025-10-31", 244))
+        self.assertEqual(report["fleet"]["body_days"], 10)
+        with self.assertRaises(ValueError):
+            self.db.get_utilization("2025-10-31", "2025-3-1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for batch date and time validation"""
+
+import unittest
+import os
+import tempfile
+
+from src.database import ToolTrackerDB
+from src.utils import validate_date, validate_time
+from src.validation import BatchValidator, normalize_date, normalize_time
+
+class TestValidation(unittest.TestCase):
+    """Test cases for normalize_date, normalize_time and BatchValidator"""
+
+    def test_matches_strptime(self):
+        """Test the patterns accept exactly what validate_date/validate_time accept"""
+        parts = [str(n) for n in range(0, 33)] + [f"{n:02d}" for n in range(10)] + ["001", "x"]
+        for year in ("0000", "0001", "1900", "2000", "2023", "2024", "99", "12345"):
+            for month in parts[:15] + parts[33:]:
+                for day in parts:
+                    value = f"{year}-{month}-{day}"
+                    self.assertEqual(normalize_date(value) is not None, validate_date(value), value)
+        for hour in parts[:26] + parts[33:]:
+            for minute in ("0", "05", "59", "60", "7x"):
+                for second in ("0", "00", "59", "60", "61"):
+                    value = f"{hour}:{minute}:{second}"
+                    self.assertEqual(normalize_time(value) is not None, validate_time(value), value)
+        for value in ("", " 2024-01-01", "2024-01-01 ", "2024/01/01", None, 20240101):
+            self.assertIsNone(normalize_date(value))
+
+    def test_normalizes(self):
+        """Test valid values come back zero-padded"""
+        self.assertEqual(normalize_date("2025-3-7"), "2025-03-07")
+        self.assertEqual(normalize_date("2024-02-29"), "2024-02-29")
+        self.assertIsNone(normalize_date("2100-02-29"))
+        self.assertEqual(normalize_time("7:05:00"), "07:05:00")
+
+    def test_validate(self):
+        """Test rows are split into normalized records and per-row errors"""
+        chunk = list(enumerate([
+            {"machine": "M1", "tool": "T1", "installed_date": "2025-1-5", "installation_time": "8:00:00"},
+            {"machine": "M1", "installed_date": "2025-01-05"},
+            {"machine": "M1", "tool": "T2", "installed_date": "2025-02-30"},
+            {"machine": "M1", "tool": "T3", "installed_date": "2025-01-05", "installation_time": "25:00:00"},
+            {"machine": "M1", "tool": "T4", "installed_date": "2025-01-05", "installation_time": ""},
+        ], start=1))
+        valid, errors = BatchValidator().validate(
+            chunk, required=("machine", "tool", "installed_date"),
+            dates=("installed_date",), times=("installation_time",))
+        self.assertEqual([number for number, _ in valid], [1, 5])
+        self.assertEqual(valid[0][1]["installed_date"], "2025-01-05")
+        self.assertEqual(valid[0][1]["installation_time"], "08:00:00")
+        self.assertIs(valid[1][1], chunk[4][1])
+        # The input record is not modified
+        self.assertEqual(chunk[0][1]["installed_date"], "2025-1-5")
+        self.assertEqual(errors, [
+            (2, "machine, tool and installed_date are required"),
+            (3, "Invalid date '2025-02-30'. Use YYYY-MM-DD"),
+            (4, "Invalid time '25:00:00'. Use HH:MM:SS"),
+        ])
+
+    def test_cache(self):
+        """Test repeated values are looked up, and the cache stays bounded"""
+        validator = BatchValidator(cache_size=3)
+        self.assertEqual(validator.normalize_dates(["2025-1-1", "2025-1-1", "x"]),
+                         ["2025-01-01", "2025-01-01", None])
+        self.assertEqual(len(validator._dates), 2)
+        self.assertEqual(validator.normalize_dates(["2025-1-2", "2025-1-3", "2025-1-1"]),
+                         ["2025-01-02", "2025-01-03", "2025-01-01"])
+        self.assertLessEqual(len(validator._dates), 3)
+        self.assertEqual(validator.normalize_times([["08:00:00"], "08:00:00"]), [None, "08:00:00"])
+
+    def test_ingestion(self):
+        """Test every write path stores normalized dates and rejects bad ones"""
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                ToolTrackerDB(os.path.join(tmpdir, "validation.db")) as db:
+            db.add_installation("M1", "T1", "2025-1-5", "8:00:00")
+            with self.assertRaises(ValueError):
+                db.add_installation("M1", "T2", "2025-02-30")
+            result = db.bulk_add_installations([
+                {"machine": "M1", "tool": "T1", "installed_date": "2025-01-05"},
+                {"machine": "M1", "tool": "T2", "installed_date": "2025-2-1"},
+                {"machine": "M1", "tool": "T3", "installed_date": "bad"},
+            ])
+            self.assertEqual(result.inserted, 1)
+            self.assertEqual(result.duplicates, [(1, "M1", "T1", "2025-01-05")])
+            self.assertEqual(result.errors, [(3, "Invalid date 'bad'. Use YYYY-MM-DD")])
+
+            removals = db.bulk_remove([
+                {"machine": "M1", "tool": "T1", "removal_date": "2025-3-1"},
+                {"machine": "M1", "removal_date": "2025-03-32"},
+                {"machine": "M9", "tool": "T2", "removal_date": "2025-03-01"},
+                {"tool": "T2", "removal_date": "2025-03-01"},
+            ])
+            self.assertEqual(removals.removed, 1)
+            self.assertEqual([number for number, _ in removals.errors], [2, 3, 4])
+
+            rows = [(r["tool"], r["installed_date"], r["installation_time"], r["removal_date"])
+                    for r in db.get_all_installations()]
+            self.assertEqual(rows, [("T2", "2025-02-01", None, None),
+                                    ("T1", "2025-01-05", "08:00:00", "2025-03-01")])
+
+if __name__ == '__main__':
+    unittest.main()